@@ -0,0 +1,208 @@
+"""
+Asyncio search engine for the Affidavit of Value Search
+Keeps many book searches in flight on one aiohttp session, rate limited per host
+"""
+
+import time
+import asyncio
+import logging
+from urllib.parse import urlparse
+
+import aiohttp
+
+from http_engine import USER_AGENT, TOKEN_REJECTED_STATUSES, SearchFormError, parse_search_form, build_search_payload
+from outcomes import TransientScrapeError
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket that lets ``rate`` requests per second through, with bursts of up to ``capacity``"""
+
+    def __init__(self, rate, capacity=1):
+        """
+        Args:
+            rate (float): Tokens added per second
+            capacity (int): Maximum number of tokens the bucket can hold
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """One token bucket per host, created on first use"""
+
+    def __init__(self, rate, capacity=1):
+        """
+        Args:
+            rate (float): Requests per second allowed against each host (None for no limit)
+            capacity (int): Burst size allowed against each host
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+
+    async def acquire(self, url):
+        """Wait until a request to the host of ``url`` is allowed"""
+        if self.rate is None:
+            return
+        host = urlparse(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.capacity)
+        await bucket.acquire()
+
+
+class AsyncSearchEngine:
+    """Submit Affidavit of Value searches concurrently with aiohttp"""
+
+    def __init__(self, url, rate_limiter, timeout=30, concurrency=8, metrics=None):
+        """
+        Initialize the async engine
+
+        Args:
+            url (str): URL of the page containing the search form
+            rate_limiter (HostRateLimiter): Limiter every request goes through
+            timeout (float): Seconds to wait for each HTTP response
+            concurrency (int): Maximum number of open connections
+            metrics (Metrics): Collector for rate limit waits, retries and timeouts (optional)
+        """
+        self.url = url
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.form = None
+        self.session = None
+        self._form_lock = None
+
+    async def open(self):
+        """Create the pooled client session"""
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._form_lock = asyncio.Lock()
+
+    async def close(self):
+        """Close the client session and its connections"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def load_form(self, stale_form=None):
+        """
+        Load the search page and capture its form, cookies and hidden tokens
+
+        Concurrent callers share a single reload: if another task already replaced
+        ``stale_form`` while this one was waiting, nothing is fetched.
+        """
+        async with self._form_lock:
+            if self.form is not None and self.form is not stale_form:
+                return
+            await self._acquire(self.url)
+            async with self.session.get(self.url) as response:
+                response.raise_for_status()
+                page_html = await response.text()
+                self.form = parse_search_form(page_html, str(response.url))
+            logger.info(f"Loaded search form ({self.form['method']} {self.form['action']})")
+
+    async def _submit(self, form, payload):
+        await self._acquire(form['action'])
+        if form['method'] == 'POST':
+            request = self.session.post(form['action'], data=payload)
+        else:
+            request = self.session.get(form['action'], params=payload)
+        try:
+            async with request as response:
+                if response.status >= 400 and response.status not in TOKEN_REJECTED_STATUSES:
+                    response.raise_for_status()
+                return response.status, await response.text(), str(response.url)
+        except asyncio.TimeoutError:
+            self._count('timeouts')
+            raise
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError) as e:
+            raise TransientScrapeError(f"Search request failed: {e!r}") from e
+
+    async def _acquire(self, url):
+        """Wait for the rate limiter, timing the wait when metrics are collected"""
+        if self.metrics is None:
+            await self.rate_limiter.acquire(url)
+            return
+        with self.metrics.span('rate_limit_wait'):
+            await self.rate_limiter.acquire(url)
+
+    def _count(self, counter):
+        if self.metrics is not None:
+            self.metrics.increment(counter)
+
+    async def search(self, book_number, from_date, to_date, property_type):
+        """
+        Run one search and return the raw response page
+
+        Args:
+            book_number (int): Book number to search for
+            from_date (str): Start of the date range (MM/DD/YYYY)
+            to_date (str): End of the date range (MM/DD/YYYY)
+            property_type (str): Visible text of the property type option
+
+        Returns:
+            tuple: (HTML of the results page, URL it was served from, after redirects)
+        """
+        if self.form is None:
+            await self.load_form()
+
+        form = self.form
+        status, page_html, page_url = await self._submit(
+            form, build_search_payload(form, book_number, from_date, to_date, property_type)
+        )
+
+        if status in TOKEN_REJECTED_STATUSES:
+            # Session or form tokens have probably expired, so reload the form once and retry
+            logger.info(f"Search for book {book_number} rejected with HTTP {status}, reloading form")
+            self._count('retries')
+            await self.load_form(stale_form=form)
+            form = self.form
+            status, page_html, page_url = await self._submit(
+                form, build_search_payload(form, book_number, from_date, to_date, property_type)
+            )
+
+        if status in TOKEN_REJECTED_STATUSES:
+            raise SearchFormError(f"Search for book {book_number} rejected with HTTP {status}")
+        return page_html, page_url
+
+    async def fetch(self, url):
+        """
+        Fetch a follow-up page, such as the next page of results
+
+        Returns:
+            tuple: (HTML of the page, URL it was served from, after redirects)
+        """
+        await self._acquire(url)
+        try:
+            async with self.session.get(url) as response:
+                response.raise_for_status()
+                return await response.text(), str(response.url)
+        except asyncio.TimeoutError:
+            self._count('timeouts')
+            raise
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError) as e:
+            raise TransientScrapeError(f"Request for {url} failed: {e!r}") from e
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: results table extraction
+Compares pd.read_html(page_source) with the streaming lxml ResultsTableParser
+on the saved fixture page, scaled up to larger result sets
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tracemalloc
+from io import StringIO
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from results_parser import ResultsTableParser  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'results_page.html')
+
+
+def scaled_page(template, rows):
+    """
+    Build a results page with the requested number of rows by repeating the fixture's rows
+
+    Args:
+        template (str): Fixture page HTML
+        rows (int): Number of result rows wanted
+
+    Returns:
+        str: Page HTML
+    """
+    match = re.search(r'(<tbody>)(.*?)(</tbody>)', template, re.S)
+    fixture_rows = re.findall(r'\s*<tr.*?</tr>', match.group(2), re.S)
+    body = ''.join(fixture_rows[i % len(fixture_rows)] for i in range(rows))
+    return template[:match.start(2)] + body + template[match.end(2):]
+
+
+def read_html_path(page_html):
+    """The scraper's previous extraction: parse every table and take the first"""
+    tables = pd.read_html(StringIO(page_html))
+    return tables[0]
+
+
+def streaming_path(page_html):
+    parser = ResultsTableParser()
+    parser.feed_page(page_html)
+    return parser.to_frame()
+
+
+def streaming_chunked_path(page_bytes):
+    """Streaming parser fed 64 KB at a time, as when reading from the network"""
+    parser = ResultsTableParser()
+    parser.feed_page(page_bytes[i:i + 65536] for i in range(0, len(page_bytes), 65536))
+    return parser.to_frame()
+
+
+def measure(func, arg, repeat):
+    """
+    Run a function several times
+
+    Returns:
+        tuple: (best seconds, peak traced memory in bytes, result of the last run)
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(arg)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    func(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    """Run the benchmark and print a comparison table"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[50, 500, 5000], help='Result set sizes to benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best time is reported)')
+    args = parser.parse_args()
+
+    with open(FIXTURE, encoding='utf-8') as f:
+        template = f.read()
+
+    print("\n" + "=" * 78)
+    print("Results table extraction benchmark")
+    print("=" * 78)
+    print(f"{'rows':>6}  {'page KB':>8}  {'engine':<22}  {'best ms':>9}  {'peak MB':>8}  {'rows out':>8}")
+    print("-" * 78)
+
+    for rows in args.rows:
+        page_html = scaled_page(template, rows)
+        page_bytes = page_html.encode('utf-8')
+        candidates = [
+            ('pd.read_html()[0]', read_html_path, page_html),
+            ('ResultsTableParser', streaming_path, page_html),
+            ('ResultsTableParser 64K', streaming_chunked_path, page_bytes),
+        ]
+        for name, func, arg in candidates:
+            best, peak, df = measure(func, arg, args.repeat)
+            print(f"{rows:>6}  {len(page_bytes) / 1024:>8.0f}  {name:<22}  {best * 1000:>9.1f}  {peak / 1e6:>8.1f}  {len(df):>8}")
+        print("-" * 78)
+
+    print("Note: pd.read_html()[0] is the page's outer layout table, not the results table.")
+    print("=" * 78 + "\n")
+
+
+if __name__ == '__main__':
+    main()
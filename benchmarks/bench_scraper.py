@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark: MohaveScraper against the local fixture site
+Runs each engine and storage combination over the same range of books and
+reports books/min, per-book latency percentiles, peak RSS and CPU time.
+Results are saved as JSON so runs can be compared with --compare
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fixture_server import SEARCH_PATH, add_site_arguments, site_from_args, start_server  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Metrics compared between runs: (key, label, True if higher is better)
+COMPARED = (
+    ('books_per_min', 'books/min', True),
+    ('p50_ms', 'p50 ms', False),
+    ('p95_ms', 'p95 ms', False),
+    ('cpu_s', 'CPU s', False),
+    ('peak_rss_mb', 'RSS MB', False),
+)
+
+
+def run_scenario(scenario):
+    """
+    Scrape the scenario's books in this process and measure it
+
+    Runs in a fresh child process per scenario, so peak RSS and CPU time
+    belong to that scenario alone.
+
+    Args:
+        scenario (dict): url, engine, storage, workers, concurrency, request_interval, first_book, last_book
+
+    Returns:
+        dict: Throughput, latency percentiles, resource use and the scraper's counters
+    """
+    import logging
+    from cli import configure_logging
+    from mohave_scraper import MohaveScraper
+
+    configure_logging(log_file=None, level=logging.INFO if scenario.get('verbose') else logging.WARNING)
+
+    output_dir = tempfile.mkdtemp(prefix='bench-')
+    scraper = MohaveScraper(
+        output_dir=output_dir,
+        from_date='01/01/2010',
+        to_date='12/31/2025',
+        property_type='Vacant Land',
+        workers=scenario['workers'],
+        request_interval=scenario['request_interval'],
+        engine=scenario['engine'],
+        url=scenario['url'],
+        concurrency=scenario['concurrency'],
+        resume=False,
+        storage=scenario['storage'],
+        retry_delay=scenario['retry_delay'],
+    )
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    try:
+        success_count, fail_count = scraper.scrape_range(scenario['first_book'], scenario['last_book'])
+    finally:
+        scraper.close()
+    elapsed = time.perf_counter() - started
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+
+    summary = scraper.metrics.summary()
+    book_phase = summary['phases'].get('scrape_book', {})
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    rss_scale = 1 if sys.platform == 'darwin' else 1024
+    books = success_count + fail_count
+    return {
+        'books': books,
+        'succeeded': success_count,
+        'failed': fail_count,
+        'rows': summary['counters'].get('rows', 0),
+        'elapsed_s': elapsed,
+        'books_per_min': books / elapsed * 60 if elapsed else 0.0,
+        'p50_ms': book_phase.get('p50', 0.0) * 1000,
+        'p95_ms': book_phase.get('p95', 0.0) * 1000,
+        'p99_ms': book_phase.get('p99', 0.0) * 1000,
+        'cpu_s': (usage.ru_utime - usage_before.ru_utime) + (usage.ru_stime - usage_before.ru_stime),
+        'peak_rss_mb': usage.ru_maxrss * rss_scale / 1e6,
+        'retries': summary['counters'].get('book_retries', 0),
+        'counters': summary['counters'],
+    }
+
+
+def spawn_scenario(scenario):
+    """Run one scenario in a child process and return its result"""
+    workdir = tempfile.mkdtemp(prefix='bench-run-')
+    # The child runs in a scratch directory so its output stays out of the tree
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--scenario', json.dumps(scenario)],
+        cwd=workdir, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr)
+        raise RuntimeError(f"Scenario {scenario['name']} failed with exit code {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    """Commit hash of the working tree, with a + suffix if it has local changes"""
+    root = os.path.dirname(BENCH_DIR)
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('+' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(run):
+    print("\n" + "=" * 100)
+    print(f"Scraper benchmark  {run['created_at']}  commit {run['commit']}  {run['config']['books']} books")
+    print("=" * 100)
+    print(f"{'scenario':<22}  {'books/min':>9}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  "
+          f"{'CPU s':>7}  {'RSS MB':>7}  {'rows':>7}  {'failed':>6}")
+    print("-" * 100)
+    for scenario in run['scenarios']:
+        r = scenario['result']
+        print(f"{scenario['name']:<22}  {r['books_per_min']:>9.1f}  {r['p50_ms']:>8.1f}  {r['p95_ms']:>8.1f}  "
+              f"{r['p99_ms']:>8.1f}  {r['cpu_s']:>7.2f}  {r['peak_rss_mb']:>7.1f}  {r['rows']:>7}  {r['failed']:>6}")
+    print("=" * 100 + "\n")
+
+
+def print_comparison(run, baseline):
+    """Print the change of each compared metric against a previous run's matching scenarios"""
+    previous = {scenario['name']: scenario['result'] for scenario in baseline['scenarios']}
+    print(f"Compared with {baseline['created_at']} (commit {baseline['commit']})")
+    print("-" * 100)
+    print(f"{'scenario':<22}" + ''.join(f"  {label:>16}" for _, label, _ in COMPARED))
+    for scenario in run['scenarios']:
+        before = previous.get(scenario['name'])
+        if before is None:
+            print(f"{scenario['name']:<22}  (not in baseline)")
+            continue
+        cells = []
+        for key, _, higher_is_better in COMPARED:
+            old, new = before[key], scenario['result'][key]
+            change = (new - old) / old * 100 if old else 0.0
+            better = change > 0 if higher_is_better else change < 0
+            cells.append(f"  {f'{change:+.1f}%' + (' better' if better and abs(change) >= 1 else ''):>16}")
+        print(f"{scenario['name']:<22}" + ''.join(cells))
+    print("-" * 100 + "\n")
+
+
+def main():
+    """Run the benchmark, print the results and save them"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--engines', nargs='+', choices=('http', 'async', 'selenium'), default=['http', 'async'],
+                        help='Engines to benchmark (selenium needs Chrome)')
+    parser.add_argument('--storage', nargs='+', choices=('csv', 'parquet'), default=['csv'],
+                        help='Storage backends to benchmark')
+    parser.add_argument('--books', type=int, default=30, help='Books scraped per scenario')
+    parser.add_argument('--first-book', type=int, default=200, help='First book number')
+    parser.add_argument('--workers', type=int, default=4, help='Workers of the http and selenium engines')
+    parser.add_argument('--concurrency', type=int, default=8, help='Searches in flight with the async engine')
+    parser.add_argument('--request-interval', type=float, default=0.01, help='Scraper request interval in seconds')
+    parser.add_argument('--retry-delay', type=float, default=1.0, help='Seconds before the first retry round')
+    add_site_arguments(parser)
+    parser.add_argument('--label', help='Name appended to the results file')
+    parser.add_argument('--results-dir', default=RESULTS_DIR, help='Directory the results are saved in')
+    parser.add_argument('--compare', metavar='RESULTS_JSON', help='Previous results file to compare with')
+    parser.add_argument('--no-save', action='store_true', help='Do not save the results')
+    parser.add_argument('--verbose', action='store_true', help='Show the scraper log')
+    parser.add_argument('--scenario', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(json.loads(args.scenario))))
+        return 0
+
+    site = site_from_args(args)
+    server = start_server(site)
+    url = f"http://127.0.0.1:{server.server_port}{SEARCH_PATH}"
+    config = {
+        key: value for key, value in vars(args).items()
+        if key not in ('scenario', 'label', 'results_dir', 'compare', 'no_save', 'verbose')
+    }
+
+    run = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config,
+        'scenarios': [],
+    }
+
+    try:
+        for engine in args.engines:
+            for storage in args.storage:
+                workers = 1 if engine == 'async' else args.workers
+                name = f"{engine}-{storage}" + (f"-w{workers}" if engine != 'async' else f"-c{args.concurrency}")
+                scenario = {
+                    'name': name, 'url': url, 'engine': engine, 'storage': storage, 'workers': workers,
+                    'concurrency': args.concurrency, 'request_interval': args.request_interval,
+                    'retry_delay': args.retry_delay,
+                    'first_book': args.first_book, 'last_book': args.first_book + args.books - 1,
+                    'verbose': args.verbose,
+                }
+                print(f"Running {name}...", flush=True)
+                requests_before = site.stats()
+                result = spawn_scenario(scenario)
+                requests_after = site.stats()
+                result['server'] = {key: requests_after[key] - requests_before[key] for key in requests_after}
+                run['scenarios'].append({'name': name, 'engine': engine, 'storage': storage, 'workers': workers,
+                                         'result': result})
+    finally:
+        server.shutdown()
+
+    print_results(run)
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(run, json.load(f))
+
+    if not args.no_save:
+        os.makedirs(args.results_dir, exist_ok=True)
+        suffix = f"-{args.label}" if args.label else ''
+        path = os.path.join(args.results_dir, f"bench-{datetime.now():%Y%m%d-%H%M%S}{suffix}.json")
+        with open(path, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"Saved results to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Mohave County Affidavit of Value search
+Serves the search form and paginated results pages shaped like the real site,
+with configurable latency, result sizes, pagination, error and empty-book rates,
+so the scraper can be benchmarked end to end without touching the county's server
+"""
+
+import sys
+import json
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlencode, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Path of the search form, as on the real site
+SEARCH_PATH = '/departments/assessor/affidavit-of-value-search/'
+
+# Path of the JSON request counters (not part of the real site)
+STATS_PATH = '/__stats'
+
+# Property type option values and labels offered by the form
+PROPERTY_TYPES = (('01', 'Vacant Land'), ('02', 'Residential'), ('03', 'Commercial'))
+
+RESULT_COLUMNS = (
+    'Affidavit Number', 'Parcel Number', 'Sale Date', 'Sale Price', 'Acres',
+    'Situs Address', 'Buyer', 'Seller', 'Property Type',
+)
+
+# Sale dates of the generated affidavits
+SALES_START = datetime(2010, 1, 1)
+SALES_END = datetime(2025, 12, 31)
+
+STREETS = ('Pierce Ferry Rd', 'Oatman Rd', 'Chloride Rd', 'Shinarump Dr', 'Stockton Hill Rd', 'Hualapai Mountain Rd')
+NAMES = (
+    'SMITH JOHN', 'GARCIA MARIA', 'LEE DAVID', 'RIVERA ANA', 'BROWN ROBERT & LINDA',
+    'JOHNSON FAMILY TRUST', 'KINGMAN RANCH INVESTORS', 'DESERT SKY LLC',
+)
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Affidavit of Value Search | Mohave County</title>
+</head>
+<body>
+  <table class="layout" width="100%">
+    <tr>
+      <td class="nav">
+        <table class="menu">
+          <tr><td><a href="/">Home</a></td></tr>
+          <tr><td><a href="/departments/assessor/">Assessor</a></td></tr>
+        </table>
+      </td>
+      <td class="content">
+        <h1>Affidavit of Value Search</h1>
+        <form method="post" action="{action}">
+          <input type="hidden" name="__RequestVerificationToken" value="{token}">
+          <label>From <input type="text" name="fromDate" id="fromDate" value=""></label>
+          <label>To <input type="text" name="toDate" id="toDate" value=""></label>
+          <label>Property Type
+            <select name="propertyTypeCode" id="propertyTypeCode">
+              <option value="">All</option>
+{options}
+            </select>
+          </label>
+          <label>Book <input type="text" name="book" id="book" value=""></label>
+          <input type="submit" value="Search">
+        </form>
+{content}
+      </td>
+    </tr>
+  </table>
+  <footer><p>&copy; Mohave County, Arizona</p></footer>
+</body>
+</html>
+"""
+
+
+class FixtureSite:
+    """
+    Behaviour of the stand-in site
+
+    Every book's result set is derived from the seed and the book number, so a
+    book has the same rows on every run and in every engine. Errors are drawn
+    per request.
+    """
+
+    def __init__(self, latency=0.05, jitter=0.0, min_rows=20, max_rows=200, page_size=100,
+                 error_rate=0.0, error_status=503, empty_rate=0.1, row_cap=None, seed=0, token='fixture-token'):
+        """
+        Args:
+            latency (float): Seconds every response is delayed by
+            jitter (float): Extra random delay of up to this many seconds
+            min_rows (int): Fewest result rows of a book with results
+            max_rows (int): Most result rows of a book with results
+            page_size (int): Rows per results page; larger books get a Next link
+            error_rate (float): Fraction of searches and page requests answered with an error
+            error_status (int): HTTP status of the injected errors
+            empty_rate (float): Fraction of books with no results
+            row_cap (int): Most rows a search returns; the summary still reports the full count,
+                as sites that truncate large result sets do
+            seed (int): Seed of the generated result sets
+            token (str): Hidden form token every search must send back
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.page_size = page_size
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.empty_rate = empty_rate
+        self.row_cap = row_cap
+        self.seed = seed
+        self.token = token
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {'form_loads': 0, 'searches': 0, 'pages': 0, 'errors': 0, 'rejected': 0, 'bytes': 0}
+
+    def delay(self):
+        """Seconds to hold the next response"""
+        with self._lock:
+            return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def fails(self):
+        """Whether the next request gets an injected error"""
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def count(self, counter, amount=1):
+        with self._lock:
+            self._stats[counter] += amount
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def rows(self, book_number, from_date, to_date, property_type):
+        """
+        The result rows of one book within a date window
+
+        A book's sales are fixed by the seed and book number, and a search returns
+        the ones dated inside its window, so narrower windows return subsets.
+
+        Returns:
+            list: One tuple of cell texts per row, in sale date order (empty for books without results)
+        """
+        rng = random.Random(f"{self.seed}:{book_number}")
+        if rng.random() < self.empty_rate:
+            return []
+
+        start = _parse_date(from_date, SALES_START)
+        end = _parse_date(to_date, SALES_END)
+        label = dict(PROPERTY_TYPES).get(property_type, 'Vacant Land')
+
+        rows = []
+        for i in range(rng.randint(self.min_rows, max(self.min_rows, self.max_rows))):
+            sale_date = SALES_START + timedelta(days=rng.randint(0, (SALES_END - SALES_START).days))
+            acres = round(rng.uniform(0.1, 40), 2)
+            row = (
+                f"{book_number:03d}{i:07d}",
+                f"{book_number:03d}-{rng.randint(10, 99)}-{rng.randint(100, 999)}",
+                sale_date.strftime('%m/%d/%Y'),
+                f"${int(acres * rng.randint(2, 12)) * 500 + 1000:,}",
+                f"{acres:.2f}",
+                f"{rng.randint(1000, 99999)} {rng.choice(STREETS)}",
+                rng.choice(NAMES),
+                rng.choice(NAMES),
+                label,
+            )
+            if start <= sale_date <= end:
+                rows.append((sale_date, row))
+        return [row for _, row in sorted(rows)]
+
+    def form_page(self):
+        return self._page('')
+
+    def results_page(self, query, page):
+        """
+        One page of results for a search
+
+        Args:
+            query (dict): book, fromDate, toDate and propertyTypeCode of the search
+            page (int): Page number, from 1
+
+        Returns:
+            str: Page HTML
+        """
+        rows = self.rows(int(query['book']), query.get('fromDate'), query.get('toDate'), query.get('propertyTypeCode'))
+        if not rows:
+            return self._page('        <p class="summary">No records found</p>')
+
+        total = len(rows)
+        if self.row_cap is not None:
+            rows = rows[:self.row_cap]
+        pages = max(1, -(-len(rows) // self.page_size))
+        first = (page - 1) * self.page_size
+        shown = rows[first:first + self.page_size]
+
+        lines = [
+            f'        <p class="summary">Showing {first + 1} - {first + len(shown)} of {total} affidavits</p>',
+            '        <table id="results" class="results-grid">',
+            '          <thead><tr>' + ''.join(f'<th>{c}</th>' for c in RESULT_COLUMNS) + '</tr></thead>',
+            '          <tbody>',
+        ]
+        for n, row in enumerate(shown):
+            cells = [f'<td>{cell}</td>' for cell in row]
+            cells[1] = f'<td><a href="/parcel?apn={row[1]}">{row[1]}</a></td>'
+            lines.append(f'      <tr class="{"alt-row" if n % 2 else "row"}">' + ''.join(cells) + '</tr>')
+        if page < pages:
+            link = SEARCH_PATH + 'results?' + urlencode(dict(query, page=page + 1))
+            lines.append(f'      <tr class="pager"><td colspan="{len(RESULT_COLUMNS)}"><a href="{link}">Next</a></td></tr>')
+        lines.extend(['          </tbody>', '        </table>'])
+        return self._page('\n'.join(lines))
+
+    def _page(self, content):
+        options = '\n'.join(f'              <option value="{value}">{label}</option>' for value, label in PROPERTY_TYPES)
+        return PAGE_TEMPLATE.format(action=SEARCH_PATH, token=self.token, options=options, content=content)
+
+
+def _parse_date(value, default):
+    try:
+        return datetime.strptime(value, '%m/%d/%Y')
+    except (TypeError, ValueError):
+        return default
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Request handler; the site is taken from ``self.server.site``"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        site = self.server.site
+        url = urlparse(self.path)
+        if url.path == STATS_PATH:
+            return self._send(200, json.dumps(site.stats()), 'application/json', delay=False)
+
+        if url.path == SEARCH_PATH + 'results':
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if 'book' not in query:
+                return self._send(400, 'Missing book')
+            if site.fails():
+                site.count('errors')
+                return self._send(site.error_status, 'Service Unavailable')
+            site.count('pages')
+            return self._send(200, site.results_page(query, int(query.pop('page', 1))))
+
+        site.count('form_loads')
+        self._send(200, site.form_page())
+
+    def do_POST(self):
+        site = self.server.site
+        length = int(self.headers.get('Content-Length') or 0)
+        query = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+
+        if query.get('__RequestVerificationToken') != site.token:
+            site.count('rejected')
+            return self._send(403, 'Invalid verification token')
+        if not query.get('book', '').strip().isdigit():
+            return self._send(200, site._page('        <p class="summary">No records found</p>'))
+        if site.fails():
+            site.count('errors')
+            return self._send(site.error_status, 'Service Unavailable')
+
+        site.count('searches')
+        self._send(200, site.results_page(
+            {key: query.get(key, '') for key in ('book', 'fromDate', 'toDate', 'propertyTypeCode')}, 1
+        ))
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8', delay=True):
+        if delay:
+            seconds = self.server.site.delay()
+            if seconds > 0:
+                threading.Event().wait(seconds)
+        data = body.encode('utf-8')
+        self.server.site.count('bytes', len(data))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        if status in (429, 503):
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_server(site, host='127.0.0.1', port=0):
+    """
+    Serve a fixture site on a background thread
+
+    Args:
+        site (FixtureSite): Site behaviour
+        host (str): Interface to listen on
+        port (int): Port to listen on (0 picks a free one)
+
+    Returns:
+        ThreadingHTTPServer: The running server; its search form is at
+        ``http://<host>:<server.server_port>`` + SEARCH_PATH. Call ``shutdown()`` to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    server.site = site
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_site_arguments(parser):
+    """Add the FixtureSite options to an argument parser"""
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds every response is delayed by')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random delay of up to this many seconds')
+    parser.add_argument('--rows', type=int, nargs=2, default=[20, 200], metavar=('MIN', 'MAX'),
+                        help='Range of result rows per book')
+    parser.add_argument('--page-size', type=int, default=100, help='Result rows per page')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with an error')
+    parser.add_argument('--error-status', type=int, default=503, help='HTTP status of injected errors')
+    parser.add_argument('--empty-rate', type=float, default=0.1, help='Fraction of books without results')
+    parser.add_argument('--row-cap', type=int, help='Most rows a search returns (the rest are silently left out)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generated result sets')
+
+
+def site_from_args(args):
+    """Build a FixtureSite from options added by add_site_arguments"""
+    return FixtureSite(
+        latency=args.latency, jitter=args.jitter, min_rows=args.rows[0], max_rows=args.rows[1],
+        page_size=args.page_size, error_rate=args.error_rate, error_status=args.error_status,
+        empty_rate=args.empty_rate, row_cap=args.row_cap, seed=args.seed,
+    )
+
+
+def main():
+    """Run the fixture site in the foreground"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8800, help='Port to listen on (0 picks a free one)')
+    add_site_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_server(site_from_args(args), args.host, args.port)
+    # The first line is read by bench_scraper.py to find the URL
+    print(f"http://{args.host}:{server.server_port}{SEARCH_PATH}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
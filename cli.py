@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Command line entry point for the scraper and its tools
+One command with scrape, combine, upload, query and status subcommands. Only
+the standard library is loaded up front; each subcommand imports what it needs
+when it runs, so status and query start quickly and an HTTP scrape never loads
+Selenium
+"""
+
+import os
+import sys
+import logging
+import argparse
+
+logger = logging.getLogger(__name__)
+
+# File the scrape, combine and upload commands log to, next to the console
+LOG_FILE = 'scraper.log'
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Commands that only read local state; they log warnings to the console and nothing to the log file
+QUICK_COMMANDS = ('query', 'status')
+
+
+def configure_logging(log_file=LOG_FILE, level=logging.INFO):
+    """
+    Send log records to the console and, if given, a log file
+
+    Called by the command line entry points rather than at import time, so
+    importing the scraper modules never creates a log file.
+
+    Args:
+        log_file (str): File to append the log to (optional, console only if not provided)
+        level (int): Lowest level logged
+    """
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
+
+
+def run_scrape(args):
+    """Scrape a range of books, then rebuild the combined file"""
+    from mohave_scraper import SEARCH_URL, MohaveScraper
+
+    scraper = MohaveScraper(
+        output_dir=args.output_dir, from_date=args.from_date, to_date=args.to_date, property_type=args.property_type,
+        workers=args.workers, request_interval=args.request_interval, engine=args.engine, url=args.url or SEARCH_URL,
+        concurrency=args.concurrency, resume=not args.no_resume, incremental=args.incremental,
+        cache_dir=args.cache_dir, storage=args.storage, query_db=args.query_db,
+    )
+    combine = not args.no_combine
+    if args.upload_folder or args.pipeline:
+        uploader = None
+        if args.upload_folder:
+            from upload_to_drive import DriveUploader
+
+            uploader = DriveUploader(folder_id=args.upload_folder)
+        success, failed = scraper.scrape_pipeline(args.first_book, args.last_book, uploader=uploader, combine=combine)
+    else:
+        # Runs the async engine on its own event loop too, and writes the run's metrics for every engine
+        success, failed = scraper.scrape_range(args.first_book, args.last_book)
+        if combine:
+            scraper.create_combined_file()
+
+    print(f"Scraped books {args.first_book} to {args.last_book}: {success} succeeded, {failed} failed")
+    print(f"Property type: {scraper.property_type}, date range: {scraper.from_date} to {scraper.to_date}")
+    print(f"Output directory: {scraper.output_dir}")
+    return 1 if failed else 0
+
+
+def run_combine(args):
+    """Rebuild the combined CSV of every saved book"""
+    from storage import open_storage
+    from combine import COMBINED_FILENAME, combine_books
+
+    filepath = os.path.join(args.output_dir, COMBINED_FILENAME)
+    rows = combine_books(open_storage(args.storage, args.output_dir), filepath, incremental=not args.full)
+    if rows is None:
+        print(f"No saved books in {args.output_dir}")
+        return 1
+    print(f"Combined {rows} rows into {filepath}")
+    return 0
+
+
+def run_upload(args):
+    """Sync the scraped CSV files to the Google Drive folder"""
+    from upload_to_drive import DriveUploader
+
+    try:
+        uploader = DriveUploader(folder_id=args.folder_id, workers=args.workers)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        print("See upload_to_drive.py for the Google Drive API setup")
+        return 1
+    counts = uploader.sync_directory(args.source_dir)
+    print(f"Uploaded {counts['created']} new and {counts['updated']} changed files, "
+          f"skipped {counts['unchanged']} unchanged, {counts['failed']} failed")
+    return 1 if counts['failed'] else 0
+
+
+def run_query(args, query_args):
+    """Look up parcels and comparable sales; the arguments are those of query_store.py"""
+    import query_store
+
+    return query_store.main(query_args)
+
+
+def run_status(args):
+    """Print the run manifest's book counts and failures, and the work queue's state if there is one"""
+    from manifest import RunManifest, STATUS_FAILED
+
+    manifest_path = os.path.join(args.output_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        print(f"No run manifest in {args.output_dir}")
+    else:
+        manifest = RunManifest(manifest_path)
+        counts = manifest.summary()
+        rows = sum(entry.get('rows') or 0 for entry in manifest.books.values())
+        print(f"Books: {', '.join(f'{status} {count}' for status, count in sorted(counts.items())) or 'none'} "
+              f"({rows} rows saved)")
+        updated = max((entry['updated_at'] for entry in manifest.books.values() if 'updated_at' in entry), default=None)
+        if updated:
+            print(f"Last update: {updated}")
+        for book, entry in sorted(manifest.books.items(), key=lambda item: int(item[0])):
+            if entry['status'] == STATUS_FAILED:
+                print(f"  book {book} ({entry.get('failure', 'failed')}): {entry.get('error')}")
+
+    queue_db = args.queue_db or os.path.join(args.output_dir, 'queue.db')
+    if os.path.exists(queue_db):
+        from work_queue import WorkQueue
+
+        work_queue = WorkQueue(queue_db)
+        try:
+            units = work_queue.status()
+            print(f"Work queue: {', '.join(f'{status} {count}' for status, count in sorted(units.items())) or 'empty'}")
+        finally:
+            work_queue.close()
+    return 0
+
+
+def build_parser():
+    """Argument parser of every subcommand"""
+    parser = argparse.ArgumentParser(description='Scrape Mohave County affidavits of value and work with the results')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    logged = argparse.ArgumentParser(add_help=False)
+    logged.add_argument('--log-file', default=LOG_FILE, help='File to log to as well as the console (empty for none)')
+
+    scrape = commands.add_parser('scrape', parents=[logged], help='Scrape a range of books')
+    scrape.add_argument('--first-book', type=int, default=100)
+    scrape.add_argument('--last-book', type=int, default=410)
+    scrape.add_argument('--from-date', default='01/01/2010', help='Start date (MM/DD/YYYY)')
+    scrape.add_argument('--to-date', default='10/31/2025', help='End date (MM/DD/YYYY)')
+    scrape.add_argument('--property-type', default='Vacant Land')
+    scrape.add_argument('--engine', choices=('selenium', 'http', 'async'), default='selenium',
+                        help='http and async do not load Selenium unless a search has to fall back to the browser')
+    scrape.add_argument('--workers', type=int, default=1, help='Books scraped at a time (selenium and http)')
+    scrape.add_argument('--concurrency', type=int, default=8, help='Requests in flight (async)')
+    scrape.add_argument('--request-interval', type=float, default=2.0, help='Minimum seconds between searches')
+    scrape.add_argument('--storage', choices=('csv', 'parquet'), default='csv')
+    scrape.add_argument('--output-dir', default='scraped_data')
+    scrape.add_argument('--cache-dir', help='Response cache directory')
+    scrape.add_argument('--query-db', help='SQLite query store to index saved books in')
+    scrape.add_argument('--incremental', action='store_true', help='Only query dates after each book\'s last covered date')
+    scrape.add_argument('--no-resume', action='store_true', help='Scrape books the run manifest lists as complete again')
+    scrape.add_argument('--pipeline', action='store_true', help='Overlap searching and saving')
+    scrape.add_argument('--upload-folder', help='Google Drive folder ID to upload each saved book to (implies --pipeline)')
+    scrape.add_argument('--no-combine', action='store_true', help='Do not rebuild the combined file')
+    scrape.add_argument('--url', help='Search page URL (optional, the county\'s search page if not provided)')
+
+    combine = commands.add_parser('combine', parents=[logged], help='Rebuild the combined CSV of every saved book')
+    combine.add_argument('--output-dir', default='scraped_data')
+    combine.add_argument('--storage', choices=('csv', 'parquet'), default='csv')
+    combine.add_argument('--full', action='store_true', help='Rewrite the whole file instead of only the changed books')
+
+    upload = commands.add_parser('upload', parents=[logged], help='Sync the scraped CSV files to Google Drive')
+    upload.add_argument('--folder-id', required=True, help='Google Drive folder ID from the folder URL')
+    upload.add_argument('--source-dir', default='scraped_data')
+    upload.add_argument('--workers', type=int, default=4, help='Concurrent uploads')
+
+    # Everything after "query" is handed to query_store.py's own parser
+    commands.add_parser('query', add_help=False, help='Query the local store (see "query --help")')
+
+    status = commands.add_parser('status', help='Show which books are done, empty or failed')
+    status.add_argument('--output-dir', default='scraped_data')
+    status.add_argument('--queue-db', help='Work queue database (optional, queue.db in the output directory if it exists)')
+    return parser
+
+
+def validate_scrape(parser, args):
+    """Reject scrape options that cannot be combined, before anything is loaded or scraped"""
+    if args.engine == 'async' and (args.pipeline or args.upload_folder):
+        parser.error("--pipeline and --upload-folder run the selenium and http engines, not async")
+    if args.upload_folder and args.storage != 'csv':
+        parser.error("--upload-folder needs --storage csv")
+
+
+COMMANDS = {
+    'scrape': run_scrape,
+    'combine': run_combine,
+    'upload': run_upload,
+    'status': run_status,
+}
+
+
+def main(argv=None):
+    """Run one subcommand"""
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command != 'query' and extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.command == 'scrape':
+        validate_scrape(parser, args)
+
+    if args.command in QUICK_COMMANDS:
+        configure_logging(log_file=None, level=logging.WARNING)
+    else:
+        configure_logging(log_file=args.log_file or None)
+
+    if args.command == 'query':
+        return run_query(args, extra)
+    return COMMANDS[args.command](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
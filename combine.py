@@ -0,0 +1,172 @@
+"""
+Streaming builder for the combined CSV of all scraped books
+Writes books in book-number order a chunk at a time, and on later runs only
+re-encodes the books that changed since the previous combine
+"""
+
+import os
+import json
+import logging
+import tempfile
+
+import pandas as pd
+
+from manifest import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Name of the combined file in the output directory
+COMBINED_FILENAME = 'all_books_combined.csv'
+
+# Rows read from a book per step, which bounds memory use regardless of book size
+COMBINE_CHUNK_ROWS = 50000
+
+# Bytes copied per step when reusing unchanged sections of the previous combined file
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def combine_books(storage, filepath, chunk_rows=COMBINE_CHUNK_ROWS, incremental=True):
+    """
+    Write every saved book to one CSV file
+
+    Books are written in ascending book number order, with the union of all
+    books' columns (in the order they first appear); a book without some column
+    gets empty values for it. The byte range, row count and signature of each
+    book's section are kept in ``<filepath>.state.json``. On the next call,
+    with ``incremental`` set:
+
+    - nothing is written if no book changed
+    - books newer than the last combined book are appended to the file
+    - otherwise a new file is spliced together, copying the sections of
+      unchanged books byte for byte and re-encoding only the changed ones
+
+    Args:
+        storage (CsvStorage | ParquetStorage): Backend holding the books
+        filepath (str): Combined CSV path
+        chunk_rows (int): Rows read from a book per step
+        incremental (bool): Reuse the previous combined file where possible
+
+    Returns:
+        int: Number of rows in the combined file, or None if there were no books
+    """
+    books = storage.books()
+    if not books:
+        return None
+
+    state_path = filepath + '.state.json'
+    previous = _load_state(state_path, filepath) if incremental else None
+    previous_books = {entry['book']: entry for entry in previous['books']} if previous else {}
+
+    signatures = {book: storage.signature(book) for book in books}
+    unchanged = {
+        book for book in books
+        if book in previous_books and previous_books[book]['signature'] == signatures[book]
+    }
+
+    columns = []
+    book_columns = {}
+    for book in books:
+        book_columns[book] = previous_books[book]['columns'] if book in unchanged else storage.columns(book)
+        columns.extend(column for column in book_columns[book] if column not in columns)
+
+    if previous and previous['columns'] != columns:
+        logger.info("Combined columns changed, rewriting the whole file")
+        previous, previous_books, unchanged = None, {}, set()
+
+    if previous and len(unchanged) == len(books) == len(previous_books):
+        logger.info(f"Combined file is up to date ({len(books)} books)")
+        return sum(entry['rows'] for entry in previous['books'])
+
+    kept = [previous_books[book] for book in books if book in unchanged]
+    appendable = (
+        previous is not None
+        and previous['books']
+        and kept == previous['books']
+        and all(book > previous['books'][-1]['book'] for book in books if book not in unchanged)
+    )
+
+    if appendable:
+        entries = list(previous['books'])
+        with open(filepath, 'r+b') as out:
+            out.seek(previous['size'])
+            out.truncate()
+            for book in books[len(entries):]:
+                entries.append(_write_book(storage, book, out, columns, book_columns[book], signatures[book], chunk_rows))
+            size = out.tell()
+        logger.info(f"Appended {len(books) - len(kept)} books to {filepath}")
+    else:
+        directory = os.path.dirname(os.path.abspath(filepath))
+        fd, tmp_path = tempfile.mkstemp(prefix='.combined-', suffix='.csv', dir=directory)
+        try:
+            entries = []
+            source = open(filepath, 'rb') if unchanged else None
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    out.write(_csv_line(columns))
+                    for book in books:
+                        if book in unchanged:
+                            entries.append(_copy_section(source, out, previous_books[book]))
+                        else:
+                            entries.append(
+                                _write_book(storage, book, out, columns, book_columns[book], signatures[book], chunk_rows)
+                            )
+                    size = out.tell()
+            finally:
+                if source:
+                    source.close()
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.info(f"Wrote {len(books)} books to {filepath} ({len(books) - len(unchanged)} re-encoded)")
+
+    atomic_write_json(state_path, {'columns': columns, 'size': size, 'books': entries})
+    return sum(entry['rows'] for entry in entries)
+
+
+def _load_state(state_path, filepath):
+    """Load the previous combine's state, or None if it does not describe the current file"""
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+        if os.path.getsize(filepath) != state['size']:
+            logger.warning(f"{filepath} was modified since it was combined, rewriting it")
+            return None
+        return state
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _csv_line(values):
+    """Encode a header row the way pandas writes CSV headers"""
+    return pd.DataFrame(columns=values).to_csv(index=False).encode('utf-8')
+
+
+def _write_book(storage, book, out, columns, book_columns, signature, chunk_rows):
+    """Re-encode one book into the combined file, returning its section entry"""
+    offset = out.tell()
+    rows = 0
+    for chunk in storage.iter_chunks(book, chunk_rows):
+        if list(chunk.columns) != columns:
+            chunk = chunk.reindex(columns=columns)
+        out.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+        rows += len(chunk)
+    return {
+        'book': book, 'offset': offset, 'length': out.tell() - offset, 'rows': rows,
+        'signature': signature, 'columns': book_columns,
+    }
+
+
+def _copy_section(source, out, entry):
+    """Copy an unchanged book's section from the previous combined file, returning its new entry"""
+    offset = out.tell()
+    source.seek(entry['offset'])
+    remaining = entry['length']
+    while remaining:
+        data = source.read(min(COPY_BUFFER_SIZE, remaining))
+        if not data:
+            raise OSError(f"Previous combined file ends inside book {entry['book']}")
+        out.write(data)
+        remaining -= len(data)
+    return dict(entry, offset=offset)
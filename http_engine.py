@@ -0,0 +1,253 @@
+"""
+Browserless search engine for the Affidavit of Value Search
+Replays the search form submission over HTTP using a pooled keep-alive session
+"""
+
+import logging
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import html as lxml_html
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Logical search fields and the name/id the site uses for them
+SEARCH_FIELDS = {
+    'from_date': 'fromDate',
+    'to_date': 'toDate',
+    'property_type': 'propertyTypeCode',
+    'book': 'book',
+}
+
+# Status codes a server typically returns when a session or form token has expired
+TOKEN_REJECTED_STATUSES = (400, 401, 403, 419, 440)
+
+
+class SearchFormError(Exception):
+    """Raised when the search form cannot be found or the site rejects a submission"""
+
+
+def parse_search_form(page_html, base_url):
+    """
+    Extract everything needed to replay the search form
+
+    Args:
+        page_html (str): HTML of the page containing the search form
+        base_url (str): URL the page was loaded from, used to resolve the form action
+
+    Returns:
+        dict: ``action`` and ``method`` of the form, ``fields`` with the default value
+        of every successful control (including hidden and session tokens), ``names``
+        mapping each logical search field to its control name, and ``options`` mapping
+        each select's name to a {visible text: value} dict
+    """
+    doc = lxml_html.fromstring(page_html)
+
+    forms = doc.xpath('//form[.//*[@name="book" or @id="book"]]') or doc.xpath('//form')
+    if not forms:
+        raise SearchFormError("No search form found on the page")
+    form = forms[0]
+
+    fields = {}
+    options = {}
+    submit_added = False
+
+    for control in form.xpath('.//input[@name] | .//select[@name] | .//textarea[@name]'):
+        name = control.get('name')
+
+        if control.tag == 'select':
+            choices = {}
+            selected = None
+            for option in control.xpath('.//option'):
+                text = option.text_content().strip()
+                value = option.get('value', text)
+                choices[text] = value
+                if selected is None or option.get('selected') is not None:
+                    selected = value
+            options[name] = choices
+            fields[name] = selected or ''
+            continue
+
+        if control.tag == 'textarea':
+            fields[name] = control.text_content()
+            continue
+
+        input_type = (control.get('type') or 'text').lower()
+        if input_type in ('submit', 'image', 'button'):
+            # Browsers send the name/value of the button that was clicked
+            if input_type == 'submit' and not submit_added:
+                fields[name] = control.get('value', '')
+                submit_added = True
+            continue
+        if input_type in ('reset', 'file'):
+            continue
+        if input_type in ('checkbox', 'radio') and control.get('checked') is None:
+            continue
+        fields[name] = control.get('value', 'on' if input_type in ('checkbox', 'radio') else '')
+
+    names = {}
+    for key, default_name in SEARCH_FIELDS.items():
+        matches = form.xpath('.//*[@name=$name or @id=$name]', name=default_name)
+        names[key] = matches[0].get('name', default_name) if matches else default_name
+
+    return {
+        'action': urljoin(base_url, form.get('action') or base_url),
+        'method': (form.get('method') or 'get').upper(),
+        'fields': fields,
+        'names': names,
+        'options': options,
+    }
+
+
+def build_search_payload(form, book_number, from_date, to_date, property_type):
+    """
+    Build the payload for one search from a parsed form
+
+    Args:
+        form (dict): Form description returned by parse_search_form
+        book_number (int): Book number to search for
+        from_date (str): Start of the date range (MM/DD/YYYY)
+        to_date (str): End of the date range (MM/DD/YYYY)
+        property_type (str): Visible text of the property type option
+
+    Returns:
+        dict: Field name to value, starting from the form's own defaults
+    """
+    names = form['names']
+    payload = dict(form['fields'])
+    payload[names['from_date']] = from_date
+    payload[names['to_date']] = to_date
+    payload[names['book']] = str(book_number)
+
+    # The dropdown is selected by its visible text, but the server expects the option value
+    choices = form['options'].get(names['property_type'], {})
+    value = choices.get(property_type)
+    if value is None:
+        lowered = {text.lower(): v for text, v in choices.items()}
+        value = lowered.get(property_type.lower())
+    if value is None:
+        if choices:
+            logger.warning(f"Property type '{property_type}' is not one of the form options, sending it as-is")
+        value = property_type
+    payload[names['property_type']] = value
+
+    return payload
+
+
+class HttpSearchEngine:
+    """Submit Affidavit of Value searches directly over HTTP"""
+
+    def __init__(self, url, timeout=30, pool_size=10, session=None, metrics=None):
+        """
+        Initialize the HTTP engine
+
+        Args:
+            url (str): URL of the page containing the search form
+            timeout (float): Seconds to wait for each HTTP response
+            pool_size (int): Number of keep-alive connections to keep per host
+            session (requests.Session): Session to use (optional, a pooled session is created if not provided)
+            metrics (Metrics): Collector that counts retries and timeouts (optional)
+        """
+        self.url = url
+        self.timeout = timeout
+        self.metrics = metrics
+        self.form = None
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+        self.session = session
+
+    def load_form(self):
+        """Load the search page and capture its form, cookies and hidden tokens"""
+        response = self.session.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        self.form = parse_search_form(response.text, response.url)
+        logger.info(f"Loaded search form ({self.form['method']} {self.form['action']})")
+
+    def build_payload(self, book_number, from_date, to_date, property_type):
+        """
+        Build the form payload for one search
+
+        Returns:
+            dict: Field name to value, starting from the form's own defaults
+        """
+        return build_search_payload(self.form, book_number, from_date, to_date, property_type)
+
+    def _submit(self, payload, stream=False):
+        try:
+            if self.form['method'] == 'POST':
+                return self.session.post(self.form['action'], data=payload, timeout=self.timeout, stream=stream)
+            return self.session.get(self.form['action'], params=payload, timeout=self.timeout, stream=stream)
+        except requests.Timeout:
+            self._count('timeouts')
+            raise
+
+    def _count(self, counter):
+        if self.metrics is not None:
+            self.metrics.increment(counter)
+
+    def search(self, book_number, from_date, to_date, property_type, stream=False):
+        """
+        Run one search and return the raw response page
+
+        Args:
+            book_number (int): Book number to search for
+            from_date (str): Start of the date range (MM/DD/YYYY)
+            to_date (str): End of the date range (MM/DD/YYYY)
+            property_type (str): Visible text of the property type option
+            stream (bool): Return the open response so the body can be read in chunks
+
+        Returns:
+            str | requests.Response: HTML of the results page, or the streaming response
+        """
+        if self.form is None:
+            self.load_form()
+
+        response = self._submit(self.build_payload(book_number, from_date, to_date, property_type), stream)
+
+        if response.status_code in TOKEN_REJECTED_STATUSES:
+            # Session or form tokens have probably expired, so reload the form once and retry
+            logger.info(f"Search for book {book_number} rejected with HTTP {response.status_code}, reloading form")
+            response.close()
+            self._count('retries')
+            self.load_form()
+            response = self._submit(self.build_payload(book_number, from_date, to_date, property_type), stream)
+
+        return self._checked(response, f"Search for book {book_number}", stream)
+
+    def fetch(self, url, stream=False):
+        """
+        Fetch a follow-up page, such as the next page of results
+
+        Args:
+            url (str): URL to fetch
+            stream (bool): Return the open response so the body can be read in chunks
+
+        Returns:
+            str | requests.Response: HTML of the page, or the streaming response
+        """
+        try:
+            response = self.session.get(url, timeout=self.timeout, stream=stream)
+        except requests.Timeout:
+            self._count('timeouts')
+            raise
+        return self._checked(response, f"Request for {url}", stream)
+
+    def _checked(self, response, description, stream):
+        if response.status_code in TOKEN_REJECTED_STATUSES or response.status_code >= 400:
+            response.close()
+        if response.status_code in TOKEN_REJECTED_STATUSES:
+            raise SearchFormError(f"{description} rejected with HTTP {response.status_code}")
+        response.raise_for_status()
+        return response if stream else response.text
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
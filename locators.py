@@ -0,0 +1,138 @@
+"""
+Locator registry for the Affidavit of Value search form
+Works out which selector finds each form field once per session and reuses it
+"""
+
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class By:
+    """Selenium's locator strategies (the values of selenium.webdriver.common.by.By), so the registry loads without Selenium"""
+    ID = 'id'
+    NAME = 'name'
+    XPATH = 'xpath'
+    TAG_NAME = 'tag name'
+    CSS_SELECTOR = 'css selector'
+
+
+# Candidate selectors for each logical field, most likely first
+FIELD_LOCATORS = {
+    'from_date': ((By.NAME, 'fromDate'), (By.ID, 'fromDate')),
+    'to_date': ((By.NAME, 'toDate'), (By.ID, 'toDate')),
+    'property_type': ((By.NAME, 'propertyTypeCode'), (By.ID, 'propertyTypeCode')),
+    'book': ((By.NAME, 'book'), (By.ID, 'book'), (By.CSS_SELECTOR, 'input[type="text"]')),
+    'submit': (
+        (By.CSS_SELECTOR, 'input[type="submit"]'),
+        (By.CSS_SELECTOR, 'button[type="submit"]'),
+        (By.XPATH, '//button[contains(text(), "Search")]'),
+    ),
+}
+
+# Seconds between probes while waiting for a field to appear
+POLL_INTERVAL = 0.25
+
+
+class LocatorRegistry:
+    """
+    Memoized field locators
+
+    The first lookup of a field probes its candidate selectors in order and
+    remembers the one that matched; later lookups go straight to it. If a
+    remembered selector stops matching, the field is probed again, and a
+    different winner is counted as an invalidation, which usually means the
+    site layout changed. The registry can be shared by several browsers.
+    """
+
+    def __init__(self, candidates=None):
+        """
+        Args:
+            candidates (dict): Field name to a tuple of (By, value) selectors
+                (optional, defaults to FIELD_LOCATORS)
+        """
+        self.candidates = candidates or FIELD_LOCATORS
+        self._resolved = {}
+        self._stats = {field: {'hits': 0, 'misses': 0, 'invalidations': 0} for field in self.candidates}
+        self._lock = threading.Lock()
+
+    def find(self, driver, field, timeout=0):
+        """
+        Find the element of a logical field
+
+        Args:
+            driver (WebDriver): Browser to search in
+            field (str): Logical field name (a key of the registry's candidates)
+            timeout (float): Seconds to keep probing if no selector matches yet
+
+        Returns:
+            WebElement: The first element matched by the field's selector
+
+        Raises:
+            NoSuchElementException: If no candidate selector matches within the timeout;
+                the field name is set as its ``field`` attribute
+        """
+        locator = self._resolved.get(field)
+        if locator is not None:
+            elements = driver.find_elements(*locator)
+            if elements:
+                self._count(field, 'hits')
+                return elements[0]
+
+        self._count(field, 'misses')
+        resolved, element = self._probe(driver, field, timeout)
+
+        with self._lock:
+            if locator is not None and resolved != locator:
+                self._stats[field]['invalidations'] += 1
+                logger.warning(f"Locator for '{field}' changed from {_describe(locator)} to {_describe(resolved)}")
+            self._resolved[field] = resolved
+        return element
+
+    def invalidate(self, field=None):
+        """Forget the selector of one field, or of every field"""
+        with self._lock:
+            if field is None:
+                self._resolved.clear()
+            else:
+                self._resolved.pop(field, None)
+
+    def stats(self):
+        """
+        Lookup statistics per field
+
+        Returns:
+            dict: Field name to hits, misses, invalidations and the selector currently in use
+        """
+        with self._lock:
+            return {
+                field: dict(counts, locator=_describe(self._resolved[field]) if field in self._resolved else None)
+                for field, counts in self._stats.items()
+            }
+
+    def _probe(self, driver, field, timeout):
+        from selenium.common.exceptions import NoSuchElementException
+
+        deadline = time.monotonic() + timeout
+        while True:
+            for locator in self.candidates[field]:
+                elements = driver.find_elements(*locator)
+                if elements:
+                    return locator, elements[0]
+            if time.monotonic() >= deadline:
+                with self._lock:
+                    self._resolved.pop(field, None)
+                error = NoSuchElementException(f"No selector matches the '{field}' field")
+                error.field = field
+                raise error
+            time.sleep(POLL_INTERVAL)
+
+    def _count(self, field, counter):
+        with self._lock:
+            self._stats[field][counter] += 1
+
+
+def _describe(locator):
+    return f"{locator[0]}={locator[1]}"
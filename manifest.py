@@ -0,0 +1,233 @@
+"""
+Run manifest for the Mohave scraper
+Records the outcome of every book so an interrupted run can resume where it stopped
+"""
+
+import os
+import time
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Book outcomes recorded in the manifest
+STATUS_DONE = 'done'
+STATUS_EMPTY = 'empty'
+STATUS_FAILED = 'failed'
+
+# Outcomes that do not need to be scraped again
+COMPLETE_STATUSES = (STATUS_DONE, STATUS_EMPTY)
+
+# Date format used by the search form
+DATE_FORMAT = '%m/%d/%Y'
+
+# Age in seconds after which a shared manifest's lock file is taken to be left by a crashed process
+LOCK_STALE_SECONDS = 30
+
+
+def parse_date(value):
+    """Parse a search form date (MM/DD/YYYY)"""
+    return datetime.strptime(value, DATE_FORMAT)
+
+
+def frame_hash(df):
+    """
+    Hash the content of a scraped DataFrame
+
+    The ``scraped_at`` column is left out so that re-scraping unchanged data
+    produces the same hash.
+
+    Args:
+        df (pd.DataFrame): Scraped data for one book
+
+    Returns:
+        str: Hex SHA-256 digest of the data
+    """
+    data = df.drop(columns=['scraped_at'], errors='ignore').to_csv(index=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def atomic_write_json(path, data):
+    """Write JSON so that readers see either the old file or the complete new one, never a partial write"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class RunManifest:
+    """Durable per-book record of a scrape run"""
+
+    def __init__(self, path, shared=False):
+        """
+        Initialize the manifest, loading any existing state from disk
+
+        Args:
+            path (str): Path of the manifest JSON file
+            shared (bool): Several processes record books in this file (see ``shared`` below)
+        """
+        self.path = path
+        self.books = {}
+        # When shared, every read picks up the other processes' entries, and every
+        # record is a read-modify-write of the file under a lock file
+        self.shared = shared
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Load the manifest from disk, starting empty if it does not exist"""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            self.books = self._read()
+            logger.info(f"Loaded run manifest with {len(self.books)} books from {self.path}")
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read run manifest {self.path}, starting a new one: {e}")
+            self.books = {}
+
+    def _read(self):
+        with open(self.path) as f:
+            return json.load(f).get('books', {})
+
+    def _refresh(self):
+        """Pick up the entries other processes wrote to a shared manifest"""
+        try:
+            self.books = self._read()
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not re-read shared manifest {self.path}: {e}")
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold the shared manifest's lock file, which other processes wait on"""
+        lock_path = self.path + '.lock'
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                        logger.warning(f"Removing abandoned manifest lock {lock_path}")
+                        os.remove(lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+
+    def save(self):
+        """Atomically write the manifest to disk"""
+        atomic_write_json(self.path, {'books': self.books, 'updated_at': datetime.now().isoformat()})
+
+    def get(self, book_number):
+        """
+        Get the recorded entry for a book
+
+        Returns:
+            dict: The manifest entry, or None if the book has not been recorded
+        """
+        if self.shared:
+            with self._lock:
+                self._refresh()
+        return self.books.get(str(book_number))
+
+    def record(self, book_number, status, params, rows=0, content_hash=None, error=None,
+               covered_from=None, covered_to=None, failure=None):
+        """
+        Record the outcome of a book and persist the manifest
+
+        Args:
+            book_number (int): Book number
+            status (str): One of STATUS_DONE, STATUS_EMPTY or STATUS_FAILED
+            params (dict): Query parameters the book was scraped with
+            rows (int): Number of rows scraped
+            content_hash (str): Hash of the scraped data (see frame_hash)
+            error (str): Error message for failed books
+            covered_from (str): Earliest date the book's saved data covers
+            covered_to (str): Latest date the book's saved data covers
+            failure (str): For failed books, whether the failure was transient or permanent
+        """
+        entry = {
+            'status': status,
+            'rows': rows,
+            'content_hash': content_hash,
+            'params': params,
+            'updated_at': datetime.now().isoformat(),
+        }
+        if error:
+            entry['error'] = error
+        if failure:
+            entry['failure'] = failure
+        if covered_from and covered_to:
+            entry['covered_from'] = covered_from
+            entry['covered_to'] = covered_to
+
+        with self._lock, self._file_lock() if self.shared else nullcontext():
+            if self.shared:
+                self._refresh()
+            previous = self.books.get(str(book_number))
+            if status == STATUS_FAILED and previous and 'covered_to' in previous:
+                # A failed update does not lose the data saved by earlier runs
+                entry['status'] = previous['status']
+                entry['rows'] = previous['rows']
+                entry['content_hash'] = previous['content_hash']
+                entry['params'] = previous['params']
+                entry['covered_from'] = previous['covered_from']
+                entry['covered_to'] = previous['covered_to']
+                entry['last_error'] = error
+                entry.pop('error', None)
+                entry.pop('failure', None)
+            self.books[str(book_number)] = entry
+            self.save()
+
+    def is_complete(self, book_number, params):
+        """Return True if the book already finished with the same query parameters"""
+        entry = self.get(book_number)
+        return entry is not None and entry['status'] in COMPLETE_STATUSES and entry.get('params') == params
+
+    def pending(self, book_numbers, params):
+        """
+        Filter a list of books down to the ones that still need scraping
+
+        Args:
+            book_numbers (iterable): Candidate book numbers
+            params (dict): Query parameters of the current run
+
+        Returns:
+            list: Books that are missing, failed, or were scraped with different parameters
+        """
+        return [book for book in book_numbers if not self.is_complete(book, params)]
+
+    def summary(self):
+        """
+        Count books per status
+
+        Returns:
+            dict: Status to number of books
+        """
+        counts = {}
+        for entry in self.books.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return counts
@@ -0,0 +1,154 @@
+"""
+Run metrics for the Mohave scraper
+Timing spans per phase, counters, and percentile summaries exported as JSON
+and in the Prometheus textfile format
+"""
+
+import os
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from manifest import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Percentiles reported for every phase
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Prefix of every exported Prometheus metric
+METRIC_PREFIX = 'mohave_scraper'
+
+
+def percentile(sorted_values, fraction):
+    """
+    Linearly interpolated percentile of an already sorted list
+
+    Args:
+        sorted_values (list): Values in ascending order (not empty)
+        fraction (float): Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        float: The percentile
+    """
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class Metrics:
+    """Thread-safe collector of phase durations and counters for one run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._counters = {}
+        self.started_at = datetime.now()
+        self._started = time.monotonic()
+
+    @contextmanager
+    def span(self, phase):
+        """
+        Time a block of code as one occurrence of a phase
+
+        The duration is recorded even if the block raises.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - started)
+
+    def observe(self, phase, seconds):
+        """Record one duration for a phase"""
+        with self._lock:
+            self._durations.setdefault(phase, []).append(seconds)
+
+    def increment(self, counter, amount=1):
+        """Add to a counter"""
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def summary(self):
+        """
+        Summarize the run so far
+
+        Returns:
+            dict: ``phases`` (count, total, mean, max and p50/p95/p99 seconds per phase),
+            ``counters``, ``started_at`` and ``elapsed`` seconds
+        """
+        with self._lock:
+            durations = {phase: sorted(values) for phase, values in self._durations.items()}
+            counters = dict(self._counters)
+
+        phases = {}
+        for phase, values in sorted(durations.items()):
+            stats = {'count': len(values), 'total': sum(values), 'mean': sum(values) / len(values), 'max': values[-1]}
+            for quantile in QUANTILES:
+                stats[f"p{round(quantile * 100)}"] = percentile(values, quantile)
+            phases[phase] = stats
+
+        return {
+            'started_at': self.started_at.isoformat(),
+            'elapsed': time.monotonic() - self._started,
+            'phases': phases,
+            'counters': dict(sorted(counters.items())),
+        }
+
+    def write_json(self, path):
+        """Atomically write the summary as JSON"""
+        atomic_write_json(path, self.summary())
+
+    def write_prometheus(self, path):
+        """
+        Atomically write the summary in the Prometheus text exposition format
+
+        The file can be picked up by node_exporter's textfile collector; it is
+        replaced with a rename so the collector never reads a partial file.
+        """
+        summary = self.summary()
+        lines = [
+            f"# HELP {METRIC_PREFIX}_phase_seconds Time spent per scraper phase",
+            f"# TYPE {METRIC_PREFIX}_phase_seconds summary",
+        ]
+        for phase, stats in summary['phases'].items():
+            for quantile in QUANTILES:
+                value = stats[f"p{round(quantile * 100)}"]
+                lines.append(f'{METRIC_PREFIX}_phase_seconds{{phase="{phase}",quantile="{quantile}"}} {value:.6f}')
+            lines.append(f'{METRIC_PREFIX}_phase_seconds_sum{{phase="{phase}"}} {stats["total"]:.6f}')
+            lines.append(f'{METRIC_PREFIX}_phase_seconds_count{{phase="{phase}"}} {stats["count"]}')
+
+        for counter, value in summary['counters'].items():
+            name = f"{METRIC_PREFIX}_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_duration_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_duration_seconds {summary['elapsed']:.3f}")
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.prom', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def log_summary(self):
+        """Log one line per phase with its percentiles, then the counters"""
+        summary = self.summary()
+        for phase, stats in summary['phases'].items():
+            logger.info(
+                f"Phase {phase}: {stats['count']}x, p50 {stats['p50'] * 1000:.0f} ms, "
+                f"p95 {stats['p95'] * 1000:.0f} ms, p99 {stats['p99'] * 1000:.0f} ms, total {stats['total']:.1f} s"
+            )
+        if summary['counters']:
+            logger.info("Counters: " + ', '.join(f"{name}={value}" for name, value in summary['counters'].items()))
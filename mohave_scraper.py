@@ -6,51 +6,371 @@ Filters by Property Type: Vacant Land
 """
 
 import os
+import copy
 import time
+import asyncio
+import queue
 import logging
+import threading
 import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.select import Select
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log'),
-        logging.StreamHandler()
-    ]
+
+from http_engine import HttpSearchEngine, SearchFormError
+from results_parser import ResultsTableParser, NO_RESULTS_MARKERS, NEXT_PAGE_TEXT
+from response_cache import ResponseCache
+from locators import By, LocatorRegistry
+from storage import METADATA_COLUMNS, open_storage
+from combine import COMBINED_FILENAME, combine_books
+from query_store import QueryStore
+from metrics import Metrics
+from normalize import normalize_frame
+from pipeline import Pipeline, Stage
+from manifest import RunManifest, frame_hash, parse_date, STATUS_DONE, STATUS_EMPTY, STATUS_FAILED, COMPLETE_STATUSES
+from query_windows import WindowTooLarge, can_split, split_window
+from outcomes import (
+    OUTCOME_DONE, OUTCOME_EMPTY, OUTCOME_TRANSIENT, OUTCOME_PERMANENT, SUCCESS_OUTCOMES,
+    TransientScrapeError, PermanentScrapeError, RetryPolicy, RetryQueue, classify_error,
 )
+
 logger = logging.getLogger(__name__)
 
 
+SEARCH_URL = 'https://www.mohave.gov/departments/assessor/affidavit-of-value-search/'
+
+# Ways of running a search: a real browser, replaying the form over HTTP
+# one book at a time per worker, or many books in flight on one event loop
+ENGINES = ('selenium', 'http', 'async')
+
+# Books (or work queue units) between two progress messages
+PROGRESS_INTERVAL = 10
+
+# Safety limit on the number of result pages followed for one search
+MAX_RESULT_PAGES = 100
+
+# Bytes read from the network per parser step when streaming a results page
+PARSE_CHUNK_SIZE = 64 * 1024
+
+# Resources the headless browser does not download, since only the DOM is read
+BLOCKED_RESOURCE_PATTERNS = (
+    '*.css', '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.ico',
+)
+
+# File remembering the chromedriver binary resolved by webdriver-manager, so later runs skip the lookup
+DRIVER_PATH_CACHE = os.path.join(os.path.expanduser('~'), '.cache', 'mohave_scraper', 'chromedriver_path')
+
+# WebDriver error messages that mean the browser session is gone and Chrome must be restarted
+DRIVER_CRASH_MESSAGES = (
+    'invalid session id', 'no such session', 'session deleted', 'chrome not reachable',
+    'disconnected', 'tab crashed', 'target window already closed', 'cannot determine loading status',
+)
+
+# Page text the site shows for a book number it does not know; a search form
+# field missing from such a page is the book's fault and not worth retrying
+INVALID_BOOK_MARKERS = ('invalid book', 'book number is invalid', 'book not found', 'no such book')
+
+# Attribute put on the tables and "no results" messages already on the page before a search is
+# submitted, so the wait for the response ignores them when the results are swapped in place
+PREVIOUS_RESULTS_ATTRIBUTE = 'data-previous-results'
+
+MARK_PREVIOUS_RESULTS_JS = f"""
+const markers = arguments[0];
+for (const element of document.querySelectorAll('body, body *')) {{
+    const text = (element.textContent || '').toLowerCase();
+    if (element.tagName === 'TABLE' || markers.some(marker => text.includes(marker))) {{
+        element.setAttribute('{PREVIOUS_RESULTS_ATTRIBUTE}', '');
+    }}
+}}
+"""
+
+# Returns 'table', 'empty' or null for the elements not marked as previous results
+# (every element, after the response replaced the document)
+RESPONSE_STATE_JS = f"""
+const markers = arguments[0];
+const fresh = Array.from(document.querySelectorAll('body, body *'))
+    .filter(element => !element.hasAttribute('{PREVIOUS_RESULTS_ATTRIBUTE}'));
+if (fresh.some(element => element.tagName === 'TABLE')) {{
+    return 'table';
+}}
+if (fresh.some(element => markers.some(marker => (element.textContent || '').toLowerCase().includes(marker)))) {{
+    return 'empty';
+}}
+return null;
+"""
+
+# Pager link that leads to the next page of results
+NEXT_PAGE_XPATH = '//a[@rel="next" or {}]'.format(' or '.join(
+    f'translate(normalize-space(.), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")="{text}"'
+    for text in NEXT_PAGE_TEXT
+))
+
+
+class RequestPacer:
+    """
+    Thread-safe, adaptive politeness limit shared by every worker of a scraper
+
+    Request starts are spaced ``interval`` seconds apart across all workers.
+    After each request the pacer is told how long the server took: while
+    responses stay as fast as the best seen so far the interval sits at
+    ``min_interval``, and it grows in proportion when the server slows down
+    (or doubles on a failed request), up to ``max_interval``.
+    """
+
+    def __init__(self, min_interval=2.0, max_interval=60.0, smoothing=0.3):
+        """
+        Args:
+            min_interval (float): Smallest number of seconds between two requests to the site
+                (searches, form loads and results pages), counted across all workers
+            max_interval (float): Largest interval the pacer will back off to
+            smoothing (float): Weight of the newest sample in the response time moving average
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._average = None
+        self._baseline = None
+
+    def wait(self):
+        """Block until the caller may start its next request"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def record(self, elapsed, success=True):
+        """
+        Feed a measured response time back into the pacer
+
+        Args:
+            elapsed (float): Seconds the request took
+            success (bool): False if the request failed in a way that suggests the server is struggling
+        """
+        with self._lock:
+            if self._average is None:
+                self._average = elapsed
+            else:
+                self._average += self.smoothing * (elapsed - self._average)
+            if self._baseline is None or self._average < self._baseline:
+                self._baseline = self._average
+
+            if success:
+                slowdown = self._average / self._baseline if self._baseline > 0 else 1.0
+                # Recover gradually after a back-off instead of snapping back to full speed
+                self.interval = max(self.min_interval * slowdown, self.interval * 0.8)
+            else:
+                self.interval *= 2
+            self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+
+
+_driver_path_lock = threading.Lock()
+_driver_path = None
+
+
+def chromedriver_path(refresh=False):
+    """
+    Path of the chromedriver binary
+
+    webdriver-manager is only asked once; the result is kept for the rest of
+    the process (shared by all workers) and in DRIVER_PATH_CACHE for later runs.
+
+    Args:
+        refresh (bool): Ignore the remembered path and resolve the driver again,
+            e.g. after Chrome was upgraded and the old driver no longer matches
+
+    Returns:
+        str: Path of the chromedriver executable
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if not refresh:
+            if _driver_path and os.path.exists(_driver_path):
+                return _driver_path
+            try:
+                with open(DRIVER_PATH_CACHE) as f:
+                    path = f.read().strip()
+                if path and os.access(path, os.X_OK):
+                    _driver_path = path
+                    return path
+            except OSError:
+                pass
+
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        path = ChromeDriverManager().install()
+        try:
+            os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+            with open(DRIVER_PATH_CACHE, 'w') as f:
+                f.write(path)
+        except OSError as e:
+            logger.warning(f"Could not remember chromedriver path: {e}")
+        _driver_path = path
+        return path
+
+
+def _declared_encoding(response):
+    """Character encoding from the Content-Type header, or None to let the parser detect it"""
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.encoding
+    return None
+
+
+def _feed_page(parser, writer, page_html, base_url):
+    """Parse a complete page, storing it in the response cache first if a writer is given"""
+    if writer:
+        writer.add_page(page_html)
+    return parser.feed_page(page_html, base_url)
+
+
+def _log_progress(processed, total=None, queue_status=None):
+    """
+    Log how far a run has got, every PROGRESS_INTERVAL books or units
+
+    Args:
+        processed (int): Books or work queue units finished so far
+        total (int): Books in the run (optional, not known when draining a work queue)
+        queue_status (callable): Returns the work queue's units per state (optional, for work queue runs)
+    """
+    if processed % PROGRESS_INTERVAL:
+        return
+    if queue_status is None:
+        logger.info(f"Progress: {processed}/{total} books processed")
+    else:
+        logger.info(f"Progress: {processed} units processed, queue: {queue_status()}")
+
+
+def _is_stale(element):
+    """Return True if the element no longer belongs to the current document"""
+    from selenium.common.exceptions import StaleElementReferenceException
+
+    try:
+        element.is_enabled()
+        return False
+    except StaleElementReferenceException:
+        return True
+
+
+def _driver_crashed(error):
+    """Return True if a WebDriver error means the browser session has died"""
+    from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    message = str(error).lower()
+    return isinstance(error, WebDriverException) and any(text in message for text in DRIVER_CRASH_MESSAGES)
+
+
+def _mark_previous_results(driver):
+    """
+    Mark the tables and "no results" messages currently on the page
+
+    Called right before a search is submitted. When the form is reused, the
+    previous book's response is still on the page; the marks keep it from
+    being taken for the new response.
+    """
+    driver.execute_script(MARK_PREVIOUS_RESULTS_JS, list(NO_RESULTS_MARKERS))
+
+
+def _results_rendered():
+    """
+    Build a wait condition that fires once the search response has been rendered
+
+    The site may either navigate to a results page or insert the results in
+    place. The condition accepts a table or a "no results" message in a new
+    document, or one in the original document that was not marked by
+    _mark_previous_results before the search was submitted.
+
+    Returns:
+        callable: Condition for ``WebDriverWait.until`` returning 'table', 'empty' or False
+    """
+    def condition(driver):
+        if driver.execute_script('return document.readyState') not in ('interactive', 'complete'):
+            return False
+        # The marks do not survive navigation, so a new document is all fresh
+        return driver.execute_script(RESPONSE_STATE_JS, list(NO_RESULTS_MARKERS)) or False
+
+    return condition
+
+
 class MohaveScraper:
     """Scraper for Mohave County Affidavit of Value Search"""
 
-    def __init__(self, output_dir='scraped_data', from_date='01/01/2010', to_date='10/31/2025', property_type='Vacant Land'):
-        self.url = 'https://www.mohave.gov/departments/assessor/affidavit-of-value-search/'
+    def __init__(self, output_dir='scraped_data', from_date='01/01/2010', to_date='10/31/2025', property_type='Vacant Land',
+                 workers=1, request_interval=2.0, page_timeout=30, engine='selenium', url=SEARCH_URL, concurrency=8,
+                 resume=True, incremental=False, cache_dir=None, storage='csv', query_db=None,
+                 max_retries=3, retry_delay=30.0, max_window_rows=5000, max_window_pages=20):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}")
+
+        self.url = url
         self.output_dir = output_dir
         self.from_date = from_date
         self.to_date = to_date
         self.property_type = property_type
+        self.workers = workers
+        self.concurrency = concurrency
+        self.page_timeout = page_timeout
+        # Searches above either limit are split into smaller date windows
+        self.max_window_rows = max_window_rows
+        self.max_window_pages = max_window_pages
+        self.engine = engine
+        self.resume = resume
+        self.incremental = incremental
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        # Phase timings and counters of the current run
+        self.metrics = Metrics()
+        # Form field selectors, resolved once and shared by all workers
+        self.locators = LocatorRegistry()
         self.driver = None
+        self.http = None
+        self._reset_form_state()
+        # Form fields found in the current browser session
+        self._session_fields = set()
+
+        # Politeness limit shared by all workers
+        self.pacer = RequestPacer(min_interval=request_interval)
+
+        # Backoff of the rounds that retry transient failures after the main pass
+        self.retry_policy = RetryPolicy(max_retries=max_retries, base_delay=retry_delay)
 
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
+
+        # Per-book CSV files or a partitioned Parquet dataset
+        self.storage = open_storage(storage, output_dir)
+
+        # Optional indexed SQLite copy of every saved book, shared by all workers
+        self.store = QueryStore(query_db) if query_db else None
+
+        # Record of finished books, used to resume interrupted runs
+        self.manifest = RunManifest(os.path.join(output_dir, 'manifest.json'))
         logger.info(f"Output directory: {self.output_dir}")
         logger.info(f"Date range: {self.from_date} to {self.to_date}")
         logger.info(f"Property type: {self.property_type}")
+        logger.info(f"Search engine: {self.engine}")
+        logger.info(f"Storage format: {self.storage.format}")
+        if cache_dir:
+            logger.info(f"Response cache: {cache_dir}")
+        if incremental:
+            logger.info("Incremental mode: only dates after each book's last covered date are queried")
+        if engine == 'async':
+            logger.info(f"Concurrent requests: {self.concurrency}")
+        elif workers > 1:
+            logger.info(f"Workers: {self.workers}")
 
     def setup_driver(self):
         """Initialize Chrome WebDriver with appropriate options"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from selenium.common.exceptions import WebDriverException
+
         logger.info("Setting up Chrome WebDriver...")
 
         chrome_options = Options()
@@ -62,249 +382,1584 @@ class MohaveScraper:
         chrome_options.add_argument('--window-size=1920,1080')
         # Add user agent to avoid detection
         chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        # Only the DOM is needed: hand pages over once they are parsed and skip images
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
 
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            try:
+                self.driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
+            except WebDriverException as e:
+                # The remembered driver may no longer match the installed Chrome
+                logger.warning(f"Could not start Chrome with the cached driver, resolving it again: {e}")
+                self.driver = webdriver.Chrome(service=Service(chromedriver_path(refresh=True)), options=chrome_options)
             logger.info("Chrome WebDriver initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize WebDriver: {e}")
             raise
 
-    def scrape_book(self, book_number):
+        self._reset_form_state()
+        self._session_fields = set()
+        try:
+            # Stylesheets and fonts have no preference switch, so block them at the network level
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(BLOCKED_RESOURCE_PATTERNS)})
+        except WebDriverException as e:
+            logger.warning(f"Could not block page resources: {e}")
+
+    def _discard_driver(self):
+        """Drop a browser whose session has died, so the next search starts a new one"""
+        logger.warning("Browser session lost, Chrome will be restarted for the next search")
+        self.metrics.increment('driver_restarts')
+        driver, self.driver = self.driver, None
+        self._reset_form_state()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _reset_form_state(self):
+        """Forget the search form filled in the browser, so the next search loads it again"""
+        self._form_window = None
+        self._form_root = None
+
+    def log_locator_stats(self):
+        """Log how often each form field's remembered selector was reused, re-probed or replaced"""
+        for field, stats in self.locators.stats().items():
+            if stats['hits'] or stats['misses']:
+                logger.info(
+                    f"Locator '{field}': {stats['locator']} ({stats['hits']} hits, {stats['misses']} misses, "
+                    f"{stats['invalidations']} invalidations)"
+                )
+
+    def close(self):
+        """Shut down the browser and HTTP session, if they were started"""
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+            self._reset_form_state()
+            logger.info("WebDriver closed")
+            self.log_locator_stats()
+        if self.http:
+            self.http.close()
+            self.http = None
+
+    def scrape_book(self, book_number, from_date=None, to_date=None):
         """
         Scrape data for a specific book number
 
+        Uses the configured engine. If the HTTP engine cannot replay the search
+        form, the book is retried in a browser; network errors and overloaded
+        server responses are raised instead, since a browser would hit them too.
+
+        A search the site truncates, or with more than ``max_window_rows`` results
+        or ``max_window_pages`` pages, is split into two halves of its date
+        window (recursively) and the halves' rows are combined without duplicates.
+
         Args:
             book_number (int): The book number to search for
+            from_date (str): Start of the date window (optional, uses the scraper's from_date if not provided)
+            to_date (str): End of the date window (optional, uses the scraper's to_date if not provided)
 
         Returns:
-            pd.DataFrame: DataFrame containing the scraped data, or None if no data found
+            pd.DataFrame: DataFrame containing the scraped data (empty if the site has
+            no results for the book)
+
+        Raises:
+            Exception: If the search failed; outcomes.classify_error tells whether it is worth retrying
         """
+        window = (from_date or self.from_date, to_date or self.to_date)
         logger.info(f"Scraping book number: {book_number}")
 
+        with self.metrics.span('scrape_book'):
+            return self._scrape_window(book_number, window)
+
+    def _scrape_window(self, book_number, window):
+        """Search one date window of a book, splitting it while it has too many results"""
         try:
-            # Navigate to the page
-            self.driver.get(self.url)
+            return self._search_window(book_number, window)
+        except WindowTooLarge as e:
+            parts = [self._scrape_window(book_number, half) for half in self._split_search(book_number, e)]
+            return self._stitch_windows(book_number, window, parts)
 
-            # Wait for page to load
-            time.sleep(2)
+    def _split_search(self, book_number, error):
+        """Log and count the split of an oversized search, returning the two halves of its window"""
+        halves = split_window(error.window)
+        logger.info(f"{error}; searching {halves[0][0]}-{halves[0][1]} and {halves[1][0]}-{halves[1][1]} separately")
+        self.metrics.increment('window_splits')
+        return halves
 
-            # Find and fill the FROM date field
-            try:
-                from_date_input = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.NAME, 'fromDate'))
-                )
-                from_date_input.clear()
-                from_date_input.send_keys(self.from_date)
-                logger.info(f"Entered from date: {self.from_date}")
-            except (TimeoutException, NoSuchElementException) as e:
-                logger.warning(f"Could not find 'fromDate' field, trying alternatives: {e}")
-                try:
-                    # Try by id or other attributes
-                    from_date_input = self.driver.find_element(By.ID, 'fromDate')
-                    from_date_input.clear()
-                    from_date_input.send_keys(self.from_date)
-                except NoSuchElementException:
-                    logger.warning("No 'from date' field found, continuing without it")
+    def _stitch_windows(self, book_number, window, parts):
+        """
+        Combine the results of a split window's halves
 
-            # Find and fill the TO date field
-            try:
-                to_date_input = self.driver.find_element(By.NAME, 'toDate')
-                to_date_input.clear()
-                to_date_input.send_keys(self.to_date)
-                logger.info(f"Entered to date: {self.to_date}")
-            except NoSuchElementException:
-                try:
-                    # Try by id or other attributes
-                    to_date_input = self.driver.find_element(By.ID, 'toDate')
-                    to_date_input.clear()
-                    to_date_input.send_keys(self.to_date)
-                except NoSuchElementException:
-                    logger.warning("No 'to date' field found, continuing without it")
+        Rows found by both halves are kept once. Like rows merged in incremental
+        mode, each row keeps the from_date and to_date of the search that found it.
 
-            # Find and select property type from Property Type Code dropdown
+        Returns:
+            pd.DataFrame: Rows of every part (empty if no part had results)
+        """
+        frames = [df for df in parts if not df.empty]
+        if not frames:
+            return self._empty_results(book_number, window)
+
+        df = frames[0]
+        for part in frames[1:]:
+            df = self.merge_book(df, part)
+        logger.info(f"Combined {len(parts)} date windows of book {book_number} into {len(df)} rows")
+        return df
+
+    def _search_window(self, book_number, window):
+        """
+        Run one search for a book and date window with the configured engine
+
+        Raises:
+            WindowTooLarge: If the results have to be searched in smaller windows
+        """
+        cached = self._cached_results(book_number, window)
+        if cached is not None:
+            return cached
+
+        if self.engine in ('http', 'async'):
             try:
-                # Try by name attribute first
-                property_type_dropdown = self.driver.find_element(By.NAME, 'propertyTypeCode')
-                select = Select(property_type_dropdown)
-                select.select_by_visible_text(self.property_type)
-                logger.info(f"Selected '{self.property_type}' from Property Type Code dropdown")
-            except NoSuchElementException:
-                try:
-                    # Try by id
-                    property_type_dropdown = self.driver.find_element(By.ID, 'propertyTypeCode')
-                    select = Select(property_type_dropdown)
-                    select.select_by_visible_text(self.property_type)
-                    logger.info(f"Selected '{self.property_type}' from Property Type Code dropdown")
-                except NoSuchElementException:
-                    logger.warning("No 'Property Type Code' dropdown found, continuing without it")
+                return self._scrape_book_http(book_number, window)
+            except WindowTooLarge:
+                raise
             except Exception as e:
-                logger.warning(f"Could not select property type '{self.property_type}': {e}")
+                if classify_error(e) == OUTCOME_TRANSIENT:
+                    raise
+                logger.warning(f"HTTP search failed for book {book_number}, falling back to Selenium: {e}")
+                self.metrics.increment('selenium_fallbacks')
+
+        if self.driver is None:
+            from selenium.common.exceptions import WebDriverException
 
-            # Find the book input field - trying multiple possible selectors
             try:
-                # Try by name attribute
-                book_input = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.NAME, 'book'))
-                )
-            except TimeoutException:
+                self.setup_driver()
+            except WebDriverException as e:
+                raise TransientScrapeError(f"Could not start Chrome: {e.msg}") from e
+        return self._scrape_book_selenium(book_number, window)
+
+    def _scrape_book_http(self, book_number, window):
+        """
+        Scrape one book by replaying the search form over HTTP
+
+        Result pages are streamed into the parser as they arrive, and further
+        pages of results are followed until the last one.
+
+        Raises:
+            SearchFormError: If the response is neither a results page nor a "no results" page
+        """
+        if self.http is None:
+            self.http = HttpSearchEngine(self.url, timeout=self.page_timeout, metrics=self.metrics)
+
+        if self.http.form is None:
+            # A new session loads the search page before its first search
+            with self._paced_request(), self.metrics.span('load_form'):
+                self.http.load_form()
+
+        parser = ResultsTableParser()
+        writer = self._cache_writer(book_number, window)
+        try:
+            with self._paced_request(), self.metrics.span('http_search'):
+                response = self.http.search(book_number, window[0], window[1], self.property_type, stream=True)
+            while True:
+                with response:
+                    encoding = _declared_encoding(response)
+                    chunks = response.iter_content(PARSE_CHUNK_SIZE)
+                    if writer:
+                        chunks = writer.tee(chunks, encoding)
+                    # The body is streamed into the parser, so this includes downloading it
+                    with self.metrics.span('parse'):
+                        page = parser.feed_page(chunks, base_url=response.url, encoding=encoding)
+                if not self._more_pages(page, parser, book_number, window):
+                    break
+                with self._paced_request(), self.metrics.span('http_fetch'):
+                    response = self.http.fetch(page['next_url'], stream=True)
+
+            df = self._results_frame(parser, book_number, window)
+        except BaseException:
+            if writer:
+                writer.abort()
+            raise
+
+        if writer:
+            writer.commit()
+        return df
+
+    def _cache_writer(self, book_number, window):
+        """Start caching the raw pages of a search, or return None if caching is disabled"""
+        if self.cache is None:
+            return None
+        return self.cache.writer(book_number, window[0], window[1], self.property_type)
+
+    def _cached_results(self, book_number, window):
+        """
+        Parse a search from the response cache
+
+        Returns:
+            pd.DataFrame: The book's results, or None if the search is not cached (or has expired)
+        """
+        if self.cache is None:
+            return None
+
+        entry = self.cache.lookup(book_number, window[0], window[1], self.property_type)
+        if entry is None:
+            self.metrics.increment('cache_misses')
+            return None
+
+        logger.info(f"Using cached results for book {book_number}")
+        self.metrics.increment('cache_hits')
+        with self.metrics.span('cache_read'):
+            return self._parse_cache_entry(entry)
+
+    def _parse_cache_entry(self, entry):
+        """Parse the pages of a cache entry into the per-book DataFrame"""
+        parser = ResultsTableParser()
+        for page_bytes, encoding in self.cache.read_pages(entry):
+            parser.feed_page(page_bytes, encoding=encoding)
+        scraped_at = datetime.fromtimestamp(entry['stored_at']).isoformat()
+        return self._results_frame(parser, entry['book'], (entry['from_date'], entry['to_date']), scraped_at)
+
+    def _more_pages(self, page, parser, book_number, window, can_click=False):
+        """
+        Decide whether to load the next page of results
+
+        Args:
+            page (dict): Page information returned by ResultsTableParser.feed_page
+            parser (ResultsTableParser): Parser holding the pages read so far
+            book_number (int): Book being scraped
+            window (tuple): (from_date, to_date) of the search
+            can_click (bool): True if the next page can be opened by clicking the pager link in a browser
+
+        Raises:
+            WindowTooLarge: If the search has too many results, or the site left some
+                out, and its window can still be split
+        """
+        self._check_window_size(parser, book_number, window, more=page['has_next'])
+        if not page['has_next']:
+            return False
+        if parser.pages >= MAX_RESULT_PAGES:
+            logger.warning(f"Book {book_number} has more than {MAX_RESULT_PAGES} result pages, stopping")
+            return False
+        if page['next_url'] is None and not can_click:
+            logger.warning(f"Next results page for book {book_number} is only reachable through a script, results may be incomplete")
+            return False
+        return True
+
+    def _check_window_size(self, parser, book_number, window, more):
+        """
+        Stop a search that should be run over smaller date windows
+
+        The site's result count (when its summary shows one) is checked after the
+        first page, so an oversized search is abandoned before paging through it.
+
+        Args:
+            parser (ResultsTableParser): Parser holding the pages read so far
+            book_number (int): Book being scraped
+            window (tuple): (from_date, to_date) of the search
+            more (bool): True if the last page read links to another page
+        """
+        total = parser.reported_total
+        truncated = not more and total is not None and len(parser.rows) < total
+        if not can_split(window):
+            if truncated:
+                logger.warning(f"Site returned {len(parser.rows)} of {total} results for book {book_number} "
+                               f"on {window[0]}, results may be incomplete")
+            return
+
+        description = f"Book {book_number} from {window[0]} to {window[1]}"
+        if total is not None and total > self.max_window_rows:
+            raise WindowTooLarge(f"{description} has {total} results", window)
+        if more and total is not None and parser.rows:
+            rows_per_page = len(parser.rows) / parser.pages
+            if total / rows_per_page > self.max_window_pages:
+                raise WindowTooLarge(f"{description} has {total} results, more than {self.max_window_pages} pages", window)
+        if more and parser.pages >= self.max_window_pages:
+            raise WindowTooLarge(f"{description} has more than {self.max_window_pages} result pages", window)
+        if truncated:
+            self.metrics.increment('truncated_results')
+            raise WindowTooLarge(f"{description} was truncated to {len(parser.rows)} of {total} results", window)
+
+    def _results_frame(self, parser, book_number, window, scraped_at=None):
+        """
+        Turn the parsed result pages into the per-book DataFrame
+
+        Args:
+            parser (ResultsTableParser): Parser that has been fed every result page
+            book_number (int): Book number the pages belong to
+            window (tuple): (from_date, to_date) the search was run with
+            scraped_at (str): When the pages were fetched (optional, defaults to now)
+
+        Returns:
+            pd.DataFrame: Results table with metadata columns (empty if the site reported no results)
+
+        Raises:
+            SearchFormError: If the pages contain neither a results table nor a "no results" message
+        """
+        if parser.no_results and not parser.matched:
+            logger.warning(f"No results for book {book_number}")
+            return self._empty_results(book_number, window, scraped_at)
+
+        df = parser.to_frame()
+        if df is None:
+            raise SearchFormError("Response contained neither a results table nor a 'no results' message")
+        if not parser.matched:
+            logger.warning(f"No table with a results header found for book {book_number}, using the largest table on the page")
+
+        # Add metadata columns
+        df = self._add_metadata(df, book_number, window, scraped_at)
+        self.metrics.increment('rows', len(df))
+        self.metrics.increment('pages', parser.pages)
+
+        logger.info(f"Successfully scraped {len(df)} rows for book {book_number} ({parser.pages} pages)")
+        return df
+
+    def _add_metadata(self, df, book_number, window, scraped_at=None):
+        """Add the book number and query parameters to a results DataFrame"""
+        df['book_number'] = book_number
+        df['property_type'] = self.property_type
+        df['from_date'] = window[0]
+        df['to_date'] = window[1]
+        df['scraped_at'] = scraped_at or datetime.now().isoformat()
+        return df
+
+    def _empty_results(self, book_number, window, scraped_at=None):
+        """DataFrame returned for a book the site has no results for"""
+        return self._add_metadata(pd.DataFrame(), book_number, window, scraped_at)
+
+    def _scrape_book_selenium(self, book_number, window):
+        """
+        Scrape one book by filling in and submitting the search form in Chrome
+
+        Returns:
+            pd.DataFrame: DataFrame containing the scraped data (empty if the site has
+            no results for the book)
+
+        Raises:
+            TransientScrapeError: If the page timed out, the search form did not load or the
+                browser failed; a crashed browser is discarded so the next search starts a new one
+            PermanentScrapeError: If the site rejected the book number, or the loaded form
+                lacks a field it had before (see _missing_field_error)
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.common.exceptions import (
+            TimeoutException, NoSuchElementException, StaleElementReferenceException, WebDriverException,
+        )
+
+        try:
+            book_input = self._reusable_form(window)
+            if book_input is None:
+                with self.metrics.span('load_form'):
+                    book_input = self._load_search_form(book_number, window)
+            else:
+                logger.info("Reusing the loaded search form")
+                self.metrics.increment('form_reuses')
+
+            with self.metrics.span('fill_form'):
+                # Clear and input the book number
+                book_input.clear()
+                book_input.send_keys(str(book_number))
+                logger.info(f"Entered book number: {book_number}")
+
+                # Find and click the submit/search button
+                submit_button = self._find_field('submit')
+
+                # Mark what is on the page now, so only the response to this search is waited for
+                _mark_previous_results(self.driver)
+
+            with self._paced_request():
+                submit_button.click()
+                logger.info("Clicked submit button")
+
+                # Wait until either the results table or a "no results" message is rendered
                 try:
-                    # Try by id
-                    book_input = self.driver.find_element(By.ID, 'book')
-                except NoSuchElementException:
-                    # Try by other selectors
-                    book_input = self.driver.find_element(By.CSS_SELECTOR, 'input[type="text"]')
+                    with self.metrics.span('wait_results'):
+                        rendered = WebDriverWait(
+                            self.driver, self.page_timeout, ignored_exceptions=(StaleElementReferenceException,)
+                        ).until(_results_rendered())
+                except TimeoutException as e:
+                    logger.warning(f"No table found for book {book_number}")
+                    self.metrics.increment('timeouts')
+                    self._reset_form_state()
+                    raise TransientScrapeError(f"Results for book {book_number} did not load within {self.page_timeout} s") from e
+
+            writer = self._cache_writer(book_number, window)
+            try:
+                if rendered == 'empty':
+                    logger.warning(f"No results for book {book_number}")
+                    if writer:
+                        writer.add_page(self.driver.page_source)
+                    df = self._empty_results(book_number, window)
+                else:
+                    parser = ResultsTableParser()
+                    while True:
+                        with self.metrics.span('parse'):
+                            page_source = self.driver.page_source
+                            if writer:
+                                writer.add_page(page_source)
+                            page = parser.feed_page(page_source)
+                        if not self._more_pages(page, parser, book_number, window, can_click=True):
+                            break
+                        with self.metrics.span('next_page'):
+                            self._open_next_results_page()
+                    df = self._results_frame(parser, book_number, window)
+            except BaseException:
+                if writer:
+                    writer.abort()
+                raise
+
+            if writer:
+                writer.commit()
+            return df
+
+        except (TransientScrapeError, WindowTooLarge):
+            raise
+        except Exception as e:
+            logger.error(f"Error scraping book {book_number}: {e}")
+            self._reset_form_state()
+            if isinstance(e, NoSuchElementException):
+                raise self._missing_field_error(book_number, e) from e
+            if isinstance(e, WebDriverException):
+                if _driver_crashed(e):
+                    self._discard_driver()
+                raise TransientScrapeError(f"Browser error for book {book_number}: {e.msg}") from e
+            raise
+
+    def _find_field(self, field, timeout=0):
+        """Find a search form field with the locator registry and remember that this browser session has seen it"""
+        element = self.locators.find(self.driver, field, timeout=timeout)
+        self._session_fields.add(field)
+        return element
+
+    def _missing_field_error(self, book_number, error):
+        """
+        Classify a search form field that could not be found
+
+        A 503 or maintenance page, or a form that renders slower than the
+        locator timeout, is missing its fields just the same, so that is
+        retried. The book is only failed for good when the page says the book
+        number is invalid, or when the search form is on the page but lacks a
+        field this browser has found on it before.
+
+        Args:
+            book_number (int): Book being searched
+            error (NoSuchElementException): Raised by the locator registry, with the field name as ``field``
 
-            # Clear and input the book number
-            book_input.clear()
-            book_input.send_keys(str(book_number))
-            logger.info(f"Entered book number: {book_number}")
+        Returns:
+            TransientScrapeError | PermanentScrapeError: The error to raise
+        """
+        from selenium.common.exceptions import NoSuchElementException, WebDriverException
+
+        try:
+            page_text = self.driver.find_element(By.TAG_NAME, 'body').text.lower()
+        except WebDriverException:
+            page_text = ''
+        if any(marker in page_text for marker in INVALID_BOOK_MARKERS):
+            return PermanentScrapeError(f"The site does not know book {book_number}: {error.msg}")
 
-            # Find and click the submit/search button
+        field = getattr(error, 'field', None)
+        if field != 'book' and field in self._session_fields:
             try:
-                # Try multiple possible button selectors
-                submit_button = self.driver.find_element(By.CSS_SELECTOR, 'input[type="submit"]')
+                self.locators.find(self.driver, 'book')
+                return PermanentScrapeError(f"Search form field '{field}' missing for book {book_number}: {error.msg}")
             except NoSuchElementException:
+                pass
+
+        self.metrics.increment('form_not_loaded')
+        return TransientScrapeError(f"Search form did not load for book {book_number}: {error.msg}")
+
+    def _reusable_form(self, window):
+        """
+        Find the book field of a search form that is already filled in for this window
+
+        After a search the site may leave the form on the page (or render it
+        again above the results). If the date and property type fields still
+        hold this search's values, only the book number needs to be changed.
+
+        Returns:
+            WebElement: The book input, or None if the search page has to be loaded again
+        """
+        from selenium.webdriver.support.select import Select
+        from selenium.common.exceptions import NoSuchElementException
+
+        if self._form_window != window:
+            return None
+
+        try:
+            book_input = self._find_field('book')
+        except NoSuchElementException:
+            return None
+
+        if _is_stale(self._form_root):
+            # The response replaced the document, so check the new copy of the form kept our values
+            expected = (('from_date', window[0]), ('to_date', window[1]), ('property_type', self.property_type))
+            for field, value in expected:
                 try:
-                    submit_button = self.driver.find_element(By.CSS_SELECTOR, 'button[type="submit"]')
+                    element = self._find_field(field)
                 except NoSuchElementException:
-                    submit_button = self.driver.find_element(By.XPATH, '//button[contains(text(), "Search")]')
+                    continue
+                if field == 'property_type':
+                    current = Select(element).first_selected_option.text.strip()
+                else:
+                    current = element.get_attribute('value')
+                if current != value:
+                    return None
+            self._form_root = self.driver.find_element(By.TAG_NAME, 'html')
 
-            submit_button.click()
-            logger.info("Clicked submit button")
+        return book_input
+
+    def _load_search_form(self, book_number, window):
+        """
+        Load the search page and fill in the date and property type fields
 
-            # Wait for results to load
-            time.sleep(3)
+        Returns:
+            WebElement: The book input
+        """
+        from selenium.webdriver.support.select import Select
+        from selenium.common.exceptions import NoSuchElementException
 
-            # Look for the data table
+        self._reset_form_state()
+        # Navigate to the page and wait until the search form has been rendered
+        with self._paced_request():
+            self.driver.get(self.url)
             try:
-                table = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, 'table'))
-                )
-            except TimeoutException:
-                logger.warning(f"No table found for book {book_number}")
-                return None
+                self._find_field('book', timeout=self.page_timeout)
+            except NoSuchElementException:
+                logger.warning(f"Search form did not finish loading for book {book_number}, trying anyway")
+
+        # Find and fill the FROM date field
+        try:
+            from_date_input = self._find_field('from_date', timeout=10)
+            from_date_input.clear()
+            from_date_input.send_keys(window[0])
+            logger.info(f"Entered from date: {window[0]}")
+        except NoSuchElementException:
+            logger.warning("No 'from date' field found, continuing without it")
 
-            # Extract table data using pandas
-            tables = pd.read_html(self.driver.page_source)
+        # Find and fill the TO date field
+        try:
+            to_date_input = self._find_field('to_date')
+            to_date_input.clear()
+            to_date_input.send_keys(window[1])
+            logger.info(f"Entered to date: {window[1]}")
+        except NoSuchElementException:
+            logger.warning("No 'to date' field found, continuing without it")
 
-            if not tables:
-                logger.warning(f"No data tables found for book {book_number}")
-                return None
+        # Find and select property type from Property Type Code dropdown
+        try:
+            property_type_dropdown = self._find_field('property_type')
+            select = Select(property_type_dropdown)
+            select.select_by_visible_text(self.property_type)
+            logger.info(f"Selected '{self.property_type}' from Property Type Code dropdown")
+        except NoSuchElementException:
+            logger.warning("No 'Property Type Code' dropdown found, continuing without it")
+        except Exception as e:
+            logger.warning(f"Could not select property type '{self.property_type}': {e}")
 
-            # Get the first table (or iterate through tables if multiple)
-            df = tables[0]
+        book_input = self._find_field('book', timeout=10)
 
-            # Add metadata columns
-            df['book_number'] = book_number
-            df['property_type'] = self.property_type
-            df['from_date'] = self.from_date
-            df['to_date'] = self.to_date
-            df['scraped_at'] = datetime.now().isoformat()
+        # The next search can reuse the form as long as it keeps these values
+        self._form_window = window
+        self._form_root = self.driver.find_element(By.TAG_NAME, 'html')
+        return book_input
 
-            logger.info(f"Successfully scraped {len(df)} rows for book {book_number}")
-            return df
+    def _open_next_results_page(self):
+        """Click the pager's next link and wait until it has been replaced by the new page"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
 
-        except Exception as e:
-            logger.error(f"Error scraping book {book_number}: {e}")
-            return None
+        next_link = self.driver.find_element(By.XPATH, NEXT_PAGE_XPATH)
+        with self._paced_request():
+            next_link.click()
+            try:
+                WebDriverWait(self.driver, self.page_timeout).until(EC.staleness_of(next_link))
+            except TimeoutException as e:
+                self.metrics.increment('timeouts')
+                self._reset_form_state()
+                raise TransientScrapeError(f"Next results page did not load within {self.page_timeout} s") from e
 
     def save_data(self, df, book_number):
         """
-        Save DataFrame to CSV file
+        Save DataFrame with the configured storage backend (a CSV file or Parquet partitions)
 
         Args:
             df (pd.DataFrame): DataFrame to save
             book_number (int): Book number for filename
+
+        Returns:
+            bool: True if the file was written
         """
         if df is None or df.empty:
             logger.warning(f"No data to save for book {book_number}")
-            return
-
-        filename = f"book_{book_number}.csv"
-        filepath = os.path.join(self.output_dir, filename)
+            return False
 
         try:
-            df.to_csv(filepath, index=False)
+            with self.metrics.span('save'):
+                filepath = self.storage.save(df, book_number)
             logger.info(f"Saved data to {filepath}")
+            return True
         except Exception as e:
             logger.error(f"Failed to save data for book {book_number}: {e}")
+            return False
+
+    def normalize_book(self, book_number, df, append_rejects=False):
+        """
+        Convert a scraped book's price, date, acreage and parcel columns to typed columns
+
+        Rows with values that could not be converted are written to
+        ``rejects/book_{n}.csv`` in the output directory, with the raw values
+        and the names of the failing columns (see normalize.normalize_frame).
+
+        Args:
+            book_number (int): Book number
+            df (pd.DataFrame): Newly scraped rows of the book
+            append_rejects (bool): Add to the book's rejects file instead of replacing it,
+                for rows merged into earlier data
+
+        Returns:
+            pd.DataFrame: The normalized rows
+        """
+        with self.metrics.span('normalize'):
+            df, rejects = normalize_frame(df)
+
+        path = os.path.join(self.output_dir, 'rejects', f"book_{book_number}.csv")
+        if rejects.empty:
+            if not append_rejects and os.path.exists(path):
+                os.remove(path)
+            return df
+
+        self.metrics.increment('rows_rejected', len(rejects))
+        logger.warning(f"{len(rejects)} rows of book {book_number} have values that could not be converted, see {path}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        appending = append_rejects and os.path.exists(path)
+        rejects.to_csv(path, mode='a' if appending else 'w', header=not appending, index=False)
+        return df
+
+    def query_params(self, window=None):
+        """
+        Query parameters that identify the data a book was scraped with
+
+        Args:
+            window (tuple): (from_date, to_date) actually queried (optional, uses the scraper's range if not provided)
+
+        Returns:
+            dict: from_date, to_date and property_type
+        """
+        from_date, to_date = window or (self.from_date, self.to_date)
+        return {'from_date': from_date, 'to_date': to_date, 'property_type': self.property_type}
+
+    def query_window(self, book_number):
+        """
+        Date window to search for a book
+
+        Normally this is the scraper's from_date to to_date. In incremental mode,
+        a book whose saved data already covers the start of the range is only
+        searched from its last covered date onwards (the overlapping day is
+        deduplicated when the new rows are merged in).
+
+        Returns:
+            tuple: (from_date, to_date)
+        """
+        full_window = (self.from_date, self.to_date)
+        if not self.incremental:
+            return full_window
+
+        entry = self.manifest.get(book_number)
+        if (entry is None or entry['status'] not in COMPLETE_STATUSES
+                or entry['params'].get('property_type') != self.property_type
+                or 'covered_to' not in entry):
+            return full_window
+
+        if parse_date(entry['covered_from']) > parse_date(self.from_date):
+            # The saved data starts too late, so the whole range is needed
+            return full_window
+
+        return entry['covered_to'], self.to_date
+
+    def load_book(self, book_number):
+        """
+        Load previously saved data for a book
+
+        Returns:
+            pd.DataFrame: The saved data, or None if the book has not been saved
+        """
+        return self.storage.load(book_number)
+
+    def merge_book(self, existing, df):
+        """
+        Merge newly scraped rows into a book's saved data
+
+        Rows are compared on the original table columns only, so a row that was
+        scraped again in an overlapping window replaces its older copy.
+
+        Returns:
+            pd.DataFrame: Combined rows without duplicates
+        """
+        merged = pd.concat([existing, df], ignore_index=True)
+        data_columns = [c for c in merged.columns if c not in METADATA_COLUMNS]
+        if not data_columns:
+            return merged
+        duplicated = merged[data_columns].astype(str).duplicated(keep='last')
+        return merged[~duplicated].reset_index(drop=True)
+
+    def finish_book(self, book_number, df, error=None, window=None, failure=None, merge=False):
+        """
+        Save a scraped book and record its outcome in the run manifest
+
+        In incremental mode, rows from a partial window are merged into the
+        book's saved data before writing.
+
+        Args:
+            book_number (int): Book number
+            df (pd.DataFrame): Result of scrape_book (None if the search failed)
+            error (str): Error message if processing the book raised
+            window (tuple): (from_date, to_date) that was searched
+                (optional, uses the scraper's range if not provided)
+            failure (str): OUTCOME_TRANSIENT or OUTCOME_PERMANENT for a failed search
+            merge (bool): The window is one part of the book (a work queue unit),
+                so its rows are merged into the book's saved data in any mode
+
+        Returns:
+            bool: True if the book was scraped successfully, with or without results
+        """
+        window = window or (self.from_date, self.to_date)
+        params = self.query_params(window)
+
+        if df is None or error:
+            self.manifest.record(book_number, STATUS_FAILED, params, error=error, failure=failure)
+            self.metrics.increment('books_failed')
+            return False
+
+        covered_from = window[0]
+        covered_to = window[1]
+        entry = self.manifest.get(book_number)
+        delta = bool(self.incremental and window[0] != self.from_date and entry and 'covered_from' in entry)
+        df = self.normalize_book(book_number, df, append_rejects=merge or delta)
+
+        if merge:
+            if entry and 'covered_from' in entry:
+                covered_from = min(covered_from, entry['covered_from'], key=parse_date)
+                covered_to = max(covered_to, entry['covered_to'], key=parse_date)
+            existing = self.load_book(book_number)
+            if existing is not None:
+                with self.metrics.span('merge'):
+                    # Saved rows are normalized too, so they compare equal to the same rows scraped again
+                    df = self.merge_book(normalize_frame(existing)[0], df)
+        elif delta:
+            # A delta query: extend the book's saved data instead of replacing it
+            covered_from = entry['covered_from']
+            existing = self.load_book(book_number)
+            if existing is not None:
+                new_rows = len(df)
+                with self.metrics.span('merge'):
+                    df = self.merge_book(normalize_frame(existing)[0], df)
+                logger.info(f"Merged {new_rows} new rows into book {book_number} ({len(df) - len(existing)} added)")
+
+        coverage = {'covered_from': covered_from, 'covered_to': covered_to}
+        if merge or delta:
+            # A book pieced together from several windows is recorded with the query parameters of all it covers,
+            # so a later resume of the same range finds it complete
+            params = self.query_params((covered_from, covered_to))
+
+        if df.empty:
+            self.manifest.record(book_number, STATUS_EMPTY, params, **coverage)
+            self.metrics.increment('books_empty')
+            return True
+
+        if not self.save_data(df, book_number):
+            self.manifest.record(book_number, STATUS_FAILED, params, error='Could not save data', failure=OUTCOME_PERMANENT)
+            self.metrics.increment('books_failed')
+            return False
+
+        self.manifest.record(book_number, STATUS_DONE, params, rows=len(df), content_hash=frame_hash(df), **coverage)
+        self.metrics.increment('books_done')
+        self.index_book(book_number, df)
+        return True
+
+    def fail_book(self, book_number, error, window=None):
+        """
+        Record a failed search of a book
+
+        Args:
+            book_number (int): Book number
+            error (Exception): What the search raised
+            window (tuple): (from_date, to_date) that was searched
+
+        Returns:
+            str: OUTCOME_TRANSIENT if the book should be retried later, otherwise OUTCOME_PERMANENT
+        """
+        outcome = classify_error(error)
+        logger.error(f"Failed to process book {book_number} ({outcome}): {error}")
+        self.metrics.increment(f"{outcome}_failures")
+        self.finish_book(book_number, None, error=str(error) or repr(error), window=window, failure=outcome)
+        return outcome
+
+    @contextmanager
+    def _paced_request(self):
+        """
+        Wait for the pacer before a request to the site, and feed the time it took back into the pacer
+
+        Every search, form load and results page goes through here, including
+        the extra searches of a split window, so the request rate stays within
+        the pacer's limit however many requests a book needs. Cached results
+        make no request and are not paced.
+        """
+        with self.metrics.span('pacer_wait'):
+            self.pacer.wait()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            # Timeouts and overload responses slow the pacer down for everyone
+            self.pacer.record(time.monotonic() - started, success=classify_error(e) != OUTCOME_TRANSIENT)
+            raise
+        self.pacer.record(time.monotonic() - started)
+
+    def run_book(self, book_number):
+        """
+        Search, save and record one book
+
+        Returns:
+            str: The book's outcome: OUTCOME_DONE, OUTCOME_EMPTY, OUTCOME_TRANSIENT or OUTCOME_PERMANENT
+        """
+        return self.persist_book(self.fetch_book(book_number))
+
+    def fetch_book(self, book_number, window=None):
+        """
+        Search one book without saving it; each request of the search waits for the pacer
+
+        Args:
+            book_number (int): Book number
+            window (tuple): (from_date, to_date) to search (optional, see query_window)
+
+        Returns:
+            tuple: (book_number, window, df, error); if the search failed, df is None and error is what it raised
+        """
+        window = window or self.query_window(book_number)
+        try:
+            df = self.scrape_book(book_number, *window)
+        except Exception as e:
+            return book_number, window, None, e
+        return book_number, window, df, None
+
+    def persist_book(self, fetched, merge=False):
+        """
+        Save and record a book searched by fetch_book
+
+        Args:
+            fetched (tuple): What fetch_book returned
+            merge (bool): Merge the rows into the book's saved data (see finish_book)
+
+        Returns:
+            str: The book's outcome: OUTCOME_DONE, OUTCOME_EMPTY, OUTCOME_TRANSIENT or OUTCOME_PERMANENT
+        """
+        book_number, window, df, error = fetched
+        if error is not None:
+            return self.fail_book(book_number, error, window)
+        try:
+            if not self.finish_book(book_number, df, window=window, merge=merge):
+                return OUTCOME_PERMANENT
+        except Exception as e:
+            return self.fail_book(book_number, e, window)
+        return OUTCOME_EMPTY if df.empty else OUTCOME_DONE
+
+    def index_book(self, book_number, df):
+        """Upsert a saved book into the query store, if one is configured"""
+        if self.store is None:
+            return
+        try:
+            with self.metrics.span('index'):
+                self.store.upsert_book(book_number, df)
+        except Exception as e:
+            # The CSV/Parquet output is the source of truth; the store can be rebuilt with query_store.py ingest
+            logger.error(f"Failed to index book {book_number} in the query store: {e}")
+
+    def _books_to_scrape(self, start, end):
+        """
+        List the books in a range that still need scraping
+
+        With ``resume`` enabled, books the manifest already records as done or
+        empty for the current query parameters are skipped. In incremental mode,
+        books whose saved data already reaches ``to_date`` are skipped.
+        """
+        books = list(range(start, end + 1))
+
+        if self.incremental:
+            pending = [book for book in books if self._needs_update(book)]
+        elif self.resume:
+            pending = self.manifest.pending(books, self.query_params())
+        else:
+            return books
+
+        skipped = len(books) - len(pending)
+        if skipped:
+            logger.info(f"Resuming: skipping {skipped} books already completed, {len(pending)} left to scrape")
+        return pending
 
-    def scrape_range(self, start=100, end=410):
+    def _needs_update(self, book_number):
+        """Return True unless the book's saved data already covers the whole range (incremental mode)"""
+        from_date, to_date = self.query_window(book_number)
+        if from_date == self.from_date:
+            return True
+        return parse_date(from_date) < parse_date(to_date)
+
+    def scrape_range(self, start=100, end=410, workers=None):
         """
         Scrape data for a range of book numbers
 
+        Books already completed in a previous run with the same query parameters
+        are skipped unless the scraper was created with ``resume=False``. Books
+        that fail transiently (timeouts, dropped connections, overloaded server,
+        crashed browser) are retried after the main pass, in rounds with
+        exponential backoff (see ``max_retries`` and ``retry_delay``).
+
         Args:
             start (int): Starting book number (inclusive)
             end (int): Ending book number (inclusive)
+            workers (int): Number of workers (each with its own browser or HTTP session) to run in parallel
+                (optional, uses the scraper's default if not provided)
+
+        Returns:
+            tuple: (success_count, fail_count) for the books scraped in this run
         """
+        # Every run starts its own timings; workers share this collector
+        self.metrics = Metrics()
+
+        if self.engine == 'async':
+            success_count, fail_count = asyncio.run(self.scrape_range_async(start, end))
+            self.export_metrics()
+            return success_count, fail_count
+
+        if workers is None:
+            workers = self.workers
+
         logger.info(f"Starting scrape for books {start} to {end}")
+        books = self._books_to_scrape(start, end)
+        if not books:
+            logger.info("Nothing to do, every book in the range is already complete")
+            return 0, 0
 
-        self.setup_driver()
+        def run_pass(pending):
+            if workers > 1:
+                return self._scrape_books_parallel(pending, workers)
+            return self._scrape_books_serial(pending)
 
-        success_count = 0
-        fail_count = 0
+        outcomes = run_pass(books)
+        retries = self._retry_failures(outcomes, run_pass)
+
+        success_count, fail_count = self._log_outcomes(outcomes, retries)
+        self.export_metrics()
+        return success_count, fail_count
+
+    def _retry_failures(self, outcomes, run_pass):
+        """
+        Retry the transient failures of a pass in rounds with exponential backoff
+
+        Args:
+            outcomes (dict): Book number to outcome of the first pass, updated with the retries' outcomes
+            run_pass (callable): Scrapes a list of book numbers and returns their outcomes
+
+        Returns:
+            RetryQueue: The rounds that were run, with the books that used up their retries
+        """
+        retries = RetryQueue(self.retry_policy)
+        for delay, pending in self._retry_rounds(outcomes, retries):
+            time.sleep(delay)
+            outcomes.update(run_pass(pending))
+        return retries
+
+    def _retry_rounds(self, outcomes, retries):
+        """
+        Plan the retry rounds of a pass's transient failures
+
+        Shared by the threaded and async runs, which only differ in how they
+        wait and scrape. Before resuming the generator, the caller waits the
+        round's delay, scrapes its books and adds their outcomes to ``outcomes``.
+
+        Args:
+            outcomes (dict): Book number to outcome of the first pass, updated by the caller after each round
+            retries (RetryQueue): Queue the failures are deferred to
+
+        Yields:
+            tuple: (seconds to wait, list of book numbers to scrape again)
+        """
+        retries.defer_failures(outcomes)
+        while retries:
+            attempt, delay, pending = retries.next_round()
+            logger.info(f"Retry round {attempt}: retrying {len(pending)} books in {delay:.0f} s")
+            self.metrics.increment('book_retries', len(pending))
+            yield delay, pending
+            retries.defer_failures({book_num: outcomes[book_num] for book_num in pending if book_num in outcomes})
+
+    def scrape_pipeline(self, start=100, end=410, workers=None, uploader=None, combine=True):
+        """
+        Scrape a range of book numbers with searching, saving and uploading overlapped
+
+        Books go through stages connected by bounded queues: fetch (``workers``
+        threads, each with its own browser or HTTP session, parsing the results
+        as they stream in), persist (save, run manifest and query store) and,
+        with an ``uploader``, upload to Google Drive. A book is saved and
+        uploaded while the next ones are still being searched, so the run takes
+        about as long as its slowest stage. A stage that falls behind makes the
+        ones before it wait rather than holding scraped books in memory.
+        Transient failures are retried in rounds, as in scrape_range; at the end
+        the combined file is rebuilt and uploaded.
+
+        Args:
+            start (int): Starting book number (inclusive)
+            end (int): Ending book number (inclusive)
+            workers (int): Fetch threads (optional, uses the scraper's default if not provided)
+            uploader (DriveUploader): Syncs each saved book's CSV to Drive
+                (optional, nothing is uploaded if not provided)
+            combine (bool): Rebuild the combined file after the last book
+
+        Returns:
+            tuple: (success_count, fail_count) for the books scraped in this run
+
+        Raises:
+            ValueError: With the async engine, or with an uploader and Parquet storage
+        """
+        if self.engine == 'async':
+            raise ValueError("The pipeline runs the http and selenium engines; use scrape_range with the async engine")
+        if uploader is not None and self.storage.format != 'csv':
+            raise ValueError("Uploading from the pipeline needs csv storage")
+        if workers is None:
+            workers = self.workers
+
+        self.metrics = Metrics()
+        logger.info(f"Starting pipelined scrape for books {start} to {end}")
+        books = self._books_to_scrape(start, end)
+        if not books:
+            logger.info("Nothing to do, every book in the range is already complete")
+            return 0, 0
+
+        # The Drive folder is listed once; each upload compares against this listing
+        remote_files = uploader.list_folder() if uploader is not None else {}
+
+        def run_pass(pending):
+            return self._scrape_books_pipelined(pending, workers, uploader, remote_files)
+
+        outcomes = run_pass(books)
+        retries = self._retry_failures(outcomes, run_pass)
+        success_count, fail_count = self._log_outcomes(outcomes, retries)
 
+        if combine:
+            combined = self.create_combined_file()
+            if combined and uploader is not None:
+                uploader.sync_file(combined, remote_files.get(os.path.basename(combined)))
+        self.export_metrics()
+        return success_count, fail_count
+
+    def _scrape_books_pipelined(self, books, workers, uploader=None, remote_files=None):
+        """
+        Scrape a list of book numbers through the fetch, persist and upload stages
+
+        Returns:
+            dict: Book number to its outcome
+        """
+        total = len(books)
+        workers = min(workers, total)
+        logger.info(f"Scraping {total} books with {workers} fetch workers")
+
+        lock = threading.Lock()
+        local = threading.local()
+        fetchers = []
+        outcomes = {}
+
+        def fetch(book_num):
+            # Each fetch thread keeps its own scraper, and with it its own browser or session
+            scraper = getattr(local, 'scraper', None)
+            if scraper is None:
+                scraper = local.scraper = self._spawn_worker()
+                with lock:
+                    fetchers.append(scraper)
+            return scraper.fetch_book(book_num)
+
+        def persist(fetched):
+            outcome = self.persist_book(fetched)
+            with lock:
+                outcomes[fetched[0]] = outcome
+                processed = len(outcomes)
+
+            _log_progress(processed, total)
+            return fetched[0] if outcome == OUTCOME_DONE and uploader is not None else None
+
+        def upload(book_num):
+            path = self.storage.path(book_num)
+            with self.metrics.span('upload'):
+                result = uploader.sync_file(path, remote_files.get(os.path.basename(path)))
+            self.metrics.increment(f"uploads_{result}")
+
+        stages = [Stage('fetch', fetch, workers), Stage('persist', persist)]
+        if uploader is not None:
+            stages.append(Stage('upload', upload, uploader.workers))
         try:
-            for book_num in range(start, end + 1):
-                try:
-                    df = self.scrape_book(book_num)
+            Pipeline(stages, metrics=self.metrics).run(books)
+        finally:
+            for scraper in fetchers:
+                scraper.close()
 
-                    if df is not None:
-                        self.save_data(df, book_num)
-                        success_count += 1
-                    else:
-                        fail_count += 1
+        unprocessed = [book_num for book_num in books if book_num not in outcomes]
+        if unprocessed:
+            logger.error(f"{len(unprocessed)} books did not make it through the pipeline")
+            outcomes.update((book_num, OUTCOME_TRANSIENT) for book_num in unprocessed)
+        return outcomes
 
-                    # Add a small delay between requests to be polite
-                    time.sleep(2)
+    def _log_outcomes(self, outcomes, retries):
+        """
+        Log the final outcome of a run's books
 
-                except Exception as e:
-                    logger.error(f"Failed to process book {book_num}: {e}")
-                    fail_count += 1
-                    continue
+        Returns:
+            tuple: (success_count, fail_count)
+        """
+        if retries.exhausted:
+            logger.error(f"Books still failing after {retries.attempt} retry rounds: {retries.exhausted}")
+        permanent = sorted(book for book, outcome in outcomes.items() if outcome == OUTCOME_PERMANENT)
+        if permanent:
+            logger.error(f"Books that failed permanently: {permanent}")
+
+        success_count = sum(1 for outcome in outcomes.values() if outcome in SUCCESS_OUTCOMES)
+        fail_count = len(outcomes) - success_count
+        empty_count = sum(1 for outcome in outcomes.values() if outcome == OUTCOME_EMPTY)
+        logger.info(f"Scraping complete! Success: {success_count} ({empty_count} without results), Failed: {fail_count}")
+        return success_count, fail_count
+
+    def export_metrics(self):
+        """
+        Log the run's phase timings and write them to ``metrics.json`` and
+        ``metrics.prom`` (Prometheus textfile format) in the output directory
+        """
+        self.metrics.log_summary()
+        try:
+            self.metrics.write_json(os.path.join(self.output_dir, 'metrics.json'))
+            self.metrics.write_prometheus(os.path.join(self.output_dir, 'metrics.prom'))
+        except OSError as e:
+            logger.error(f"Could not write metrics: {e}")
+
+    def _scrape_books_serial(self, books):
+        """
+        Scrape a list of book numbers one after another with this scraper's browser or session
+
+        Returns:
+            dict: Book number to its outcome
+        """
+        outcomes = {}
+        try:
+            for processed, book_num in enumerate(books, start=1):
+                outcomes[book_num] = self.run_book(book_num)
+                _log_progress(processed, len(books))
+        finally:
+            self.close()
+
+        return outcomes
+
+    def _spawn_worker(self):
+        """Create a copy of this scraper that shares its settings and pacer but owns its own browser and session"""
+        worker = copy.copy(self)
+        worker.driver = None
+        worker.http = None
+        worker._reset_form_state()
+        worker._session_fields = set()
+        return worker
+
+    def _scrape_books_parallel(self, books, workers):
+        """
+        Scrape a list of book numbers with a pool of workers
+
+        Each worker owns its own Chrome instance (or HTTP session) and claims book numbers from a shared
+        queue, so a slow book never holds up the others. All workers share
+        ``self.pacer`` so the request rate against the site stays within the
+        configured politeness limit.
+
+        Args:
+            books (list): Book numbers to scrape
+            workers (int): Number of workers
+
+        Returns:
+            dict: Book number to its outcome
+        """
+        total = len(books)
+        workers = min(workers, total)
+        logger.info(f"Scraping {total} books with {workers} parallel workers")
+
+        book_queue = queue.Queue()
+        for book_num in books:
+            book_queue.put(book_num)
+
+        lock = threading.Lock()
+        outcomes = {}
+
+        def run_worker(worker_id):
+            scraper = self._spawn_worker()
+            try:
+                if scraper.engine == 'selenium':
+                    scraper.setup_driver()
+            except Exception as e:
+                logger.error(f"Worker {worker_id} could not start a browser: {e}")
+                return
 
-                # Log progress every 10 books
-                if book_num % 10 == 0:
-                    logger.info(f"Progress: {book_num - start + 1}/{end - start + 1} books processed")
+            try:
+                while True:
+                    try:
+                        book_num = book_queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                    outcome = scraper.run_book(book_num)
+
+                    with lock:
+                        outcomes[book_num] = outcome
+                        processed = len(outcomes)
+
+                    _log_progress(processed, total)
+            finally:
+                scraper.close()
+
+        threads = [
+            threading.Thread(target=run_worker, args=(i,), name=f"scraper-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Books left in the queue were never attempted because every browser failed to start
+        unclaimed = [book_num for book_num in books if book_num not in outcomes]
+        if unclaimed:
+            logger.error(f"{len(unclaimed)} books were not attempted because no worker was available")
+            outcomes.update((book_num, OUTCOME_TRANSIENT) for book_num in unclaimed)
+
+        return outcomes
+
+    def scrape_queue(self, work_queue, workers=None, poll_interval=10.0):
+        """
+        Scrape units claimed from a shared work queue until none are left
+
+        Any number of processes, on machines that share the output directory and
+        the queue database, can run this at the same time. Each unit (a book, or
+        a date window of one) is claimed under a lease that a heartbeat thread
+        renews while it is scraped; if the process dies, the lease expires and
+        another worker takes the unit over. A book split into windows has each
+        window merged into its saved data, and the run manifest is shared with
+        the other processes. Transient failures go back to the queue with backoff
+        (see ``max_retries`` and ``retry_delay``), for any worker to retry.
+
+        Args:
+            work_queue (WorkQueue): Queue to claim units from (see work_queue.py)
+            workers (int): Units this process scrapes at a time, each with its own browser or HTTP session
+                (optional, uses the scraper's default if not provided)
+            poll_interval (float): Seconds to wait before looking again when every
+                remaining unit is leased by another worker or waiting for its retry
+
+        Returns:
+            tuple: (success_count, fail_count) for the units this process finished
+
+        Raises:
+            ValueError: With the async engine
+        """
+        if self.engine == 'async':
+            raise ValueError("The work queue runs the http and selenium engines")
+        if workers is None:
+            workers = self.workers
 
+        self.metrics = Metrics()
+        # Other processes record their books in the same manifest
+        self.manifest.shared = True
+        logger.info(f"Working on queue {work_queue.path} as {work_queue.worker_id} with {workers} workers")
+
+        lock = threading.Lock()
+        outcomes = []
+
+        def run_worker(worker_id):
+            scraper = self._spawn_worker()
+            try:
+                while True:
+                    unit = work_queue.claim(self.property_type)
+                    if unit is None:
+                        if work_queue.drained(self.property_type):
+                            return
+                        time.sleep(poll_interval)
+                        continue
+
+                    window = (unit['from_date'], unit['to_date'])
+                    logger.info(f"Worker {worker_id} claimed book {unit['book_number']} "
+                                f"({window[0]} to {window[1]}, attempt {unit['attempts']})")
+                    fetched = scraper.fetch_book(unit['book_number'], window)
+                    outcome = scraper.persist_book(fetched, merge=unit['parts'] > 1)
+                    error = fetched[3]
+                    if not work_queue.complete(unit, outcome, error=str(error) if error else None,
+                                               retry_policy=self.retry_policy):
+                        self.metrics.increment('leases_lost')
+
+                    with lock:
+                        outcomes.append(outcome)
+                        processed = len(outcomes)
+
+                    _log_progress(processed, queue_status=work_queue.status)
+            finally:
+                scraper.close()
+
+        threads = [
+            threading.Thread(target=run_worker, args=(i,), name=f"queue-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        work_queue.start_heartbeat()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
         finally:
-            if self.driver:
-                self.driver.quit()
-                logger.info("WebDriver closed")
+            work_queue.stop_heartbeat()
+            # After an interrupt, hand the unfinished units back instead of waiting for their leases to expire
+            work_queue.release_all()
 
-        logger.info(f"Scraping complete! Success: {success_count}, Failed: {fail_count}")
+        success_count = sum(1 for outcome in outcomes if outcome in SUCCESS_OUTCOMES)
+        fail_count = len(outcomes) - success_count
+        logger.info(f"Queue drained. This worker finished {success_count} units, {fail_count} failed; "
+                    f"queue: {work_queue.status()}")
+        self.export_metrics()
         return success_count, fail_count
 
-    def create_combined_file(self):
-        """Combine all individual CSV files into one master file"""
-        logger.info("Creating combined CSV file...")
+    async def scrape_range_async(self, start=100, end=410, concurrency=None):
+        """
+        Scrape a range of book numbers with many searches in flight on one event loop
 
-        csv_files = [f for f in os.listdir(self.output_dir) if f.startswith('book_') and f.endswith('.csv')]
+        Requests go through a per-host token bucket that allows one search every
+        ``request_interval`` seconds. Each book is parsed and saved as soon as its
+        response arrives, so an interrupted run keeps everything finished so far.
+        Transient failures are retried after the main pass, as in scrape_range.
 
-        if not csv_files:
-            logger.warning("No CSV files found to combine")
-            return
+        Args:
+            start (int): Starting book number (inclusive)
+            end (int): Ending book number (inclusive)
+            concurrency (int): Maximum number of searches in flight
+                (optional, uses the scraper's default if not provided)
 
-        dfs = []
-        for csv_file in csv_files:
-            filepath = os.path.join(self.output_dir, csv_file)
+        Returns:
+            tuple: (success_count, fail_count) for the books scraped in this run
+        """
+        if concurrency is None:
+            concurrency = self.concurrency
+
+        logger.info(f"Starting async scrape for books {start} to {end}")
+        books = self._books_to_scrape(start, end)
+        if not books:
+            logger.info("Nothing to do, every book in the range is already complete")
+            return 0, 0
+
+        outcomes = await self._scrape_books_async(books, concurrency)
+        retries = RetryQueue(self.retry_policy)
+        for delay, pending in self._retry_rounds(outcomes, retries):
+            await asyncio.sleep(delay)
+            outcomes.update(await self._scrape_books_async(pending, concurrency))
+
+        return self._log_outcomes(outcomes, retries)
+
+    async def _scrape_books_async(self, books, concurrency):
+        """
+        Scrape a list of book numbers concurrently on the running event loop
+
+        Returns:
+            dict: Book number to its outcome
+        """
+        from async_engine import AsyncSearchEngine, HostRateLimiter
+
+        total = len(books)
+        logger.info(f"Scraping {total} books with up to {concurrency} requests in flight")
+
+        book_queue = asyncio.Queue()
+        for book_num in books:
+            book_queue.put_nowait(book_num)
+
+        # A request interval of 0 turns pacing off, as it does for the other engines
+        limiter = HostRateLimiter(rate=1.0 / self.pacer.min_interval if self.pacer.min_interval > 0 else None)
+        engine = AsyncSearchEngine(self.url, limiter, timeout=self.page_timeout, concurrency=concurrency, metrics=self.metrics)
+        loop = asyncio.get_running_loop()
+        outcomes = {}
+
+        async def run_worker():
+            while True:
+                try:
+                    book_num = book_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                logger.info(f"Scraping book number: {book_num}")
+                window = self.query_window(book_num)
+                try:
+                    with self.metrics.span('scrape_book'):
+                        df = await self._scrape_window_async(engine, book_num, window)
+                    if await loop.run_in_executor(None, self.finish_book, book_num, df, None, window):
+                        outcomes[book_num] = OUTCOME_EMPTY if df.empty else OUTCOME_DONE
+                    else:
+                        outcomes[book_num] = OUTCOME_PERMANENT
+                except Exception as e:
+                    outcomes[book_num] = await loop.run_in_executor(None, self.fail_book, book_num, e, window)
+
+                _log_progress(len(outcomes), total)
+
+        await engine.open()
+        tasks = [asyncio.create_task(run_worker()) for _ in range(min(concurrency, total))]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # On cancellation or error, stop the remaining workers before closing the session
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await engine.close()
+
+        return outcomes
+
+    async def _scrape_window_async(self, engine, book_number, window):
+        """Search one date window of a book on the event loop, splitting it while it has too many results"""
+        try:
+            return await self._search_window_async(engine, book_number, window)
+        except WindowTooLarge as e:
+            parts = [await self._scrape_window_async(engine, book_number, half) for half in self._split_search(book_number, e)]
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._stitch_windows, book_number, window, parts
+            )
+
+    async def _search_window_async(self, engine, book_number, window):
+        """
+        Run one search for a book and date window with the async engine
+
+        Raises:
+            WindowTooLarge: If the results have to be searched in smaller windows
+        """
+        # Parsing, caching and writing are blocking, keep them off the event loop
+        loop = asyncio.get_running_loop()
+        df = await loop.run_in_executor(None, self._cached_results, book_number, window)
+        if df is not None:
+            return df
+
+        writer = await loop.run_in_executor(None, self._cache_writer, book_number, window)
+        try:
+            parser = ResultsTableParser()
+            with self.metrics.span('http_search'):
+                page_html, page_url = await engine.search(book_number, window[0], window[1], self.property_type)
+            while True:
+                # Relative next-page links are resolved against the page they were found on
+                with self.metrics.span('parse'):
+                    page = await loop.run_in_executor(None, _feed_page, parser, writer, page_html, page_url)
+                if not self._more_pages(page, parser, book_number, window):
+                    break
+                with self.metrics.span('http_fetch'):
+                    page_html, page_url = await engine.fetch(page['next_url'])
+            df = await loop.run_in_executor(None, self._results_frame, parser, book_number, window)
+        except BaseException:
+            if writer:
+                writer.abort()
+            raise
+
+        if writer:
+            await loop.run_in_executor(None, writer.commit)
+        return df
+
+    def reparse_from_cache(self, start=None, end=None):
+        """
+        Rebuild the per-book CSV files from the response cache without touching the network
+
+        Every cached search for the scraper's property type is parsed again
+        (expired entries included), and the windows cached for the same book
+        are merged in date order, as incremental runs would have merged them.
+
+        Args:
+            start (int): First book number to rebuild (optional, all cached books if not provided)
+            end (int): Last book number to rebuild (optional)
+
+        Returns:
+            tuple: (success_count, fail_count)
+        """
+        if self.cache is None:
+            raise ValueError("reparse_from_cache needs a scraper created with cache_dir")
+
+        by_book = {}
+        for entry in self.cache.entries():
+            book_number = entry['book']
+            if entry['property_type'] != self.property_type:
+                continue
+            if (start is not None and book_number < start) or (end is not None and book_number > end):
+                continue
+            by_book.setdefault(book_number, []).append(entry)
+
+        logger.info(f"Reparsing {len(by_book)} books from the response cache")
+        success_count = 0
+        fail_count = 0
+
+        for book_number in sorted(by_book):
+            entries = sorted(by_book[book_number], key=lambda e: (parse_date(e['from_date']), parse_date(e['to_date'])))
+            window = (
+                min((e['from_date'] for e in entries), key=parse_date),
+                max((e['to_date'] for e in entries), key=parse_date),
+            )
             try:
-                df = pd.read_csv(filepath)
-                dfs.append(df)
+                df = None
+                for entry in entries:
+                    part = self._parse_cache_entry(entry)
+                    df = part if df is None else self.merge_book(df, part)
             except Exception as e:
-                logger.error(f"Error reading {csv_file}: {e}")
+                logger.error(f"Failed to reparse book {book_number}: {e}")
+                self.manifest.record(book_number, STATUS_FAILED, self.query_params(window), error=str(e))
+                fail_count += 1
+                continue
 
-        if dfs:
-            combined_df = pd.concat(dfs, ignore_index=True)
-            combined_filepath = os.path.join(self.output_dir, 'all_books_combined.csv')
-            combined_df.to_csv(combined_filepath, index=False)
-            logger.info(f"Combined file created: {combined_filepath} ({len(combined_df)} total rows)")
+            params = self.query_params(window)
+            coverage = {'covered_from': window[0], 'covered_to': window[1]}
+            df = self.normalize_book(book_number, df)
+            if df.empty:
+                self.manifest.record(book_number, STATUS_EMPTY, params, **coverage)
+                success_count += 1
+            elif self.save_data(df, book_number):
+                self.manifest.record(book_number, STATUS_DONE, params, rows=len(df), content_hash=frame_hash(df), **coverage)
+                self.index_book(book_number, df)
+                success_count += 1
+            else:
+                self.manifest.record(book_number, STATUS_FAILED, params, error='Could not save data')
+                fail_count += 1
+
+        logger.info(f"Reparse complete: {success_count} successful, {fail_count} failed")
+        return success_count, fail_count
+
+    def create_combined_file(self, incremental=True):
+        """
+        Combine all saved books into one master CSV file
+
+        Books are streamed in book number order a chunk at a time, so memory use
+        does not grow with the dataset. With ``incremental`` set, only books that
+        changed since the last combine are re-encoded (see combine.combine_books).
+
+        Returns:
+            str: Path of the combined file, or None if there was nothing to combine
+        """
+        logger.info("Creating combined CSV file...")
+
+        combined_filepath = os.path.join(self.output_dir, COMBINED_FILENAME)
+        try:
+            rows = combine_books(self.storage, combined_filepath, incremental=incremental)
+        except Exception as e:
+            logger.error(f"Error creating combined file: {e}")
+            return None
+
+        if rows is None:
+            logger.warning("No saved books found to combine")
+            return None
+
+        logger.info(f"Combined file created: {combined_filepath} ({rows} total rows)")
+        return combined_filepath
 
 
 def main():
     """Main execution function"""
+    from cli import configure_logging
+
+    configure_logging()
     scraper = MohaveScraper(
         output_dir='scraped_data',
         from_date='01/01/2010',
@@ -0,0 +1,219 @@
+"""
+Typed normalization of scraped result columns
+Sale prices, dates, acreage and parcel numbers are converted from the site's
+text to compact typed columns with vectorized pandas operations, a price per
+acre is derived, and the rows holding values that cannot be converted are reported
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+from storage import METADATA_COLUMNS
+from parcel_numbers import (
+    PARCEL_PATTERN, DASHED_PARCEL_PATTERN, PARCEL_SEPARATORS, BARE_PARCEL_PATTERN,
+    BOOK_MAP_PARCEL_PATTERN, BOOK_MAP_PARCEL_FORMAT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Header keywords of the columns that are converted, checked in this order
+# (so a "Price per Acre" column is a price, and "Sale Date" is a date)
+COLUMN_KEYWORDS = (
+    ('price', ('price', 'consideration', 'amount')),
+    ('acres', ('acre',)),
+    ('date', ('date',)),
+    ('parcel', ('parcel', 'apn')),
+)
+
+# Column derived from the sale price and acreage
+PRICE_PER_ACRE = 'price_per_acre'
+
+# Column of the rejects report naming the values that could not be converted
+REJECTED_COLUMNS = 'rejected_columns'
+
+# Date formats tried in order: the site's, with and without a time, and the ISO dates saved books hold
+DATE_FORMATS = ('%m/%d/%Y', '%m/%d/%Y %I:%M:%S %p', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S')
+
+# Characters stripped from prices and areas ($12,500.00, 1,250.5 ac)
+NUMBER_NOISE = r'[$,\s]|ac(?:res?)?$'
+
+def column_kinds(columns):
+    """
+    Find the columns to convert from their headers
+
+    Returns:
+        dict: Column name to 'price', 'acres', 'date' or 'parcel'
+    """
+    kinds = {}
+    for column in columns:
+        if column in METADATA_COLUMNS or column == PRICE_PER_ACRE:
+            continue
+        name = str(column).lower()
+        for kind, keywords in COLUMN_KEYWORDS:
+            if any(keyword in name for keyword in keywords):
+                kinds[column] = kind
+                break
+    return kinds
+
+
+def _per_distinct(values, convert, dtype):
+    """
+    Apply a text conversion to each distinct value once and spread the results over the column
+
+    Dates, prices and parcel numbers repeat a lot across a county's sales, so
+    this does far less string work than converting every cell.
+
+    Args:
+        values (pd.Series): Cell values
+        convert (callable): Takes a Series of distinct, stripped texts and returns the converted Series
+        dtype (str): dtype of the result
+
+    Returns:
+        tuple: (converted series, missing where the cell was blank or the conversion failed;
+        True where a value was present but could not be converted)
+    """
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    converted = pd.Series(convert(text), dtype=dtype)
+    failed = converted.isna() & text.ne('')
+    # Code -1 marks missing cells; they take the missing value appended at the end
+    converted = pd.concat([converted, pd.Series([None], dtype=dtype)], ignore_index=True)
+    failed = np.append(failed.to_numpy(), False)
+    return (pd.Series(converted.take(codes).to_numpy(), index=values.index, dtype=dtype),
+            pd.Series(failed[codes], index=values.index))
+
+
+def _parse_numbers(text):
+    numbers = pd.to_numeric(text.str.replace('$', '', regex=False).str.replace(',', '', regex=False), errors='coerce')
+    failed = numbers.isna()
+    if failed.any():
+        # Slower clean-up for the few values in other forms: spaces, units, (1,000.00) negatives
+        retry = text[failed].str.replace(NUMBER_NOISE, '', regex=True, case=False)
+        retry = retry.str.replace(r'^\((.*)\)$', r'-\1', regex=True)
+        numbers[failed] = pd.to_numeric(retry, errors='coerce')
+    return numbers
+
+
+def _to_number(values, dtype):
+    if is_numeric_dtype(values):
+        return values.astype(dtype), pd.Series(False, index=values.index)
+    return _per_distinct(values, _parse_numbers, dtype)
+
+
+def to_price(values):
+    """
+    Convert sale prices to float64 dollars
+
+    Returns:
+        tuple: (converted series, True where a value was present but could not be converted)
+    """
+    return _to_number(values, 'float64')
+
+
+def to_acres(values):
+    """Convert areas to float32 acres; returns (converted series, failed mask) as to_price"""
+    return _to_number(values, 'float32')
+
+
+def _parse_dates(text):
+    dates = pd.to_datetime(text, format=DATE_FORMATS[0], errors='coerce')
+    for date_format in DATE_FORMATS[1:]:
+        missing = dates.isna()
+        if not missing.any():
+            break
+        dates[missing] = pd.to_datetime(text[missing], format=date_format, errors='coerce')
+    return dates
+
+
+def to_date(values):
+    """
+    Convert dates to datetime64, trying each of DATE_FORMATS on the values the previous ones left
+
+    Returns:
+        tuple: (converted series, failed mask) as to_price
+    """
+    if is_datetime64_any_dtype(values):
+        return values.astype('datetime64[ns]'), pd.Series(False, index=values.index)
+    return _per_distinct(values, _parse_dates, 'datetime64[ns]')
+
+
+def _parse_parcels(text):
+    # Values already in the usual dashed form skip the clean-up
+    canonical = text.str.fullmatch(DASHED_PARCEL_PATTERN)
+    if canonical.all():
+        return text
+
+    # Only the values not already in canonical form are cleaned up
+    other = text[~canonical].str.upper().str.replace(PARCEL_SEPARATORS, '-', regex=True)
+    bare = other.str.fullmatch(BARE_PARCEL_PATTERN)
+    other[bare] = other[bare].str.zfill(8).str.replace(BOOK_MAP_PARCEL_PATTERN, BOOK_MAP_PARCEL_FORMAT, regex=True)
+    text = text.copy()
+    text[~canonical] = other.where(other.str.fullmatch(PARCEL_PATTERN))
+    return text
+
+
+def to_parcel(values):
+    """
+    Convert parcel numbers to one canonical text form, e.g. ``123-45-678``
+
+    Separators are unified to dashes and letters upper-cased. Seven or eight
+    bare digits (as a parcel number read as a number loses its dashes and
+    leading zero) are formatted as book-map-parcel.
+
+    Returns:
+        tuple: (converted series of dtype string, failed mask) as to_price
+    """
+    if is_numeric_dtype(values):
+        values = values.round().astype('Int64').astype('string')
+    return _per_distinct(values, _parse_parcels, 'string')
+
+
+CONVERTERS = {'price': to_price, 'acres': to_acres, 'date': to_date, 'parcel': to_parcel}
+
+
+def normalize_frame(df):
+    """
+    Convert a book's price, date, acreage and parcel columns to typed columns
+
+    Every step works on whole columns. A value that cannot be converted becomes
+    missing in the result, and its row is reported in the rejects with the raw
+    values. Normalizing a frame that is already normalized, or one loaded back
+    from a saved CSV, gives the same frame again, so saved and newly scraped
+    rows can be compared.
+
+    Args:
+        df (pd.DataFrame): Results of one book, with or without metadata columns
+
+    Returns:
+        tuple: (normalized DataFrame with a ``price_per_acre`` column when the book has
+        a price and an acreage column, rejects DataFrame: the original rows that held
+        an unconvertible value, with those columns named in ``rejected_columns``)
+    """
+    kinds = column_kinds(df.columns)
+    if df.empty or not kinds:
+        return df, df.iloc[0:0]
+
+    normalized = df.copy()
+    failed = {}
+    for column, kind in kinds.items():
+        normalized[column], failed[column] = CONVERTERS[kind](df[column])
+
+    price = next((column for column, kind in kinds.items() if kind == 'price'), None)
+    acres = next((column for column, kind in kinds.items() if kind == 'acres'), None)
+    if price is not None and acres is not None:
+        area = normalized[acres].astype('float64')
+        normalized[PRICE_PER_ACRE] = (normalized[price] / area.where(area > 0)).round(2)
+        # Keep the derived column with the data, ahead of the metadata
+        data_columns = [c for c in normalized.columns if c not in METADATA_COLUMNS and c != PRICE_PER_ACRE]
+        normalized = normalized[data_columns + [PRICE_PER_ACRE] + [c for c in METADATA_COLUMNS if c in normalized.columns]]
+
+    failed = pd.DataFrame(failed, index=df.index)
+    rejected = failed.any(axis=1).to_numpy()
+    rejects = df.loc[rejected].copy()
+    if len(rejects):
+        names = np.array(failed.columns, dtype=object)
+        rejects[REJECTED_COLUMNS] = [', '.join(names[row]) for row in failed.loc[rejected].to_numpy()]
+    return normalized, rejects
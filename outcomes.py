@@ -0,0 +1,146 @@
+"""
+Outcomes of scraping a book and the deferred retry of transient failures
+A search either finds rows, finds that the book has no results, or fails; a
+failure is transient (timeouts, dropped connections, overloaded server, crashed
+browser) and worth retrying later, or permanent and reported as is
+"""
+
+import random
+import asyncio
+
+# Outcome of one attempt at a book
+OUTCOME_DONE = 'done'
+OUTCOME_EMPTY = 'empty'
+OUTCOME_TRANSIENT = 'transient'
+OUTCOME_PERMANENT = 'permanent'
+
+SUCCESS_OUTCOMES = (OUTCOME_DONE, OUTCOME_EMPTY)
+
+# HTTP statuses that mean "try again later" rather than "this request is wrong"
+TRANSIENT_HTTP_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+
+class ScrapeError(Exception):
+    """A search for a book failed"""
+
+
+class TransientScrapeError(ScrapeError):
+    """A search failed in a way that may succeed if it is tried again later"""
+
+
+class PermanentScrapeError(ScrapeError):
+    """A search failed in a way that trying again will not fix"""
+
+
+def http_status(error):
+    """HTTP status carried by a requests or aiohttp error, or None"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None:
+        status = getattr(error, 'status', None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(error):
+    """
+    Decide whether a failed search is worth retrying
+
+    Args:
+        error (Exception): What scrape_book raised
+
+    Returns:
+        str: OUTCOME_TRANSIENT or OUTCOME_PERMANENT
+    """
+    if isinstance(error, TransientScrapeError):
+        return OUTCOME_TRANSIENT
+    if isinstance(error, PermanentScrapeError):
+        return OUTCOME_PERMANENT
+
+    status = http_status(error)
+    if status is not None:
+        return OUTCOME_TRANSIENT if status in TRANSIENT_HTTP_STATUSES else OUTCOME_PERMANENT
+
+    # Malformed URLs and values; requests' URL errors are also OSErrors
+    if isinstance(error, ValueError):
+        return OUTCOME_PERMANENT
+    # Timeouts, refused and reset connections (requests' errors are OSErrors too)
+    if isinstance(error, (OSError, asyncio.TimeoutError)):
+        return OUTCOME_TRANSIENT
+    return OUTCOME_PERMANENT
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter for the retry rounds after the main pass"""
+
+    def __init__(self, max_retries=3, base_delay=30.0, max_delay=600.0, jitter=0.5):
+        """
+        Args:
+            max_retries (int): Retry rounds a book gets after its first attempt
+            base_delay (float): Seconds before the first retry round
+            max_delay (float): Longest wait before a round
+            jitter (float): Fraction of the delay that is randomized, so runs on
+                several machines do not retry in lockstep
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        """
+        Seconds to wait before a retry round
+
+        Args:
+            attempt (int): Retry round, from 1
+
+        Returns:
+            float: base_delay * 2 ** (attempt - 1), capped at max_delay, minus up to ``jitter`` of it
+        """
+        backoff = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return backoff * (1 - self.jitter * random.random())
+
+
+class RetryQueue:
+    """
+    Books whose last attempt failed transiently, retried in rounds
+
+    Each round takes every book deferred since the previous one. A book that
+    has used up its retries is not queued again and stays failed.
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.attempt = 0
+        self._pending = []
+        self.exhausted = []
+
+    def __len__(self):
+        return len(self._pending)
+
+    def defer_failures(self, outcomes):
+        """
+        Queue the transient failures of a pass
+
+        Args:
+            outcomes (dict): Book number to the outcome of its latest attempt
+
+        Returns:
+            int: Number of books queued
+        """
+        failed = sorted(book for book, outcome in outcomes.items() if outcome == OUTCOME_TRANSIENT)
+        if self.attempt >= self.policy.max_retries:
+            self.exhausted.extend(failed)
+            return 0
+        self._pending.extend(failed)
+        return len(failed)
+
+    def next_round(self):
+        """
+        Take the books of the next round
+
+        Returns:
+            tuple: (attempt number, seconds to wait first, list of book numbers)
+        """
+        self.attempt += 1
+        books, self._pending = self._pending, []
+        return self.attempt, self.policy.delay(self.attempt), books
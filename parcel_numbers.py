@@ -0,0 +1,45 @@
+"""
+Parcel number patterns
+The canonical form of a parcel number, shared by the column conversion in
+normalize.py and the one-off lookups of query_store.py. Only the standard
+library is used, so a parcel lookup starts without pandas
+"""
+
+import re
+
+# Canonical parcel number: groups of digits and letters joined by dashes
+PARCEL_PATTERN = r'[0-9A-Z]+(?:-[0-9A-Z]+)*'
+
+# The usual dashed form (123-45-678), already canonical
+DASHED_PARCEL_PATTERN = r'[0-9A-Z]+(?:-[0-9A-Z]+)+'
+
+# Spaces, dots, underscores and slashes typed between the groups, unified to a dash
+PARCEL_SEPARATORS = r'[\s._/]+'
+
+# Seven or eight bare digits: a parcel number read as a number, which lost its dashes and leading zero
+BARE_PARCEL_PATTERN = r'\d{7,8}'
+
+# Eight digits split into book, map and parcel
+BOOK_MAP_PARCEL_PATTERN = r'^(\d{3})(\d{2})(\d{3})$'
+BOOK_MAP_PARCEL_FORMAT = r'\1-\2-\3'
+
+
+def canonical_parcel(text):
+    """
+    Convert one parcel number to its canonical form, e.g. ``123-45-678``
+
+    The same conversion normalize.to_parcel applies to a whole column.
+
+    Args:
+        text (str): Parcel number as typed or shown by the site
+
+    Returns:
+        str: The canonical parcel number, or None if the text is not one
+    """
+    text = text.strip()
+    if re.fullmatch(DASHED_PARCEL_PATTERN, text):
+        return text
+    text = re.sub(PARCEL_SEPARATORS, '-', text.upper())
+    if re.fullmatch(BARE_PARCEL_PATTERN, text):
+        text = re.sub(BOOK_MAP_PARCEL_PATTERN, BOOK_MAP_PARCEL_FORMAT, text.zfill(8))
+    return text if re.fullmatch(PARCEL_PATTERN, text) else None
@@ -0,0 +1,131 @@
+"""
+Staged pipeline with bounded queues between the stages
+Each stage runs on its own worker threads and hands its results to the next
+stage through a queue of limited size, so a slow stage makes the stages before
+it wait (backpressure) instead of letting items pile up in memory
+"""
+
+import time
+import queue
+import logging
+import threading
+
+from metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# Items a stage's input queue holds per worker of that stage
+QUEUE_ITEMS_PER_WORKER = 2
+
+# Tells a worker that no more items will come
+_DONE = object()
+
+
+class Stage:
+    """One step of a pipeline: a function applied to every item by a pool of worker threads"""
+
+    def __init__(self, name, process, workers=1, capacity=None):
+        """
+        Args:
+            name (str): Stage name, used for thread names and metrics
+            process (callable): Called with each item. Its return value is passed
+                to the next stage, unless it is None
+            workers (int): Threads running ``process``
+            capacity (int): Items the stage's input queue holds before the stage
+                feeding it has to wait (optional, QUEUE_ITEMS_PER_WORKER per worker if not provided)
+        """
+        self.name = name
+        self.process = process
+        self.workers = max(1, workers)
+        self.capacity = capacity or QUEUE_ITEMS_PER_WORKER * self.workers
+
+
+class Pipeline:
+    """
+    Stages connected by bounded queues
+
+    Every stage works on a different item at the same time, so the run takes
+    about as long as its slowest stage rather than the sum of all of them. The
+    time a stage spends waiting for room in the next stage's queue is recorded
+    as the ``<stage>_blocked`` phase, which shows where the bottleneck is.
+    """
+
+    def __init__(self, stages, metrics=None):
+        """
+        Args:
+            stages (list): Stage objects, in the order items go through them
+            metrics (Metrics): Collector for the blocked time and error counters (optional)
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._queues = []
+        self._results = []
+        self._lock = threading.Lock()
+
+    def run(self, items):
+        """
+        Feed items through every stage and wait until all of them are processed
+
+        An item whose stage raises is logged, counted as ``<stage>_errors`` and
+        dropped; the other items carry on.
+
+        Args:
+            items (iterable): Inputs of the first stage
+
+        Returns:
+            list: Results of the last stage that were not None, in completion order
+        """
+        self._queues = [queue.Queue(maxsize=stage.capacity) for stage in self.stages]
+        self._results = []
+        threads = []
+        for index, stage in enumerate(self.stages):
+            stage_threads = [
+                threading.Thread(target=self._work, args=(index,), name=f"pipeline-{stage.name}-{i}", daemon=True)
+                for i in range(stage.workers)
+            ]
+            for thread in stage_threads:
+                thread.start()
+            threads.append(stage_threads)
+
+        for item in items:
+            self._queues[0].put(item)
+
+        # Stop the stages front to back, so each one drains into the next before that one is told to stop
+        for index, stage in enumerate(self.stages):
+            for _ in range(stage.workers):
+                self._queues[index].put(_DONE)
+            for thread in threads[index]:
+                thread.join()
+
+        return self._results
+
+    def _work(self, index):
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self.stages) else None
+
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+
+            try:
+                result = stage.process(item)
+            except Exception as e:
+                logger.error(f"Pipeline stage {stage.name} failed on {item!r}: {e}")
+                self.metrics.increment(f"{stage.name}_errors")
+                continue
+
+            if result is None:
+                continue
+            if outbox is None:
+                with self._lock:
+                    self._results.append(result)
+                continue
+
+            # Blocks while the next stage is behind; this is the backpressure
+            started = time.perf_counter()
+            outbox.put(result)
+            self.metrics.observe(f"{stage.name}_blocked", time.perf_counter() - started)
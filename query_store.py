@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Local SQLite query store for scraped affidavits
+Upserts each scraped book keyed on the affidavit (or parcel and sale) so that
+parcel lookups and comparable-sales queries run against indexes instead of the combined CSV
+"""
+
+import sys
+import json
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+
+from parcel_numbers import canonical_parcel
+
+logger = logging.getLogger(__name__)
+
+# Header keywords of the result columns the store indexes, checked in order
+KEY_COLUMN_KEYWORDS = {
+    'affidavit': ('affidavit',),
+    'parcel': ('parcel', 'apn'),
+    'sale_date': ('sale date', 'sale_date', 'saledate'),
+    'sale_price': ('sale price', 'sale_price', 'saleprice', 'price'),
+    'acres': ('acre',),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sales (
+    natural_key TEXT PRIMARY KEY,
+    book_number INTEGER NOT NULL,
+    affidavit TEXT,
+    parcel TEXT,
+    sale_date TEXT,
+    sale_price REAL,
+    acres REAL,
+    property_type TEXT,
+    from_date TEXT,
+    to_date TEXT,
+    scraped_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sales_book ON sales (book_number);
+CREATE INDEX IF NOT EXISTS idx_sales_parcel ON sales (parcel);
+CREATE INDEX IF NOT EXISTS idx_sales_sale_date ON sales (sale_date);
+CREATE INDEX IF NOT EXISTS idx_sales_sale_price ON sales (sale_price);
+"""
+
+UPSERT = """
+INSERT INTO sales (natural_key, book_number, affidavit, parcel, sale_date, sale_price, acres,
+                   property_type, from_date, to_date, scraped_at, data)
+VALUES (:natural_key, :book_number, :affidavit, :parcel, :sale_date, :sale_price, :acres,
+        :property_type, :from_date, :to_date, :scraped_at, :data)
+ON CONFLICT (natural_key) DO UPDATE SET
+    book_number = excluded.book_number,
+    affidavit = excluded.affidavit,
+    parcel = excluded.parcel,
+    sale_date = excluded.sale_date,
+    sale_price = excluded.sale_price,
+    acres = excluded.acres,
+    property_type = excluded.property_type,
+    from_date = excluded.from_date,
+    to_date = excluded.to_date,
+    scraped_at = excluded.scraped_at,
+    data = excluded.data
+"""
+
+# Columns returned by queries, besides the full original row in ``data``
+RESULT_COLUMNS = ('book_number', 'affidavit', 'parcel', 'sale_date', 'sale_price', 'acres', 'property_type', 'scraped_at')
+
+
+def find_key_columns(columns):
+    """
+    Match the scraped table's headers to the fields the store indexes
+
+    Returns:
+        dict: Field name (affidavit, parcel, sale_date, sale_price, acres) to column name, for the fields found
+    """
+    found = {}
+    for field, keywords in KEY_COLUMN_KEYWORDS.items():
+        for keyword in keywords:
+            match = next(
+                (c for c in columns if keyword in str(c).lower() and c not in found.values()), None
+            )
+            if match is not None:
+                found[field] = match
+                break
+    return found
+
+
+def _as_number(values):
+    """Parse prices and areas as the site formats them ($12,500.00)"""
+    import pandas as pd
+
+    text = values.astype(str).str.replace(r'[$,\s]', '', regex=True)
+    return pd.to_numeric(text, errors='coerce')
+
+
+def _json_ready(df):
+    """Write typed columns as the text they were scraped from: dates without a time, float32 acres without float noise"""
+    import pandas as pd
+
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime('%Y-%m-%d')
+        elif df[column].dtype == 'float32':
+            df[column] = df[column].astype(str).astype('float64')
+    return df
+
+
+class QueryStore:
+    """Indexed SQLite copy of the scraped affidavits"""
+
+    def __init__(self, path):
+        """
+        Open (and create if needed) the database
+
+        Args:
+            path (str): SQLite database file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def upsert_book(self, book_number, df):
+        """
+        Insert or update the rows of one scraped book
+
+        Rows are keyed on the affidavit number; without one, on the parcel,
+        sale date and price, and without those on the full row content. A row
+        scraped again replaces its earlier copy.
+
+        Args:
+            book_number (int): Book number
+            df (pd.DataFrame): Result of scrape_book (or a saved book)
+
+        Returns:
+            int: Number of rows written
+        """
+        if df is None or df.empty:
+            return 0
+
+        records = self._records(book_number, df)
+        with self._lock, self.conn:
+            self.conn.executemany(UPSERT, records)
+        logger.info(f"Stored {len(records)} rows of book {book_number} in {self.path}")
+        return len(records)
+
+    def _records(self, book_number, df):
+        # pandas is only needed to store books; lookups start without loading it
+        import pandas as pd
+
+        key_columns = find_key_columns(df.columns)
+        data_columns = [c for c in df.columns if c not in ('book_number', 'property_type', 'from_date', 'to_date', 'scraped_at')]
+
+        def column_values(name):
+            if name is None or name not in df.columns:
+                return [None] * len(df)
+            return [None if pd.isna(v) else str(v).strip() or None for v in df[name]]
+
+        def number_values(name):
+            if name is None:
+                return [None] * len(df)
+            return [None if pd.isna(v) else float(v) for v in _as_number(df[name])]
+
+        affidavit = column_values(key_columns.get('affidavit'))
+        parcel = column_values(key_columns.get('parcel'))
+        sale_date = [None] * len(df)
+        if 'sale_date' in key_columns:
+            dates = pd.to_datetime(df[key_columns['sale_date']], errors='coerce', format='mixed')
+            sale_date = [None if pd.isna(v) else v for v in dates.dt.strftime('%Y-%m-%d')]
+        sale_price = number_values(key_columns.get('sale_price'))
+        acres = number_values(key_columns.get('acres'))
+
+        property_types = column_values('property_type')
+        from_dates = column_values('from_date')
+        to_dates = column_values('to_date')
+        scraped = column_values('scraped_at')
+        data = _json_ready(df[data_columns])
+        rows = data.astype(object).where(data.notna(), None).to_dict('records')
+
+        records = []
+        for i, row in enumerate(rows):
+            data = json.dumps(row, default=str, sort_keys=True)
+            if affidavit[i]:
+                natural_key = f"affidavit:{affidavit[i]}"
+            elif parcel[i]:
+                natural_key = f"parcel:{parcel[i]}|{sale_date[i]}|{sale_price[i]}"
+            else:
+                natural_key = f"row:{book_number}:{hashlib.sha256(data.encode('utf-8')).hexdigest()}"
+            records.append({
+                'natural_key': natural_key,
+                'book_number': int(book_number),
+                'affidavit': affidavit[i],
+                'parcel': parcel[i],
+                'sale_date': sale_date[i],
+                'sale_price': sale_price[i],
+                'acres': acres[i],
+                'property_type': property_types[i],
+                'from_date': from_dates[i],
+                'to_date': to_dates[i],
+                'scraped_at': scraped[i],
+                'data': data,
+            })
+        return records
+
+    def parcel(self, parcel):
+        """
+        All recorded sales of a parcel, most recent first
+
+        The number is brought to the canonical form saved books use (see
+        parcel_numbers.canonical_parcel), so ``12345678`` and ``123 45 678``
+        find ``123-45-678``. Rows stored as typed are matched too.
+
+        Args:
+            parcel (str): Parcel number as the site shows it
+
+        Returns:
+            list: One dict per sale
+        """
+        typed = parcel.strip()
+        canonical = canonical_parcel(typed) or typed
+        return self._query(
+            'SELECT * FROM sales WHERE parcel IN (?, ?) ORDER BY sale_date DESC', (canonical, typed)
+        )
+
+    def comparables(self, since=None, until=None, min_price=None, max_price=None, min_acres=None, max_acres=None,
+                    first_book=None, last_book=None, property_type=None, limit=100):
+        """
+        Comparable sales within date, price, size and book ranges, most recent first
+
+        Args:
+            since (str): Earliest sale date (YYYY-MM-DD, inclusive)
+            until (str): Latest sale date (YYYY-MM-DD, inclusive)
+            min_price (float): Lowest sale price
+            max_price (float): Highest sale price
+            min_acres (float): Smallest parcel size
+            max_acres (float): Largest parcel size
+            first_book (int): Lowest book number
+            last_book (int): Highest book number
+            property_type (str): Property type the rows were scraped for
+            limit (int): Maximum number of sales returned
+
+        Returns:
+            list: One dict per sale
+        """
+        conditions = []
+        params = []
+        for clause, value in (
+            ('sale_date >= ?', since), ('sale_date <= ?', until),
+            ('sale_price >= ?', min_price), ('sale_price <= ?', max_price),
+            ('acres >= ?', min_acres), ('acres <= ?', max_acres),
+            ('book_number >= ?', first_book), ('book_number <= ?', last_book),
+            ('property_type = ?', property_type),
+        ):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        params.append(limit)
+        return self._query(f'SELECT * FROM sales {where} ORDER BY sale_date DESC LIMIT ?', params)
+
+    def count(self):
+        """Number of stored sales"""
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM sales').fetchone()[0]
+
+    def _query(self, sql, params):
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        results = []
+        for row in rows:
+            result = {column: row[column] for column in RESULT_COLUMNS}
+            result['data'] = json.loads(row['data'])
+            results.append(result)
+        return results
+
+
+def main(argv=None):
+    """Command line access to the query store"""
+    parser = argparse.ArgumentParser(description='Query the local store of scraped affidavits')
+    parser.add_argument('--db', default='scraped_data/sales.db', help='SQLite database file')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help='Load saved books into the store')
+    ingest.add_argument('--output-dir', default='scraped_data', help='Scraper output directory')
+    ingest.add_argument('--storage', choices=('csv', 'parquet'), default='csv', help='Format the books were saved in')
+
+    parcel = commands.add_parser('parcel', help='Sales of one parcel')
+    parcel.add_argument('parcel', help='Parcel number')
+
+    comps = commands.add_parser('comps', help='Comparable sales')
+    comps.add_argument('--since', help='Earliest sale date (YYYY-MM-DD)')
+    comps.add_argument('--until', help='Latest sale date (YYYY-MM-DD)')
+    comps.add_argument('--min-price', type=float)
+    comps.add_argument('--max-price', type=float)
+    comps.add_argument('--min-acres', type=float)
+    comps.add_argument('--max-acres', type=float)
+    comps.add_argument('--first-book', type=int)
+    comps.add_argument('--last-book', type=int)
+    comps.add_argument('--property-type')
+    comps.add_argument('--limit', type=int, default=100)
+
+    args = parser.parse_args(argv)
+    store = QueryStore(args.db)
+    try:
+        if args.command == 'ingest':
+            from storage import open_storage
+
+            storage = open_storage(args.storage, args.output_dir)
+            total = 0
+            for book in storage.books():
+                total += store.upsert_book(book, storage.load(book))
+            print(f"Stored {total} rows, {store.count()} sales in {args.db}")
+            return 0
+
+        if args.command == 'parcel':
+            results = store.parcel(args.parcel)
+        else:
+            results = store.comparables(
+                since=args.since, until=args.until, min_price=args.min_price, max_price=args.max_price,
+                min_acres=args.min_acres, max_acres=args.max_acres, first_book=args.first_book,
+                last_book=args.last_book, property_type=args.property_type, limit=args.limit,
+            )
+        for result in results:
+            print(json.dumps(result, default=str))
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Date window splitting for searches with too many results
+A book whose search is truncated by the site, or too large to page through
+quickly, is searched again as two halves of its date window, recursively
+"""
+
+from datetime import timedelta
+
+from manifest import DATE_FORMAT, parse_date
+
+
+class WindowTooLarge(Exception):
+    """A search returned more results than one query should, so its date window has to be split"""
+
+    def __init__(self, message, window):
+        super().__init__(message)
+        self.window = window
+
+
+def window_days(window):
+    """Number of days a (from_date, to_date) window covers, both ends included"""
+    return (parse_date(window[1]) - parse_date(window[0])).days + 1
+
+
+def can_split(window):
+    """Return True if the window covers more than one day"""
+    return window_days(window) > 1
+
+
+def split_window(window):
+    """
+    Split a date window into two halves that do not overlap
+
+    Args:
+        window (tuple): (from_date, to_date) as MM/DD/YYYY, covering at least two days
+
+    Returns:
+        tuple: ((from_date, middle), (day after middle, to_date))
+    """
+    start = parse_date(window[0])
+    end = parse_date(window[1])
+    middle = start + timedelta(days=(end - start).days // 2)
+    return (
+        (window[0], middle.strftime(DATE_FORMAT)),
+        ((middle + timedelta(days=1)).strftime(DATE_FORMAT), window[1]),
+    )
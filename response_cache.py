@@ -0,0 +1,258 @@
+"""
+On-disk cache of raw Affidavit of Value result pages
+Entries are addressed by a hash of the search parameters, compressed with gzip,
+expire after a TTL and are evicted least-recently-used first when the cache is full
+"""
+
+import os
+import gzip
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+META_FILE = 'meta.json'
+
+
+def cache_key(book_number, from_date, to_date, property_type):
+    """
+    Content address of a search
+
+    Returns:
+        str: Hex SHA-256 of the canonical search parameters
+    """
+    params = {'book': int(book_number), 'from_date': from_date, 'to_date': to_date, 'property_type': property_type}
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Compressed, size-bounded cache of raw result pages"""
+
+    def __init__(self, cache_dir, ttl=30 * 24 * 3600, max_bytes=2 * 1024 ** 3, compress_level=6):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir (str): Directory holding the cache entries
+            ttl (float): Seconds an entry is served for lookups (None for no expiry)
+            max_bytes (int): Maximum total compressed size before least recently used entries are evicted
+            compress_level (int): gzip compression level (1-9)
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def lookup(self, book_number, from_date, to_date, property_type, ignore_ttl=False):
+        """
+        Find the cached pages of a search
+
+        A hit marks the entry as recently used.
+
+        Args:
+            ignore_ttl (bool): Return the entry even if it has expired
+
+        Returns:
+            dict: Entry metadata (search parameters, pages, size, stored_at), or None on a miss
+        """
+        entry_dir = self._entry_dir(cache_key(book_number, from_date, to_date, property_type))
+        meta_path = os.path.join(entry_dir, META_FILE)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not ignore_ttl and self.ttl is not None and time.time() - meta['stored_at'] > self.ttl:
+            return None
+
+        # Record the access for LRU eviction
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        meta['path'] = entry_dir
+        return meta
+
+    def read_pages(self, entry):
+        """
+        Decompress the pages of an entry one at a time
+
+        Args:
+            entry (dict): Entry returned by lookup or entries
+
+        Yields:
+            tuple: (page bytes, encoding or None)
+        """
+        for page in entry['pages']:
+            with gzip.open(os.path.join(entry['path'], page['file']), 'rb') as f:
+                yield f.read(), page.get('encoding')
+
+    def entries(self):
+        """
+        Iterate over every complete entry, expired or not
+
+        Yields:
+            dict: Entry metadata
+        """
+        for meta_path in self._meta_paths():
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            meta['path'] = os.path.dirname(meta_path)
+            yield meta
+
+    def writer(self, book_number, from_date, to_date, property_type):
+        """
+        Start writing the pages of a search
+
+        Returns:
+            CacheWriter: Writer that makes the entry visible once committed
+        """
+        return CacheWriter(self, book_number, from_date, to_date, property_type)
+
+    def _meta_paths(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for key in os.listdir(prefix_dir):
+                if key.startswith('.'):
+                    # Entry still being written
+                    continue
+                meta_path = os.path.join(prefix_dir, key, META_FILE)
+                if os.path.exists(meta_path):
+                    yield meta_path
+
+    def _added(self, size, replaced_size):
+        """Account for a committed entry and evict if the cache grew too large"""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(entry.get('size', 0) for entry in self.entries())
+            else:
+                self._total_bytes += size - replaced_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Remove expired entries, then least recently used ones until the cache fits in max_bytes"""
+        now = time.time()
+        entries = []
+        for meta_path in self._meta_paths():
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                entries.append((os.path.getmtime(meta_path), meta, os.path.dirname(meta_path)))
+            except (OSError, ValueError):
+                continue
+
+        total = sum(meta.get('size', 0) for _, meta, _ in entries)
+        removed = 0
+        for last_used, meta, entry_dir in sorted(entries, key=lambda item: item[0]):
+            expired = self.ttl is not None and now - meta['stored_at'] > self.ttl
+            if not expired and total <= self.max_bytes:
+                continue
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= meta.get('size', 0)
+            removed += 1
+
+        self._total_bytes = total
+        if removed:
+            logger.info(f"Evicted {removed} cache entries, cache size now {total / 1024 ** 2:.1f} MB")
+
+
+class CacheWriter:
+    """Writes the pages of one search into a temporary directory and publishes them on commit"""
+
+    def __init__(self, cache, book_number, from_date, to_date, property_type):
+        self.cache = cache
+        self.key = cache_key(book_number, from_date, to_date, property_type)
+        self.params = {'book': int(book_number), 'from_date': from_date, 'to_date': to_date, 'property_type': property_type}
+        self.pages = []
+        self.size = 0
+        prefix_dir = os.path.dirname(cache._entry_dir(self.key))
+        os.makedirs(prefix_dir, exist_ok=True)
+        self.tmp_dir = tempfile.mkdtemp(prefix=f'.{self.key}-', dir=prefix_dir)
+
+    def _page_path(self):
+        return os.path.join(self.tmp_dir, f'page_{len(self.pages):03d}.html.gz')
+
+    def add_page(self, page, encoding=None):
+        """
+        Store a complete page
+
+        Args:
+            page (str | bytes): Page HTML
+            encoding (str): Encoding of byte pages (str pages are stored as UTF-8)
+        """
+        if isinstance(page, str):
+            page, encoding = page.encode('utf-8'), 'utf-8'
+        path = self._page_path()
+        with gzip.open(path, 'wb', compresslevel=self.cache.compress_level) as f:
+            f.write(page)
+        self._page_written(path, encoding)
+
+    def tee(self, chunks, encoding=None):
+        """
+        Store a page while it is being consumed
+
+        Args:
+            chunks (iterable): Byte chunks of the page
+            encoding (str): Encoding of the page, if known
+
+        Yields:
+            bytes: The chunks, unchanged
+        """
+        path = self._page_path()
+        with gzip.open(path, 'wb', compresslevel=self.cache.compress_level) as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        self._page_written(path, encoding)
+
+    def _page_written(self, path, encoding):
+        self.pages.append({'file': os.path.basename(path), 'encoding': encoding})
+        self.size += os.path.getsize(path)
+
+    def commit(self):
+        """Publish the entry, replacing any previous entry for the same search"""
+        meta = dict(self.params, pages=self.pages, size=self.size, stored_at=time.time())
+        with open(os.path.join(self.tmp_dir, META_FILE), 'w') as f:
+            json.dump(meta, f)
+
+        entry_dir = self.cache._entry_dir(self.key)
+        replaced_size = 0
+        if os.path.isdir(entry_dir):
+            try:
+                with open(os.path.join(entry_dir, META_FILE)) as f:
+                    replaced_size = json.load(f).get('size', 0)
+            except (OSError, ValueError):
+                pass
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            os.replace(self.tmp_dir, entry_dir)
+        except OSError as e:
+            # Another worker published the same search first
+            logger.warning(f"Could not publish cache entry {self.key}: {e}")
+            self.abort()
+            return
+        self.cache._added(self.size, replaced_size)
+
+    def abort(self):
+        """Discard the pages written so far"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
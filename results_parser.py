@@ -0,0 +1,261 @@
+"""
+Streaming parser for Affidavit of Value search results
+Locates the results table with lxml and collects its rows as the page is parsed
+"""
+
+import re
+import logging
+from urllib.parse import urljoin
+
+import pandas as pd
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# Header text that identifies the affidavit results table among the page's tables
+RESULTS_HEADER_KEYWORDS = ('parcel', 'affidavit', 'sale price', 'sale date')
+
+# Page text that the search site shows instead of a results table
+NO_RESULTS_MARKERS = ('no records found', 'no results found', 'no matching records', 'returned 0 results')
+
+# Link text of the pager link that leads to the next page of results
+NEXT_PAGE_TEXT = ('next', 'next >', 'next page', '>', '>>', '»', '›')
+
+# Result count in the page summary, as in "Showing 1 - 50 of 1,234 affidavits"
+RESULT_TOTAL_PATTERN = re.compile(r'\bof\s+(\d{1,3}(?:,\d{3})+|\d+)\s+(?:affidavits|records|results|entries|matches)\b')
+
+# Numbers as the site formats them, optionally with thousands separators
+NUMBER_PATTERN = re.compile(r'^-?(\d{1,3}(,\d{3})+|\d+)(\.\d+)?$')
+
+
+# The same markers as bytes, for checking raw chunks
+_NO_RESULTS_MARKER_BYTES = tuple(marker.encode('ascii') for marker in NO_RESULTS_MARKERS)
+
+_RESULT_TOTAL_PATTERN_BYTES = re.compile(RESULT_TOTAL_PATTERN.pattern.encode('ascii'))
+
+# Characters kept from the previous chunk so a marker or result count split across chunks is still found
+_MARKER_OVERLAP = max(max(len(marker) for marker in NO_RESULTS_MARKERS), 48)
+
+
+def _cell_text(element):
+    text = (element.text or '') if len(element) == 0 else ''.join(element.itertext())
+    return ' '.join(text.split())
+
+
+def coerce_column(values):
+    """
+    Convert a column of cell strings to numbers when every non-empty cell is numeric
+
+    Mirrors what ``pd.read_html`` does: thousands separators are accepted, and
+    anything else (currency signs, dashes in parcel numbers) keeps the column as text.
+
+    Args:
+        values (pd.Series): Cell strings, with None for empty cells
+
+    Returns:
+        pd.Series: Numeric series, or the original series
+    """
+    present = values.dropna()
+    if present.empty or not present.map(lambda v: bool(NUMBER_PATTERN.match(v))).all():
+        return values
+    return pd.to_numeric(values.str.replace(',', '', regex=False))
+
+
+class ResultsTableParser:
+    """
+    Incrementally parse one or more result pages into a single table
+
+    Feed each page with ``feed_page`` (as a string or an iterable of chunks);
+    rows are extracted as soon as their ``</tr>`` is parsed and the parsed
+    elements are discarded, so a page is never held in memory as a tree and
+    later pages only add their rows.
+    """
+
+    def __init__(self):
+        self.columns = None
+        self.rows = []
+        self.pages = 0
+        self.matched = False
+        self.no_results = False
+        # Number of results the site says the search has, if its summary shows one
+        self.reported_total = None
+
+    def feed_page(self, source, base_url=None, encoding=None):
+        """
+        Parse one results page
+
+        Args:
+            source (str | bytes | iterable): Page HTML, or an iterable of HTML chunks
+            base_url (str): URL of the page, used to resolve the next page link
+            encoding (str): Character encoding of byte input (optional, detected from the page if not provided)
+
+        Returns:
+            dict: ``has_table`` (a results table was found on this page), ``has_next``
+            (the page links to a next page of results) and ``next_url`` (URL of that
+            page, or None if it is only reachable through a script postback)
+        """
+        if isinstance(source, (str, bytes)):
+            source = [source]
+
+        page = _PageState()
+        parser = etree.HTMLPullParser(events=('end',), tag=('tr', 'table', 'a'), encoding=encoding)
+        tail = None
+        for chunk in source:
+            if chunk:
+                tail = self._scan_text(chunk, tail)
+                parser.feed(chunk)
+                self._handle_events(parser, page)
+        parser.close()
+        self._handle_events(parser, page)
+
+        self.pages += 1
+        has_table = self._finish_page(page)
+
+        next_url = None
+        if page.next_href and not page.next_href.lower().startswith('javascript:'):
+            next_url = urljoin(base_url or '', page.next_href)
+
+        return {'has_table': has_table, 'has_next': page.next_href is not None, 'next_url': next_url}
+
+    def to_frame(self):
+        """
+        Build a DataFrame from every row collected so far
+
+        Returns:
+            pd.DataFrame: Results with numeric columns converted, or None if no table was found
+        """
+        if self.columns is None:
+            return None
+
+        df = pd.DataFrame(self.rows, columns=self.columns, dtype=object)
+        for column in df.columns:
+            df[column] = coerce_column(df[column])
+        return df
+
+    def _scan_text(self, chunk, tail):
+        """
+        Look for a "no results" message and a result count in a raw chunk,
+        returning the tail to carry over to the next one
+        """
+        lowered = chunk.lower()
+        text = lowered if tail is None else tail + lowered
+        is_bytes = isinstance(text, bytes)
+        if not self.no_results:
+            markers = _NO_RESULTS_MARKER_BYTES if is_bytes else NO_RESULTS_MARKERS
+            if any(marker in text for marker in markers):
+                self.no_results = True
+        if self.reported_total is None:
+            match = (_RESULT_TOTAL_PATTERN_BYTES if is_bytes else RESULT_TOTAL_PATTERN).search(text)
+            if match:
+                self.reported_total = int(match.group(1).replace(b',' if is_bytes else ',', b'' if is_bytes else ''))
+        return text[-_MARKER_OVERLAP:]
+
+    def _handle_events(self, parser, page):
+        for _, element in parser.read_events():
+            tag = element.tag
+            if tag == 'tr':
+                self._handle_row(element, page)
+            elif tag == 'table':
+                self._handle_table_end(element, page)
+            else:
+                self._handle_link(element, page)
+
+    def _handle_row(self, row, page):
+        table = row.getparent()
+        if table is not None and table.tag != 'table':
+            # Rows usually sit in a tbody/thead
+            table = next(row.iterancestors('table'), None)
+        if table is None:
+            return
+
+        state = page.tables.get(table)
+        if state is None:
+            state = page.tables[table] = _TableState()
+
+        if row.find('.//table') is not None:
+            # Rows that wrap other tables are page layout (or a pager inside the results table)
+            if not state.matched:
+                state.layout = True
+        elif not state.layout:
+            cells = [cell for cell in row if cell.tag in ('td', 'th')]
+            if state.header is None:
+                if any(cell.tag == 'th' for cell in cells):
+                    state.header = [_cell_text(cell) for cell in cells]
+                    header_text = ' '.join(state.header).lower()
+                    state.matched = any(keyword in header_text for keyword in RESULTS_HEADER_KEYWORDS)
+                    if state.matched and page.matched_table is None:
+                        page.matched_table = table
+                        page.matched_header = state.header
+                else:
+                    state.header = list(range(len(cells)))
+                    state.rows.append([_cell_text(cell) or None for cell in cells])
+            elif len(cells) == len(state.header):
+                values = [_cell_text(cell) or None for cell in cells]
+                if table is page.matched_table:
+                    page.rows.append(values)
+                elif page.matched_table is None:
+                    state.rows.append(values)
+            # Rows with a different cell count are pagers or footers
+
+        # Drop the parsed row and its already-processed siblings
+        row.clear()
+        parent = row.getparent()
+        if parent is not None:
+            while row.getprevious() is not None:
+                del parent[0]
+
+    def _handle_table_end(self, table, page):
+        state = page.tables.pop(table, None)
+        if state is None or state.layout or state.matched or page.matched_table is not None:
+            return
+        # Remember the biggest plain table in case no table has a recognizable results header
+        if state.header is not None and (page.fallback is None or len(state.rows) > len(page.fallback.rows)):
+            page.fallback = state
+
+    def _handle_link(self, link, page):
+        text = _cell_text(link).lower()
+        if link.get('rel') == 'next' or text in NEXT_PAGE_TEXT:
+            if link.get('href'):
+                page.next_href = link.get('href')
+
+    def _finish_page(self, page):
+        if page.matched_table is not None:
+            header = page.matched_header
+            rows = page.rows
+            self.matched = True
+        elif page.fallback is not None:
+            header = page.fallback.header
+            rows = page.fallback.rows
+        else:
+            return False
+
+        if self.columns is None:
+            self.columns = header
+        elif len(header) != len(self.columns):
+            logger.warning(f"Results page {self.pages} has {len(header)} columns instead of {len(self.columns)}, skipping it")
+            return False
+
+        self.rows.extend(rows)
+        return True
+
+
+class _TableState:
+    """Parsing state of one table on a page"""
+
+    def __init__(self):
+        self.header = None
+        self.rows = []
+        self.matched = False
+        self.layout = False
+
+
+class _PageState:
+    """Parsing state of one results page"""
+
+    def __init__(self):
+        self.tables = {}
+        self.matched_table = None
+        self.matched_header = None
+        self.rows = []
+        self.fallback = None
+        self.next_href = None
@@ -0,0 +1,436 @@
+"""
+Storage backends for scraped books
+Either one CSV file per book, or a Parquet dataset partitioned by book and sale year
+"""
+
+import os
+import shutil
+import logging
+import tempfile
+
+import pandas as pd
+
+from manifest import DATE_FORMAT
+
+logger = logging.getLogger(__name__)
+
+STORAGE_FORMATS = ('csv', 'parquet')
+
+# Header text of the results column used to partition by sale year
+SALE_DATE_KEYWORDS = ('sale date', 'sale_date', 'saledate')
+
+# Directory name Hive-style readers use for a missing partition value
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+# Columns the scraper adds to every results table, in the order it adds them
+METADATA_COLUMNS = ('book_number', 'property_type', 'from_date', 'to_date', 'scraped_at')
+
+# Partition keys of the Parquet dataset and their types, encoded in its directory names
+PARTITION_FIELDS = (('book_number', 'int32'), ('sale_year', 'int16'))
+
+
+def open_storage(storage_format, output_dir):
+    """
+    Create the storage backend for an output directory
+
+    Args:
+        storage_format (str): One of STORAGE_FORMATS
+        output_dir (str): Scraper output directory
+
+    Returns:
+        CsvStorage | ParquetStorage: The backend
+    """
+    if storage_format == 'csv':
+        return CsvStorage(output_dir)
+    if storage_format == 'parquet':
+        return ParquetStorage(output_dir)
+    raise ValueError(f"Unknown storage format '{storage_format}', expected one of {', '.join(STORAGE_FORMATS)}")
+
+
+def sale_date_column(columns):
+    """Name of the results column holding the sale date, or None if there is none"""
+    for column in columns:
+        if any(keyword in str(column).lower() for keyword in SALE_DATE_KEYWORDS):
+            return column
+    return None
+
+
+class CsvStorage:
+    """One ``book_{n}.csv`` file per book, as the scraper has always written"""
+
+    format = 'csv'
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+
+    def path(self, book_number):
+        return os.path.join(self.output_dir, f"book_{book_number}.csv")
+
+    def save(self, df, book_number):
+        """
+        Write a book, replacing any previous data for it
+
+        Returns:
+            str: Path written
+        """
+        filepath = self.path(book_number)
+        df.to_csv(filepath, index=False)
+        return filepath
+
+    def load(self, book_number):
+        """
+        Load a book
+
+        Returns:
+            pd.DataFrame: The saved data, or None if the book has not been saved
+        """
+        filepath = self.path(book_number)
+        if not os.path.exists(filepath):
+            return None
+        return pd.read_csv(filepath)
+
+    def signature(self, book_number):
+        """
+        Cheap fingerprint of a saved book that changes whenever the book is rewritten
+
+        Returns:
+            list: [size in bytes, modification time in ns]
+        """
+        stat = os.stat(self.path(book_number))
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def columns(self, book_number):
+        """Column names of a saved book, read from its header only"""
+        return list(pd.read_csv(self.path(book_number), nrows=0).columns)
+
+    def iter_chunks(self, book_number, chunk_rows):
+        """
+        Read a saved book a few rows at a time
+
+        Values are read as text exactly as written, so copying them to another
+        CSV file does not reformat numbers or dates.
+
+        Yields:
+            pd.DataFrame: Up to chunk_rows rows
+        """
+        yield from pd.read_csv(self.path(book_number), dtype=str, keep_default_na=False, chunksize=chunk_rows)
+
+    def books(self):
+        """
+        Book numbers that have been saved
+
+        Returns:
+            list: Sorted book numbers
+        """
+        books = []
+        for name in os.listdir(self.output_dir):
+            if name.startswith('book_') and name.endswith('.csv') and name[5:-4].isdigit():
+                books.append(int(name[5:-4]))
+        return sorted(books)
+
+
+class ParquetStorage:
+    """
+    Parquet dataset under ``output_dir/parquet``, partitioned Hive-style as
+    ``book_number=N/sale_year=YYYY/part-0.parquet``
+
+    Query metadata is stored typed: dates as dates, ``scraped_at`` as a
+    timestamp and ``property_type`` as a categorical, and every column is
+    dictionary encoded, so the values repeated on each row cost almost nothing.
+    Filters on book and sale year only open the matching partitions. pyarrow
+    is only imported by this backend, so CSV runs do not pay for loading it.
+    """
+
+    format = 'parquet'
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.root = os.path.join(output_dir, 'parquet')
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, book_number):
+        return os.path.join(self.root, f"book_number={book_number}")
+
+    def save(self, df, book_number):
+        """
+        Write a book, replacing any previous partitions for it
+
+        The new partitions are written to a temporary directory and swapped in,
+        so readers never see a half-written book.
+
+        Returns:
+            str: Directory of the book's partitions
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        frame = self._typed(df)
+        years = _sale_years(df)
+        schema = pa.Schema.from_pandas(frame, preserve_index=False)
+
+        book_dir = self.path(book_number)
+        tmp_dir = tempfile.mkdtemp(prefix=f'.book_number={book_number}-', dir=self.root)
+        try:
+            for year, part in frame.groupby(years.fillna(-1).to_numpy(), sort=True):
+                year_dir = os.path.join(tmp_dir, f"sale_year={NULL_PARTITION if year < 0 else int(year)}")
+                os.makedirs(year_dir)
+                table = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+                pq.write_table(table, os.path.join(year_dir, 'part-0.parquet'), use_dictionary=True, compression='snappy')
+
+            if os.path.isdir(book_dir):
+                old_dir = tempfile.mkdtemp(prefix=f'.old-book_number={book_number}-', dir=self.root)
+                os.replace(book_dir, os.path.join(old_dir, 'book'))
+                os.replace(tmp_dir, book_dir)
+                shutil.rmtree(old_dir, ignore_errors=True)
+            else:
+                os.replace(tmp_dir, book_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return book_dir
+
+    def load(self, book_number):
+        """
+        Load a book in the same shape the scraper produced it (plain string metadata columns)
+
+        Returns:
+            pd.DataFrame: The saved data, or None if the book has not been saved
+        """
+        if not os.path.isdir(self.path(book_number)):
+            return None
+        return _untyped(self.dataset(book_number).to_table().to_pandas())
+
+    def signature(self, book_number):
+        """
+        Cheap fingerprint of a saved book that changes whenever the book is rewritten
+
+        Returns:
+            list: [total size in bytes, latest modification time in ns]
+        """
+        size = 0
+        mtime = os.stat(self.path(book_number)).st_mtime_ns
+        for directory, dirs, names in os.walk(self.path(book_number)):
+            for name in names:
+                stat = os.stat(os.path.join(directory, name))
+                size += stat.st_size
+                mtime = max(mtime, stat.st_mtime_ns)
+        return [size, mtime]
+
+    def columns(self, book_number):
+        """Column names of a saved book in the scraper's layout, read from the file footers only"""
+        return list(_untyped(self.dataset(book_number).schema.empty_table().to_pandas()).columns)
+
+    def iter_chunks(self, book_number, chunk_rows):
+        """
+        Read a saved book a few rows at a time, in the scraper's layout
+
+        Yields:
+            pd.DataFrame: Up to chunk_rows rows
+        """
+        for batch in self.dataset(book_number).to_batches(batch_size=chunk_rows):
+            if batch.num_rows:
+                yield _untyped(batch.to_pandas())
+
+    def books(self):
+        """
+        Book numbers that have been saved
+
+        Returns:
+            list: Sorted book numbers
+        """
+        books = []
+        for name in os.listdir(self.root):
+            key, _, value = name.partition('=')
+            if key == 'book_number' and value.isdigit():
+                books.append(int(value))
+        return sorted(books)
+
+    def files(self, first_book=None, last_book=None, since_year=None, until_year=None):
+        """
+        Paths of the Parquet files in the given book and sale year ranges
+
+        The ranges are matched against the partition directory names, so no
+        file outside them is opened. Rows without a sale year are left out when
+        a year range is given, as a filter on ``sale_year`` would leave them out.
+
+        Returns:
+            list: Sorted file paths
+        """
+        files = []
+        for book_number in self.books():
+            if (first_book is not None and book_number < first_book) or (last_book is not None and book_number > last_book):
+                continue
+            book_dir = self.path(book_number)
+            try:
+                names = os.listdir(book_dir)
+            except FileNotFoundError:
+                # Being replaced by a save right now
+                continue
+            for name in names:
+                key, _, value = name.partition('=')
+                if key != 'sale_year':
+                    continue
+                if since_year is not None or until_year is not None:
+                    if not value.isdigit():
+                        continue
+                    year = int(value)
+                    if (since_year is not None and year < since_year) or (until_year is not None and year > until_year):
+                        continue
+                year_dir = os.path.join(book_dir, name)
+                files.extend(os.path.join(year_dir, f) for f in os.listdir(year_dir) if f.endswith('.parquet'))
+        return sorted(files)
+
+    def dataset(self, book_number=None, first_book=None, last_book=None, since_year=None, until_year=None):
+        """
+        Open the dataset (or a single book, or the books and sale years in the given ranges) for scanning
+
+        Only the files of the selected partitions are part of the dataset, and
+        only their footers are read. Books can have different column types (a
+        column that is numeric in one book and text in another); those columns
+        are read as text.
+
+        Returns:
+            pyarrow.dataset.Dataset: The dataset, or None if nothing matching has been saved
+        """
+        import pyarrow.dataset as ds
+
+        if book_number is not None:
+            first_book = last_book = book_number
+        files = self.files(first_book, last_book, since_year, until_year)
+        if not files:
+            return None
+
+        partitioning = ds.partitioning(_partition_schema(), flavor='hive')
+        return ds.dataset(files, format='parquet', partitioning=partitioning, partition_base_dir=self.root,
+                          schema=_unified_schema(files))
+
+    def read(self, first_book=None, last_book=None, since_year=None, until_year=None, property_type=None, columns=None):
+        """
+        Read sales with the filters pushed down to the partitions and row groups
+
+        Example: all vacant land sales in books 200-250 since 2020::
+
+            ParquetStorage('scraped_data').read(200, 250, since_year=2020, property_type='Vacant Land')
+
+        Args:
+            first_book (int): Lowest book number (inclusive)
+            last_book (int): Highest book number (inclusive)
+            since_year (int): Earliest sale year (inclusive)
+            until_year (int): Latest sale year (inclusive)
+            property_type (str): Only rows scraped for this property type
+            columns (list): Columns to read (optional, all columns if not provided)
+
+        Returns:
+            pd.DataFrame: Matching rows
+        """
+        import pyarrow.dataset as ds
+
+        dataset = self.dataset(first_book=first_book, last_book=last_book, since_year=since_year, until_year=until_year)
+        if dataset is None:
+            return pd.DataFrame(columns=columns)
+
+        conditions = []
+        if first_book is not None:
+            conditions.append(ds.field('book_number') >= first_book)
+        if last_book is not None:
+            conditions.append(ds.field('book_number') <= last_book)
+        if since_year is not None:
+            conditions.append(ds.field('sale_year') >= since_year)
+        if until_year is not None:
+            conditions.append(ds.field('sale_year') <= until_year)
+        if property_type is not None:
+            conditions.append(ds.field('property_type') == property_type)
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    def export_csv(self, filepath, **filters):
+        """
+        Write the dataset (or the rows matching ``read``'s filters) to one CSV file,
+        in the same layout as the per-book CSV files
+
+        Returns:
+            int: Number of rows written
+        """
+        df = _untyped(self.read(**filters))
+        df.to_csv(filepath, index=False)
+        return len(df)
+
+    def _typed(self, df):
+        """Convert the scraper's string metadata columns to compact typed columns"""
+        frame = df.drop(columns=['book_number'], errors='ignore').copy()
+        for column in ('from_date', 'to_date'):
+            if column in frame.columns:
+                frame[column] = pd.to_datetime(frame[column], format=DATE_FORMAT).dt.date
+        if 'scraped_at' in frame.columns:
+            frame['scraped_at'] = pd.to_datetime(frame['scraped_at'], format='ISO8601')
+        if 'property_type' in frame.columns:
+            frame['property_type'] = frame['property_type'].astype('category')
+        for column in frame.columns:
+            if frame[column].dtype == object and column not in ('from_date', 'to_date'):
+                # Text columns stay text even where every value is missing
+                frame[column] = frame[column].astype('string')
+        return frame
+
+
+def _untyped(df):
+    """Turn rows read from Parquet back into the scraper's layout, with string metadata columns"""
+    df = df.drop(columns=['sale_year'], errors='ignore')
+    for column in ('from_date', 'to_date'):
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column]).dt.strftime(DATE_FORMAT)
+    if 'scraped_at' in df.columns:
+        df['scraped_at'] = df['scraped_at'].map(lambda value: value.isoformat() if pd.notna(value) else None)
+    if 'property_type' in df.columns:
+        df['property_type'] = df['property_type'].astype(object)
+    if 'book_number' in df.columns:
+        df['book_number'] = df['book_number'].astype('int64')
+    data_columns = [c for c in df.columns if c not in METADATA_COLUMNS]
+    return df[data_columns + [c for c in METADATA_COLUMNS if c in df.columns]]
+
+
+def _sale_years(df):
+    """Sale year of each row (missing where the date cannot be parsed)"""
+    column = sale_date_column(df.columns)
+    if column is None:
+        return pd.Series(pd.NA, index=df.index, dtype='Int16')
+    dates = pd.to_datetime(df[column], errors='coerce', format='mixed')
+    return dates.dt.year.astype('Int16')
+
+
+def _partition_schema():
+    """Schema of the Parquet dataset's partition keys"""
+    import pyarrow as pa
+
+    return pa.schema([(name, pa.type_for_alias(alias)) for name, alias in PARTITION_FIELDS])
+
+
+def _unified_schema(files):
+    """Schema covering the given Parquet files, reading text where the files disagree on a column's type"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {}
+    for path in files:
+        for field in pq.read_schema(path):
+            types.setdefault(field.name, []).append(field.type)
+
+    fields = []
+    for name, found in types.items():
+        distinct = {str(t): t for t in found}
+        if len(distinct) == 1:
+            column_type = found[0]
+        elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in distinct.values()):
+            column_type = pa.float64()
+        elif all(pa.types.is_dictionary(t) for t in distinct.values()):
+            column_type = pa.dictionary(pa.int32(), pa.string())
+        else:
+            column_type = pa.string()
+        fields.append(pa.field(name, column_type))
+
+    for field in _partition_schema():
+        fields.append(field)
+    return pa.schema(fields)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test script for the async engine
+Scrapes a few books from the benchmark's fixture site, so no browser or
+network is needed
+"""
+
+import os
+import sys
+import logging
+import tempfile
+
+import pandas as pd
+
+from mohave_scraper import MohaveScraper
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+from fixture_server import SEARCH_PATH, FixtureSite, start_server  # noqa: E402
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BOOKS = range(100, 105)
+
+
+def scrape(url, output_dir, engine, **options):
+    scraper = MohaveScraper(output_dir=output_dir, engine=engine, url=url, **options)
+    result = scraper.scrape_range(BOOKS[0], BOOKS[-1])
+    rows = {book: len(pd.read_csv(scraper.storage.path(book))) for book in BOOKS if os.path.exists(scraper.storage.path(book))}
+    return result, rows
+
+
+def test_async_without_request_interval():
+    """A request interval of 0 runs the async engine unthrottled, following every page of results"""
+    site = FixtureSite(latency=0, min_rows=5, max_rows=45, page_size=10, empty_rate=0)
+    server = start_server(site)
+    url = f"http://127.0.0.1:{server.server_port}{SEARCH_PATH}"
+    try:
+        with tempfile.TemporaryDirectory() as http_dir, tempfile.TemporaryDirectory() as async_dir:
+            expected, expected_rows = scrape(url, http_dir, 'http', request_interval=0.01)
+            assert expected == (len(BOOKS), 0), expected
+
+            pages_before = site.stats()['pages']
+            result, rows = scrape(url, async_dir, 'async', request_interval=0)
+            assert result == (len(BOOKS), 0), result
+            assert rows == expected_rows, (rows, expected_rows)
+            assert site.stats()['pages'] > pages_before
+    finally:
+        server.shutdown()
+
+
+def main():
+    """Run the async engine checks against the fixture site"""
+    test_async_without_request_interval()
+    print("Async engine test passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental combined CSV
+Each scenario changes the saved books after a first combine, combines again
+incrementally and compares the result with a full rebuild of the same books
+"""
+
+import os
+import logging
+import tempfile
+
+import pandas as pd
+
+from combine import combine_books
+from storage import CsvStorage
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Small enough that most books are written in several chunks
+CHUNK_ROWS = 3
+
+
+class CountingStorage(CsvStorage):
+    """CSV storage that records which books the combine re-encodes"""
+
+    def __init__(self, output_dir):
+        super().__init__(output_dir)
+        self.encoded = set()
+        self._saves = 0
+
+    def iter_chunks(self, book_number, chunk_rows):
+        self.encoded.add(book_number)
+        return super().iter_chunks(book_number, chunk_rows)
+
+    def save(self, df, book_number):
+        filepath = super().save(df, book_number)
+        # File times are only as fine as the kernel's clock tick, so give every save a distinct one
+        self._saves += 1
+        mtime_ns = os.stat(filepath).st_mtime_ns + self._saves * 1_000_000_000
+        os.utime(filepath, ns=(mtime_ns, mtime_ns))
+        return filepath
+
+
+def book_frame(book_number, rows, columns=('parcel', 'sale_price')):
+    return pd.DataFrame({
+        column: [f"{book_number}-{column}-{row}" for row in range(rows)] for column in columns
+    }).assign(book_number=book_number)
+
+
+def check_combine(build, change, reencoded, in_place=False, untouched=False):
+    """
+    Combine, change the books, combine again incrementally and compare with a full rebuild
+
+    Args:
+        build (callable): Saves the first books to the storage it is given
+        change (callable): Changes the saved books
+        reencoded (set): Books the second, incremental combine should re-encode
+        in_place (bool): The second combine should extend the file rather than replace it
+        untouched (bool): The second combine should not write the file at all
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        storage = CountingStorage(directory)
+        combined = os.path.join(directory, 'combined', 'all.csv')
+        rebuilt = os.path.join(directory, 'rebuilt', 'all.csv')
+        os.makedirs(os.path.dirname(combined))
+        os.makedirs(os.path.dirname(rebuilt))
+
+        build(storage)
+        combine_books(storage, combined, chunk_rows=CHUNK_ROWS)
+        change(storage)
+        storage.encoded.clear()
+        before = os.stat(combined)
+        rows = combine_books(storage, combined, chunk_rows=CHUNK_ROWS)
+        after = os.stat(combined)
+        assert storage.encoded == reencoded, storage.encoded
+        if in_place or untouched:
+            assert after.st_ino == before.st_ino, "the combined file was replaced"
+        if untouched:
+            assert after.st_mtime_ns == before.st_mtime_ns, "the combined file was rewritten"
+
+        expected_rows = combine_books(storage, rebuilt, chunk_rows=CHUNK_ROWS, incremental=False)
+        assert rows == expected_rows, (rows, expected_rows)
+        with open(combined, 'rb') as f, open(rebuilt, 'rb') as g:
+            assert f.read() == g.read(), "incremental combine differs from a full rebuild"
+
+        # The state written by the incremental combine must carry the next one too
+        storage.encoded.clear()
+        assert combine_books(storage, combined, chunk_rows=CHUNK_ROWS) == expected_rows
+        assert storage.encoded == set(), storage.encoded
+
+
+def save_books(*books):
+    def build(storage):
+        for book_number, rows in books:
+            storage.save(book_frame(book_number, rows), book_number)
+    return build
+
+
+def test_append():
+    """Books after the last combined one are appended"""
+    check_combine(save_books((100, 4), (101, 7)), save_books((102, 5), (103, 1)), {102, 103}, in_place=True)
+
+
+def test_change_middle():
+    """A changed book in the middle is re-encoded and the others copied"""
+    check_combine(save_books((100, 4), (101, 7), (102, 5)), save_books((101, 2)), {101})
+
+
+def test_insert_middle():
+    """A book saved between two combined books is spliced in"""
+    check_combine(save_books((100, 4), (102, 5)), save_books((101, 6)), {101})
+
+
+def test_new_column():
+    """A book with a column no other book has rewrites the whole file with the new column"""
+    def change(storage):
+        storage.save(book_frame(101, 3, columns=('parcel', 'sale_price', 'acres')), 101)
+
+    check_combine(save_books((100, 4), (101, 7), (102, 5)), change, {100, 101, 102})
+
+
+def test_removed_book():
+    """A deleted book's section is dropped without re-encoding the others"""
+    def change(storage):
+        os.remove(storage.path(101))
+
+    check_combine(save_books((100, 4), (101, 7), (102, 5)), change, set())
+
+
+def test_no_change():
+    """Combining unchanged books leaves the file alone"""
+    check_combine(save_books((100, 4), (101, 7)), lambda storage: None, set(), untouched=True)
+
+
+def main():
+    """Run every combine scenario"""
+    test_append()
+    test_change_middle()
+    test_insert_middle()
+    test_new_column()
+    test_removed_book()
+    test_no_change()
+    print("Combine tests passed")
+
+
+if __name__ == '__main__':
+    main()
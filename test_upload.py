@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the Google Drive sync
+Runs sync_directory against an in-memory fake of the Drive files API, so no
+credentials or network are needed. Needs google-api-python-client for the
+media upload objects
+"""
+
+import os
+import hashlib
+import itertools
+import logging
+import tempfile
+
+from upload_to_drive import DriveUploader
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FOLDER_ID = 'test-folder'
+
+# Small enough that the larger test file is sent as a resumable upload in several chunks
+CHUNK_SIZE = 256 * 1024
+
+
+class FakeRequest:
+    """A Drive request that runs when executed, or chunk by chunk for resumable media"""
+
+    def __init__(self, run, media=None):
+        self._run = run
+        self._media = media
+        self._sent = 0
+
+    def execute(self):
+        return self._run(self._media.getbytes(0, self._media.size()) if self._media else None)
+
+    def next_chunk(self):
+        size = self._media.size()
+        self._sent = min(size, self._sent + self._media.chunksize())
+        if self._sent < size:
+            return self._sent / size, None
+        return None, self._run(self._media.getbytes(0, size))
+
+
+class FakeFiles:
+    """The files() collection: list, create and update"""
+
+    def __init__(self, drive):
+        self.drive = drive
+
+    def list(self, q, fields=None, orderBy=None, pageSize=100, pageToken=None):
+        folder_id = q.split("'")[1]
+        files = [self.drive.metadata(file) for file in self.drive.stored.values() if folder_id in file['parents']]
+        start = int(pageToken or 0)
+        response = {'files': files[start:start + pageSize]}
+        if start + pageSize < len(files):
+            response['nextPageToken'] = str(start + pageSize)
+        return FakeRequest(lambda _: response)
+
+    def create(self, body, media_body, fields=None):
+        def run(content):
+            file_id = f"file-{next(self.drive.ids)}"
+            self.drive.stored[file_id] = {'id': file_id, 'name': body['name'], 'parents': body['parents']}
+            return self.drive.write(file_id, content)
+
+        self.drive.calls.append(('create', body['name']))
+        return FakeRequest(run, media_body)
+
+    def update(self, fileId, media_body, fields=None):
+        self.drive.calls.append(('update', self.drive.stored[fileId]['name']))
+        return FakeRequest(lambda content: self.drive.write(fileId, content), media_body)
+
+
+class FakeDriveService:
+    """In-memory stand-in for the Drive v3 service, holding each file's content"""
+
+    def __init__(self):
+        self.stored = {}
+        self.calls = []
+        self.ids = itertools.count(1)
+
+    def files(self):
+        return FakeFiles(self)
+
+    def write(self, file_id, content):
+        self.stored[file_id]['content'] = content
+        return self.metadata(self.stored[file_id])
+
+    def metadata(self, file):
+        content = file['content']
+        return {'id': file['id'], 'name': file['name'], 'size': str(len(content)),
+                'md5Checksum': hashlib.md5(content).hexdigest()}
+
+    def content(self, name):
+        return next(file['content'] for file in self.stored.values() if file['name'] == name)
+
+
+def write_file(directory, name, content):
+    with open(os.path.join(directory, name), 'wb') as f:
+        f.write(content)
+
+
+def test_sync_directory():
+    """New files are created, unchanged ones skipped and changed ones updated in place"""
+    drive = FakeDriveService()
+    uploader = DriveUploader(folder_id=FOLDER_ID, service=drive, workers=2, chunk_size=CHUNK_SIZE)
+    large = b'book,parcel\n' + b'100,100-01-001\n' * 50000
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_file(directory, 'book_100.csv', b'book,parcel\n100,100-01-001\n')
+        write_file(directory, 'book_101.csv', large)
+        write_file(directory, 'notes.txt', b'not synced')
+
+        counts = uploader.sync_directory(directory)
+        assert counts == {'created': 2, 'updated': 0, 'unchanged': 0, 'failed': 0}, counts
+        assert drive.content('book_101.csv') == large
+        file_ids = {file['name']: file['id'] for file in drive.stored.values()}
+
+        write_file(directory, 'book_100.csv', b'book,parcel\n100,100-01-002\n')
+        drive.calls.clear()
+        counts = uploader.sync_directory(directory)
+        assert counts == {'created': 0, 'updated': 1, 'unchanged': 1, 'failed': 0}, counts
+        assert drive.calls == [('update', 'book_100.csv')], drive.calls
+        assert drive.content('book_100.csv') == b'book,parcel\n100,100-01-002\n'
+        assert {file['name']: file['id'] for file in drive.stored.values()} == file_ids
+
+        drive.calls.clear()
+        counts = uploader.sync_directory(directory)
+        assert counts == {'created': 0, 'updated': 0, 'unchanged': 2, 'failed': 0}, counts
+        assert drive.calls == [], drive.calls
+
+
+def main():
+    """Run the sync against the fake Drive service"""
+    test_sync_directory()
+    print("Drive sync test passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared work queue
+Two queue instances on one database file stand in for two workers, with
+leases short enough to expire during the test
+"""
+
+import os
+import time
+import logging
+import tempfile
+
+from outcomes import OUTCOME_DONE
+from work_queue import WorkQueue, UNIT_DONE, UNIT_LEASED
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROPERTY_TYPE = 'Vacant Land'
+
+# Seconds a lease lasts in these tests
+LEASE = 0.5
+
+
+def open_workers(directory):
+    path = os.path.join(directory, 'queue.db')
+    first = WorkQueue(path, worker_id='worker-a', lease_seconds=LEASE)
+    second = WorkQueue(path, worker_id='worker-b', lease_seconds=LEASE)
+    first.add_books(100, 100, '01/01/2010', '10/31/2025', PROPERTY_TYPE)
+    return first, second
+
+
+def unit_row(queue, unit_id):
+    return dict(queue.conn.execute('SELECT * FROM units WHERE id = ?', (unit_id,)).fetchone())
+
+
+def test_expired_lease_reclaimed():
+    """A unit whose lease ran out goes to the next worker that claims, and the old token can no longer complete it"""
+    with tempfile.TemporaryDirectory() as directory:
+        first, second = open_workers(directory)
+        try:
+            stale = first.claim(PROPERTY_TYPE)
+            assert stale is not None
+            assert second.claim(PROPERTY_TYPE) is None, "a leased unit was handed out twice"
+
+            time.sleep(LEASE * 1.5)
+            unit = second.claim(PROPERTY_TYPE)
+            assert unit is not None and unit['id'] == stale['id'], unit
+            assert unit['worker'] == 'worker-b' and unit['attempts'] == 2, unit
+            assert unit['lease_token'] != stale['lease_token']
+
+            # The first worker finishing late is fenced off by its stale token
+            assert first.complete(stale, OUTCOME_DONE) is False
+            row = unit_row(second, unit['id'])
+            assert (row['status'], row['worker'], row['lease_token']) == (UNIT_LEASED, 'worker-b', unit['lease_token']), row
+
+            assert second.complete(unit, OUTCOME_DONE) is True
+            assert second.status() == {UNIT_DONE: 1}, second.status()
+            assert first.heartbeat() == 0
+        finally:
+            first.close()
+            second.close()
+
+
+def test_heartbeat_extends_lease():
+    """A worker that keeps renewing its lease holds the unit past the original expiry"""
+    with tempfile.TemporaryDirectory() as directory:
+        first, second = open_workers(directory)
+        try:
+            unit = first.claim(PROPERTY_TYPE)
+            time.sleep(LEASE * 0.6)
+            assert first.heartbeat() == 1
+            assert unit_row(first, unit['id'])['lease_expires'] > unit['lease_expires']
+
+            time.sleep(LEASE * 0.6)
+            # Past the lease the claim gave, but within the renewed one
+            assert second.claim(PROPERTY_TYPE) is None
+            assert first.complete(unit, OUTCOME_DONE) is True
+        finally:
+            first.close()
+            second.close()
+
+
+def test_background_heartbeat():
+    """The heartbeat thread keeps a lease alive for several lease periods"""
+    with tempfile.TemporaryDirectory() as directory:
+        first, second = open_workers(directory)
+        try:
+            unit = first.claim(PROPERTY_TYPE)
+            first.start_heartbeat()
+            time.sleep(LEASE * 3)
+            assert second.claim(PROPERTY_TYPE) is None
+            first.stop_heartbeat()
+            assert first.complete(unit, OUTCOME_DONE) is True
+        finally:
+            first.close()
+            second.close()
+
+
+def main():
+    """Run the lease checks"""
+    test_expired_lease_reclaimed()
+    test_heartbeat_extends_lease()
+    test_background_heartbeat()
+    print("Work queue tests passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,42 +1,98 @@
 #!/usr/bin/env python3
 """
 Google Drive Upload Helper
-Uploads scraped CSV files to Google Drive folder
+Uploads scraped CSV files to Google Drive folder, or syncs them: only new and
+changed files are sent, and changed files are updated in place
 """
 
 import os
+import time
+import random
+import hashlib
 import logging
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pickle
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # If modifying these scopes, delete the file token.pickle.
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 
+# Files larger than this are sent as resumable uploads in chunks of this size
+# (a multiple of 256 KB); smaller ones go in a single request
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Concurrent uploads when syncing a directory
+UPLOAD_WORKERS = 4
+
+# Drive API responses that are retried: rate limiting and server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Reasons Drive gives for a 403 that is really rate limiting
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+
+# Longest wait between two attempts of a request, in seconds
+MAX_BACKOFF = 64
+
+# Metadata requested for remote files
+FILE_FIELDS = 'id, name, md5Checksum, size, webViewLink'
+
+
+def file_md5(path, block_size=1024 * 1024):
+    """MD5 of a local file as a hex string, the form Drive reports in md5Checksum"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_retryable(error):
+    """Return True if a Drive API error is worth retrying (rate limits, server errors, dropped connections)"""
+    resp = getattr(error, 'resp', None)
+    status = getattr(resp, 'status', None)
+    if status is None:
+        return isinstance(error, (OSError, TimeoutError))
+    status = int(status)
+    if status in RETRY_STATUSES:
+        return True
+    content = getattr(error, 'content', b'') or b''
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', 'replace')
+    return status == 403 and any(reason in content for reason in RATE_LIMIT_REASONS)
+
 
 class DriveUploader:
     """Upload files to Google Drive"""
 
-    def __init__(self, folder_id):
+    def __init__(self, folder_id, service=None, workers=UPLOAD_WORKERS, chunk_size=UPLOAD_CHUNK_SIZE, max_retries=5):
         """
         Initialize Drive Uploader
 
         Args:
             folder_id (str): Google Drive folder ID where files will be uploaded
+            service: Drive v3 service to use instead of authenticating
+                (optional, e.g. a local fake that implements files().list/create/update)
+            workers (int): Concurrent uploads when syncing a directory
+            chunk_size (int): Chunk size of resumable uploads, in bytes (a multiple of 256 KB)
+            max_retries (int): Attempts of a request after the first before giving up
         """
         self.folder_id = folder_id
-        self.service = None
-        self.authenticate()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.service = service
+        self._creds = None
+        self._local = threading.local()
+        if service is None:
+            self.authenticate()
 
     def authenticate(self):
         """Authenticate with Google Drive API"""
+        from google.auth.transport.requests import Request
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
         creds = None
 
         # The file token.pickle stores the user's access and refresh tokens
@@ -67,9 +123,63 @@ class DriveUploader:
             with open('token.pickle', 'wb') as token:
                 pickle.dump(creds, token)
 
-        self.service = build('drive', 'v3', credentials=creds)
+        self._creds = creds
+        self.service = self._build_service()
         logger.info("Successfully authenticated with Google Drive")
 
+    def _build_service(self):
+        from googleapiclient.discovery import build
+
+        return build('drive', 'v3', credentials=self._creds, cache_discovery=False)
+
+    def _thread_service(self):
+        """
+        Drive service for the calling thread
+
+        The HTTP connection under a service built from credentials cannot be
+        shared between threads, so each upload thread builds its own. An injected
+        service is used as is.
+        """
+        if self._creds is None or threading.current_thread() is threading.main_thread():
+            return self.service
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self._local.service = self._build_service()
+        return service
+
+    def _media(self, file_path):
+        """Media body for a file, resumable and chunked if it is larger than one chunk"""
+        from googleapiclient.http import MediaFileUpload
+
+        resumable = os.path.getsize(file_path) > self.chunk_size
+        return MediaFileUpload(file_path, mimetype='text/csv', resumable=resumable,
+                               chunksize=self.chunk_size if resumable else -1)
+
+    def _with_retries(self, call, description):
+        """
+        Run a Drive request, retrying rate limits, server errors and dropped
+        connections with exponential backoff and jitter
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return call()
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                delay = min(MAX_BACKOFF, 2 ** attempt) * random.uniform(0.5, 1.0)
+                logger.warning(f"{description} failed ({e}), retrying in {delay:.1f} s")
+                time.sleep(delay)
+
+    def _send(self, request, media, description):
+        """Execute an upload request, chunk by chunk if the media is resumable"""
+        if not media.resumable():
+            return self._with_retries(request.execute, description)
+        response = None
+        while response is None:
+            # After a failed chunk the upload resumes from the last byte the server confirmed
+            _, response = self._with_retries(request.next_chunk, description)
+        return response
+
     def upload_file(self, file_path, folder_id=None):
         """
         Upload a file to Google Drive
@@ -91,14 +201,14 @@ class DriveUploader:
             'parents': [folder_id]
         }
 
-        media = MediaFileUpload(file_path, resumable=True)
-
         try:
-            file = self.service.files().create(
+            media = self._media(file_path)
+            request = self._thread_service().files().create(
                 body=file_metadata,
                 media_body=media,
-                fields='id, name, webViewLink'
-            ).execute()
+                fields=FILE_FIELDS
+            )
+            file = self._send(request, media, f"Upload of {file_name}")
 
             logger.info(f"Uploaded: {file_name} (ID: {file.get('id')})")
             return file
@@ -107,6 +217,93 @@ class DriveUploader:
             logger.error(f"Failed to upload {file_name}: {e}")
             return None
 
+    def update_file(self, file_path, file_id):
+        """
+        Replace the content of an existing Drive file, keeping its ID and sharing
+
+        Args:
+            file_path (str): Path to the local file
+            file_id (str): ID of the Drive file to update
+
+        Returns:
+            dict: File metadata from Google Drive, or None if the update failed
+        """
+        file_name = os.path.basename(file_path)
+        try:
+            media = self._media(file_path)
+            request = self._thread_service().files().update(fileId=file_id, media_body=media, fields=FILE_FIELDS)
+            file = self._send(request, media, f"Update of {file_name}")
+
+            logger.info(f"Updated: {file_name} (ID: {file_id})")
+            return file
+
+        except Exception as e:
+            logger.error(f"Failed to update {file_name}: {e}")
+            return None
+
+    def list_folder(self, folder_id=None):
+        """
+        List the files in a Drive folder
+
+        If several files share a name (copies left by earlier uploads), the most
+        recently modified one is returned.
+
+        Args:
+            folder_id (str): Folder ID to list (optional, uses default if not provided)
+
+        Returns:
+            dict: File name to its metadata (id, name, md5Checksum, size)
+        """
+        if folder_id is None:
+            folder_id = self.folder_id
+
+        files = {}
+        duplicates = 0
+        page_token = None
+        while True:
+            request = self.service.files().list(
+                q=f"'{folder_id}' in parents and trashed = false",
+                fields=f"nextPageToken, files({FILE_FIELDS})",
+                orderBy='modifiedTime desc',
+                pageSize=1000,
+                pageToken=page_token,
+            )
+            response = self._with_retries(request.execute, "Listing the Drive folder")
+            for file in response.get('files', []):
+                if file['name'] in files:
+                    duplicates += 1
+                else:
+                    files[file['name']] = file
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+        if duplicates:
+            logger.warning(f"{duplicates} files in the Drive folder share a name with a newer file; only the newest is synced")
+        return files
+
+    def sync_file(self, file_path, remote=None, folder_id=None):
+        """
+        Bring one file on Drive up to date with the local copy
+
+        Args:
+            file_path (str): Path to the local file
+            remote (dict): Metadata of the Drive file with the same name, or None if there is none
+            folder_id (str): Folder ID to upload new files to (optional, uses default if not provided)
+
+        Returns:
+            str: 'created', 'updated', 'unchanged' or 'failed'
+        """
+        if remote is None:
+            return 'created' if self.upload_file(file_path, folder_id) else 'failed'
+
+        # Sizes are compared first so changed files are found without hashing them
+        size = remote.get('size')
+        if size is not None and int(size) == os.path.getsize(file_path) and remote.get('md5Checksum') == file_md5(file_path):
+            logger.info(f"Unchanged: {os.path.basename(file_path)}")
+            return 'unchanged'
+        return 'updated' if self.update_file(file_path, remote['id']) else 'failed'
+
     def upload_directory(self, directory_path, folder_id=None):
         """
         Upload all CSV files from a directory to Google Drive
@@ -149,9 +346,61 @@ class DriveUploader:
         logger.info(f"Upload complete - Success: {success_count}, Failed: {fail_count}")
         return success_count, fail_count
 
+    def sync_directory(self, directory_path, folder_id=None):
+        """
+        Sync all CSV files from a directory to a Google Drive folder
+
+        The folder is listed once. Files missing on Drive are uploaded, files
+        whose MD5 differs from Drive's md5Checksum are updated in place, and
+        the rest are skipped. Uploads run on a pool of ``workers`` threads.
+
+        Args:
+            directory_path (str): Path to directory containing files
+            folder_id (str): Folder ID to sync to (optional)
+
+        Returns:
+            dict: Number of files created, updated, unchanged and failed
+        """
+        if folder_id is None:
+            folder_id = self.folder_id
+
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+        if not os.path.exists(directory_path):
+            logger.error(f"Directory not found: {directory_path}")
+            return counts
+
+        csv_files = sorted(f for f in os.listdir(directory_path) if f.endswith('.csv'))
+        if not csv_files:
+            logger.warning(f"No CSV files found in {directory_path}")
+            return counts
+
+        remote_files = self.list_folder(folder_id)
+        logger.info(f"Syncing {len(csv_files)} CSV files with {len(remote_files)} files on Drive")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='drive-upload') as pool:
+            futures = {
+                pool.submit(self.sync_file, os.path.join(directory_path, name), remote_files.get(name), folder_id): name
+                for name in csv_files
+            }
+            for future in as_completed(futures):
+                try:
+                    counts[future.result()] += 1
+                except Exception as e:
+                    logger.error(f"Failed to sync {futures[future]}: {e}")
+                    counts['failed'] += 1
+
+        logger.info(
+            f"Sync complete - Created: {counts['created']}, Updated: {counts['updated']}, "
+            f"Unchanged: {counts['unchanged']}, Failed: {counts['failed']}"
+        )
+        return counts
+
 
 def main():
     """Main execution function"""
+    from cli import configure_logging
+
+    configure_logging(log_file=None)
 
     # Your Google Drive folder ID from the URL
     # https://drive.google.com/drive/folders/1GtUUeBd3Q46FEhlMg87BaBscvqDHC8IE?usp=sharing
@@ -169,13 +418,15 @@ def main():
 
     try:
         uploader = DriveUploader(folder_id=FOLDER_ID)
-        success, failed = uploader.upload_directory(SCRAPED_DATA_DIR)
+        counts = uploader.sync_directory(SCRAPED_DATA_DIR)
 
         print("\n" + "="*60)
         print("UPLOAD SUMMARY")
         print("="*60)
-        print(f"Successfully uploaded: {success} files")
-        print(f"Failed to upload: {failed} files")
+        print(f"New files uploaded: {counts['created']}")
+        print(f"Changed files updated: {counts['updated']}")
+        print(f"Unchanged files skipped: {counts['unchanged']}")
+        print(f"Failed to upload: {counts['failed']} files")
         print("="*60 + "\n")
 
     except FileNotFoundError as e:
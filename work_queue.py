@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Shared work queue for splitting a sweep across processes and machines
+Books, or date windows of books, are units in a SQLite database. A worker claims
+a unit under a lease that it keeps renewing while it scrapes the unit; a unit
+whose lease runs out (its worker crashed or lost the network) goes back to the
+queue for another worker
+"""
+
+import os
+import sys
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from manifest import DATE_FORMAT, parse_date
+from outcomes import OUTCOME_TRANSIENT, SUCCESS_OUTCOMES
+
+logger = logging.getLogger(__name__)
+
+# States of a unit
+UNIT_PENDING = 'pending'
+UNIT_LEASED = 'leased'
+UNIT_DONE = 'done'
+UNIT_EMPTY = 'empty'
+UNIT_FAILED = 'failed'
+
+# Seconds a claim stays valid without a heartbeat
+LEASE_SECONDS = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY,
+    book_number INTEGER NOT NULL,
+    from_date TEXT NOT NULL,
+    to_date TEXT NOT NULL,
+    property_type TEXT NOT NULL,
+    parts INTEGER NOT NULL DEFAULT 1,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    error TEXT,
+    failure TEXT,
+    updated_at TEXT,
+    UNIQUE (book_number, from_date, to_date, property_type)
+);
+CREATE INDEX IF NOT EXISTS idx_units_status ON units (status, property_type, book_number);
+CREATE INDEX IF NOT EXISTS idx_units_book ON units (book_number, status);
+"""
+
+# The first unit that is due, of a book no other worker holds a unit of
+CLAIM = """
+SELECT * FROM units
+WHERE status = 'pending' AND property_type = :property_type AND not_before <= :now
+  AND book_number NOT IN (SELECT book_number FROM units WHERE status = 'leased')
+ORDER BY book_number, from_date
+LIMIT 1
+"""
+
+INSERT_UNIT = """
+INSERT OR IGNORE INTO units (book_number, from_date, to_date, property_type, parts, updated_at)
+VALUES (:book_number, :from_date, :to_date, :property_type, :parts, :updated_at)
+"""
+
+
+def date_windows(from_date, to_date, window_days=None):
+    """
+    Split a date range into consecutive windows that do not overlap
+
+    Args:
+        from_date (str): Start date (MM/DD/YYYY)
+        to_date (str): End date (MM/DD/YYYY)
+        window_days (int): Days per window (optional, one window for the whole range if not provided)
+
+    Returns:
+        list: (from_date, to_date) tuples covering the range, the last one possibly shorter
+    """
+    if not window_days:
+        return [(from_date, to_date)]
+
+    windows = []
+    start = parse_date(from_date)
+    end = parse_date(to_date)
+    while start <= end:
+        window_end = min(end, start + timedelta(days=window_days - 1))
+        windows.append((start.strftime(DATE_FORMAT), window_end.strftime(DATE_FORMAT)))
+        start = window_end + timedelta(days=1)
+    return windows
+
+
+class WorkQueue:
+    """
+    Lease-based queue of scrape units in a SQLite database
+
+    Every process opens the same database file. Claims run in an IMMEDIATE
+    transaction, so two workers never take the same unit, and units of a book
+    are only handed out one at a time, so a book's saved data has a single
+    writer. Expired leases are reclaimed by the next claim. Completing a unit
+    is fenced on its lease token: a worker whose lease was reclaimed cannot
+    overwrite the outcome of the worker that took the unit over.
+    """
+
+    def __init__(self, path, worker_id=None, lease_seconds=LEASE_SECONDS):
+        """
+        Open (and create if needed) the queue
+
+        Args:
+            path (str): SQLite database file, on storage every worker can reach
+            worker_id (str): Name recorded on this process's leases (optional, host and PID if not provided)
+            lease_seconds (float): Seconds a claim stays valid without a heartbeat;
+                keep it well above the clock difference between machines
+        """
+        self.path = path
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        # Unit ID to lease token of the units this process holds
+        self._held = {}
+        self._heartbeat = None
+        self._stop_heartbeat = threading.Event()
+        # Autocommit, with explicit transactions where they matter. The default
+        # rollback journal is kept: WAL needs shared memory, so it would only
+        # work with every worker on one host
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.stop_heartbeat()
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+
+    def add_books(self, first_book, last_book, from_date, to_date, property_type, window_days=None):
+        """
+        Queue a range of books
+
+        Units already in the queue are left as they are, so adding the same
+        sweep again only fills in what is missing.
+
+        Args:
+            first_book (int): First book number (inclusive)
+            last_book (int): Last book number (inclusive)
+            from_date (str): Start of the date range (MM/DD/YYYY)
+            to_date (str): End of the date range (MM/DD/YYYY)
+            property_type (str): Property type to search
+            window_days (int): Split each book into date windows of this many days,
+                which different workers can scrape one after another (optional, one unit per book if not provided)
+
+        Returns:
+            int: Number of units added
+        """
+        windows = date_windows(from_date, to_date, window_days)
+        now = datetime.now().isoformat()
+        units = [
+            {'book_number': book, 'from_date': window[0], 'to_date': window[1], 'property_type': property_type,
+             'parts': len(windows), 'updated_at': now}
+            for book in range(first_book, last_book + 1)
+            for window in windows
+        ]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(INSERT_UNIT, units)
+            added = conn.total_changes - before
+        logger.info(f"Queued {added} units for books {first_book} to {last_book} in {self.path}")
+        return added
+
+    def claim(self, property_type):
+        """
+        Lease the next unit that is due
+
+        Leases that expired are returned to the queue first.
+
+        Args:
+            property_type (str): Only units of this property type are claimed
+
+        Returns:
+            dict: The unit (its row, with the new lease token), or None if no unit is available right now
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            reclaimed = conn.execute(
+                "UPDATE units SET status = 'pending', worker = NULL, lease_token = NULL, lease_expires = NULL,"
+                " error = 'Lease expired' WHERE status = 'leased' AND lease_expires < ?",
+                (now,),
+            ).rowcount
+            row = conn.execute(CLAIM, {'property_type': property_type, 'now': now}).fetchone()
+            if row is None:
+                unit = None
+            else:
+                unit = dict(row)
+                unit.update(status=UNIT_LEASED, attempts=unit['attempts'] + 1, worker=self.worker_id,
+                            lease_token=uuid.uuid4().hex, lease_expires=now + self.lease_seconds)
+                conn.execute(
+                    "UPDATE units SET status = :status, attempts = :attempts, worker = :worker,"
+                    " lease_token = :lease_token, lease_expires = :lease_expires, updated_at = :updated_at"
+                    " WHERE id = :id",
+                    dict(unit, updated_at=datetime.now().isoformat()),
+                )
+                self._held[unit['id']] = unit['lease_token']
+
+        if reclaimed:
+            logger.warning(f"Reclaimed {reclaimed} units whose lease expired")
+        return unit
+
+    def heartbeat(self):
+        """
+        Extend the leases this process holds
+
+        Returns:
+            int: Number of leases extended; a lease that was already reclaimed is dropped
+        """
+        with self._lock:
+            held = dict(self._held)
+        expires = time.time() + self.lease_seconds
+        renewed = 0
+        for unit_id, token in held.items():
+            with self._transaction() as conn:
+                updated = conn.execute(
+                    "UPDATE units SET lease_expires = ? WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                    (expires, unit_id, token),
+                ).rowcount
+            if updated:
+                renewed += 1
+            else:
+                logger.warning(f"Lost the lease on unit {unit_id}, another worker may be scraping it")
+                with self._lock:
+                    self._held.pop(unit_id, None)
+        return renewed
+
+    def start_heartbeat(self, interval=None):
+        """Renew this process's leases from a background thread every ``interval`` seconds (a third of the lease by default)"""
+        if self._heartbeat is not None:
+            return
+        interval = interval or self.lease_seconds / 3
+
+        def beat():
+            while not self._stop_heartbeat.wait(interval):
+                try:
+                    self.heartbeat()
+                except sqlite3.Error as e:
+                    logger.error(f"Lease heartbeat failed: {e}")
+
+        self._stop_heartbeat.clear()
+        self._heartbeat = threading.Thread(target=beat, name='work-queue-heartbeat', daemon=True)
+        self._heartbeat.start()
+
+    def stop_heartbeat(self):
+        if self._heartbeat is None:
+            return
+        self._stop_heartbeat.set()
+        self._heartbeat.join()
+        self._heartbeat = None
+
+    def complete(self, unit, outcome, error=None, retry_policy=None):
+        """
+        Record the outcome of a claimed unit and release its lease
+
+        Args:
+            unit (dict): Unit returned by claim
+            outcome (str): OUTCOME_DONE, OUTCOME_EMPTY, OUTCOME_TRANSIENT or OUTCOME_PERMANENT
+            error (str): Error message of a failed unit
+            retry_policy (RetryPolicy): Backoff for transient failures; a unit within its
+                retries goes back to the queue after the policy's delay (optional, transient
+                failures are final if not provided)
+
+        Returns:
+            bool: False if the lease had expired and the unit was reclaimed, in which case nothing is recorded
+        """
+        failure = None
+        not_before = 0
+        if outcome in SUCCESS_OUTCOMES:
+            # The unit states for a search with and without results are the outcomes' names
+            status = outcome
+        elif retry_policy is not None and outcome == OUTCOME_TRANSIENT and unit['attempts'] <= retry_policy.max_retries:
+            status = UNIT_PENDING
+            not_before = time.time() + retry_policy.delay(unit['attempts'])
+        else:
+            status = UNIT_FAILED
+            failure = outcome
+
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE units SET status = ?, not_before = ?, error = ?, failure = ?, worker = NULL,"
+                " lease_token = NULL, lease_expires = NULL, updated_at = ?"
+                " WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                (status, not_before, error, failure, datetime.now().isoformat(), unit['id'], unit['lease_token']),
+            ).rowcount
+            self._held.pop(unit['id'], None)
+
+        if not updated:
+            logger.warning(f"Lease on book {unit['book_number']} ({unit['from_date']} to {unit['to_date']}) "
+                           f"expired before it finished; its outcome was not recorded")
+        return bool(updated)
+
+    def release_all(self):
+        """Return every unit this process holds to the queue, e.g. when it is interrupted"""
+        with self._transaction() as conn:
+            for unit_id, token in self._held.items():
+                conn.execute(
+                    "UPDATE units SET status = 'pending', worker = NULL, lease_token = NULL, lease_expires = NULL"
+                    " WHERE id = ? AND lease_token = ? AND status = 'leased'",
+                    (unit_id, token),
+                )
+            released = len(self._held)
+            self._held.clear()
+        if released:
+            logger.info(f"Returned {released} unfinished units to the queue")
+
+    def drained(self, property_type=None):
+        """Return True if no unit (of the property type, if given) is pending or leased"""
+        sql = "SELECT COUNT(*) FROM units WHERE status IN ('pending', 'leased')"
+        params = ()
+        if property_type is not None:
+            sql += " AND property_type = ?"
+            params = (property_type,)
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()[0] == 0
+
+    def status(self):
+        """
+        Count units per state
+
+        Returns:
+            dict: State to number of units
+        """
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def failed_units(self):
+        """
+        List the units that failed for good
+
+        Returns:
+            list: Unit rows as dicts, in book order
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM units WHERE status = 'failed' ORDER BY book_number, from_date"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def requeue_failed(self):
+        """
+        Put failed units back in the queue with their attempts reset
+
+        Returns:
+            int: Number of units requeued
+        """
+        with self._transaction() as conn:
+            requeued = conn.execute(
+                "UPDATE units SET status = 'pending', attempts = 0, not_before = 0, failure = NULL"
+                " WHERE status = 'failed'"
+            ).rowcount
+        logger.info(f"Requeued {requeued} failed units")
+        return requeued
+
+
+def main(argv=None):
+    """Command line access to the work queue"""
+    parser = argparse.ArgumentParser(description='Split a scrape across processes and machines with a shared queue')
+    parser.add_argument('--db', default='scraped_data/queue.db', help='SQLite queue database, reachable by every worker')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help='Queue a range of books')
+    add.add_argument('--first-book', type=int, default=100)
+    add.add_argument('--last-book', type=int, default=410)
+    add.add_argument('--from-date', default='01/01/2010', help='Start date (MM/DD/YYYY)')
+    add.add_argument('--to-date', default='10/31/2025', help='End date (MM/DD/YYYY)')
+    add.add_argument('--property-type', default='Vacant Land')
+    add.add_argument('--window-days', type=int, help='Split each book into date windows of this many days')
+
+    work = commands.add_parser('work', help='Scrape queued units until none are left')
+    work.add_argument('--output-dir', default='scraped_data', help='Output directory shared by every worker')
+    work.add_argument('--engine', choices=('selenium', 'http'), default='selenium')
+    work.add_argument('--workers', type=int, default=1, help='Units this process scrapes at a time')
+    work.add_argument('--request-interval', type=float, default=2.0, help='Minimum seconds between searches')
+    work.add_argument('--storage', choices=('csv', 'parquet'), default='csv')
+    work.add_argument('--property-type', default='Vacant Land')
+    work.add_argument('--cache-dir', help='Response cache directory')
+    work.add_argument('--query-db', help='SQLite query store to index saved books in')
+    work.add_argument('--worker-id', help='Name shown on this process\'s leases')
+    work.add_argument('--lease-seconds', type=float, default=LEASE_SECONDS)
+    work.add_argument('--poll-interval', type=float, default=10.0,
+                      help='Seconds between checks while the remaining units are leased by other workers')
+
+    commands.add_parser('status', help='Count units per state and list failed ones')
+    commands.add_parser('requeue', help='Put failed units back in the queue')
+
+    args = parser.parse_args(argv)
+    work_queue = WorkQueue(args.db, worker_id=getattr(args, 'worker_id', None),
+                           lease_seconds=getattr(args, 'lease_seconds', LEASE_SECONDS))
+    try:
+        if args.command == 'add':
+            work_queue.add_books(args.first_book, args.last_book, args.from_date, args.to_date, args.property_type,
+                                 window_days=args.window_days)
+        elif args.command == 'work':
+            from cli import configure_logging
+            from mohave_scraper import MohaveScraper
+
+            configure_logging()
+
+            scraper = MohaveScraper(
+                output_dir=args.output_dir, property_type=args.property_type, workers=args.workers,
+                request_interval=args.request_interval, engine=args.engine, storage=args.storage,
+                cache_dir=args.cache_dir, query_db=args.query_db,
+            )
+            success, failed = scraper.scrape_queue(work_queue, poll_interval=args.poll_interval)
+            print(f"Finished {success} units, {failed} failed")
+        elif args.command == 'requeue':
+            work_queue.requeue_failed()
+
+        print(', '.join(f"{status}: {count}" for status, count in sorted(work_queue.status().items())) or 'Queue is empty')
+        if args.command == 'status':
+            for unit in work_queue.failed_units():
+                print(f"  book {unit['book_number']} {unit['from_date']} to {unit['to_date']}: "
+                      f"{unit['failure']} after {unit['attempts']} attempts - {unit['error']}")
+        return 0
+    finally:
+        work_queue.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())